@@ -0,0 +1,106 @@
+"""Benchmark for the leaderboards in main.py (Leaderboard over SortedChunks).
+
+Seeds every board through apply_scores as load_leaderboards does at startup, then times score
+updates, rank lookups and page reads, comparing the seeding with the old plain sorted list
+filled by bisect.insort. A climb run then gives users ever higher record scores, so every add
+lands in the first chunk and keeps splitting it. Ranks and pages are checked against a sorted
+reference, and no chunk may grow past 2*load.
+
+    python bench_leaderboard.py                          # 50k dan 200k user
+    python bench_leaderboard.py --users 1000000 --updates 500000 --baseline-max 0
+"""
+import argparse
+import bisect
+import os
+import random
+import sys
+import time
+
+# Jangan sentuh database pemain saat mengimpor main
+os.environ.setdefault("FISHING_DB_PATH", ":memory:")
+
+import main
+
+
+def score_rows(users, rng):
+    return [(user_id, rng.uniform(0, 1e7), rng.randrange(10_000), rng.randrange(-1, 6))
+            for user_id in range(1, users + 1)]
+
+
+def seed_insort(rows):
+    """Baseline: the pre-SortedChunks board, one insort per row into a plain list."""
+    entries = []
+    for user_id, koin, _, _ in rows:
+        bisect.insort(entries, (-round(koin, 2), user_id))
+    return entries
+
+
+def reset_boards():
+    for key, board in main.LEADERBOARDS.items():
+        main.LEADERBOARDS[key] = main.Leaderboard(board.title, board.format_score)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def check_chunks(entries):
+    largest = max(map(len, entries.chunks))
+    assert largest <= 2 * entries.load, f"chunk of {largest:,} items, load {entries.load:,}"
+    assert entries.maxes == [chunk[-1] for chunk in entries.chunks], "maxes out of step with chunks"
+
+
+def climb(board, users, climbs, rng):
+    """Record scores only: each update becomes the new #1, inserted at the head of the first chunk."""
+    top = board.top(1)[0][1]
+    for step in range(1, climbs + 1):
+        board.update(rng.randrange(1, users + 1), top + step)
+
+
+def check_board(board, rng, samples=2000):
+    check_chunks(board.entries)
+    reference = sorted((-score, user_id) for user_id, score in board.scores.items())
+    for position in rng.sample(range(len(reference)), min(samples, len(reference))):
+        assert board.rank(reference[position][1]) == position + 1, "rank differs from sorted reference"
+        page = [(user_id, -neg) for neg, user_id in reference[position:position + 10]]
+        assert board.top(10, position) == page, "page differs from sorted reference"
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[50_000, 200_000])
+    parser.add_argument("--updates", type=int, default=200_000)
+    parser.add_argument("--climbs", type=int, default=50_000, help="record-score updates per board size")
+    parser.add_argument("--baseline-max", type=int, default=200_000,
+                        help="skip the insort baseline above this many users (it is quadratic)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    rng = random.Random(args.seed)
+
+    print(f"{'users':>9} {'insort seed':>12} {'seed':>9} {'updates/s':>11} {'climbs/s':>11} "
+          f"{'rank/s':>11} {'page/s':>11}")
+    for users in args.users:
+        rows = score_rows(users, rng)
+        baseline = f"{timed(lambda: seed_insort(rows)):>11.2f}s" if users <= args.baseline_max else f"{'-':>12}"
+        reset_boards()
+        seed_s = timed(lambda: main.apply_scores(rows))
+        board = main.LEADERBOARDS["koin"]
+
+        changes = [(rng.randrange(1, users + 1), round(rng.uniform(0, 1e7), 2)) for _ in range(args.updates)]
+        update_s = timed(lambda: [board.update(user_id, score) for user_id, score in changes])
+        climb_s = timed(lambda: climb(board, users, args.climbs, rng))
+        check_chunks(board.entries)
+        lookups = [rng.randrange(1, users + 1) for _ in range(args.updates)]
+        rank_s = timed(lambda: [board.rank(user_id) for user_id in lookups])
+        starts = [rng.randrange(users) for _ in range(args.updates)]
+        page_s = timed(lambda: [board.top(10, start) for start in starts])
+        check_board(board, rng)
+
+        print(f"{users:>9,} {baseline} {seed_s:>8.2f}s {args.updates / update_s:>11,.0f} {args.climbs / climb_s:>11,.0f} "
+              f"{args.updates / rank_s:>11,.0f} {args.updates / page_s:>11,.0f}")
@@ -0,0 +1,100 @@
+"""Memory benchmark: bytes per user for the UserStats record (with its catch log) vs the old dict layout.
+
+For each profile it builds N users by running real catches through perform_fishing, then
+measures the memory they retain with tracemalloc. The legacy columns rebuild the same state in
+the pre-UserStats dict of dicts (name-keyed inventory, lists, copied QUEST_DATA entries), which
+had no catch log at all: once built in-process, where keys and names share the catalog's
+strings, and once decoded from JSON as a persisted user is, where every string is its own copy.
+
+    python bench_memory.py                          # 300 user per profil
+    python bench_memory.py --users 2000 --catches 0 50 255 5000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Jangan sentuh database pemain saat mengimpor main
+os.environ.setdefault("FISHING_DB_PATH", ":memory:")
+
+import main
+
+
+def fished_user(user_id, catches):
+    stats = main.UserStats(user_id)
+    stats["location"] = "Ocean"
+    stats["unlocked_islands"].append("Ocean")
+    for _ in range(catches):
+        main.perform_fishing(stats)
+    return stats
+
+
+def legacy_user(stats):
+    """The same player in the dict layout get_user_stats created before UserStats."""
+    daily_pool = [data for q_id, data in main.QUEST_DATA.items() if q_id.startswith("daily_")]
+    return {
+        "koin": stats.koin,
+        "current_rod": stats.current_rod,
+        "current_bait": stats.current_bait,
+        "location": stats.location,
+        "unlocked_islands": list(stats.unlocked_islands),
+        "last_fished": time.time(),
+        "inventory": {main.FISH_CATALOG.names[f]: n for f, n in enumerate(stats.inventory_counts) if n},
+        "owned_rods": list(stats.owned_rods),
+        "owned_baits": list(stats.owned_baits),
+        "rod_enchantment": {"Starter Rod": 0},
+        "quest_progress": {q_id: 0 for q_id in main.QUEST_DATA if q_id.endswith("Quest")},
+        "daily_quests": {f"daily_{i}": {**random.choice(daily_pool), "progress": 0, "claimed": False}
+                         for i in range(3)},
+        "last_daily_reset": time.time(),
+    }
+
+
+def retained_bytes(build, users):
+    """Bytes still allocated after building ``users`` records, per record."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [build(user_id) for user_id in range(1, users + 1)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return (after - before) / users
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--catches", type=int, nargs="+",
+                        default=[0, 100, main.CATCH_LOG_MAX - 1, 2000],
+                        help="catches per user for each profile (CATCH_LOG_MAX - 1 is the raw-log peak)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    random.seed(args.seed)
+    # Tanpa event supaya profil bisa dibandingkan antar run
+    main.EVENTS.replace_all([])
+    # Pemanasan: cache sampler dan tabel global tidak ikut terhitung per user
+    fished_user(0, max(args.catches))
+
+    print(f"{'catches':>8} {'species':>8} {'raw rows':>9} {'UserStats B':>12} {'legacy B':>10} "
+          f"{'legacy JSON':>11} {'ratio':>7} {'JSON':>7}")
+    for catches in args.catches:
+        users = {user_id: fished_user(user_id, catches) for user_id in range(1, args.users + 1)}
+        sample = users[1]
+        compact = retained_bytes(lambda user_id: fished_user(user_id, catches), args.users)
+        # Hanya record-nya yang diukur; proses memancing di fished_user ikut mengalokasikan sementara
+        legacy = retained_bytes(lambda user_id: legacy_user(users[user_id]), args.users)
+        rows = {user_id: json.dumps(legacy_user(stats)) for user_id, stats in users.items()}
+        loaded = retained_bytes(lambda user_id: json.loads(rows[user_id]), args.users)
+        species = sum(1 for n in sample.inventory_counts if n)
+        print(f"{catches:>8,} {species:>8} {len(sample.catch_log.fish):>9} {compact:>12,.0f} {legacy:>10,.0f} "
+              f"{loaded:>11,.0f} {legacy / compact:>6.1f}x {loaded / compact:>6.1f}x")
@@ -0,0 +1,123 @@
+"""Micro-benchmark for the embed/view render cache in main.py (cached_render).
+
+Times renders/sec of every cached menu twice for the same player: with the cache emptied before
+each call (the miss path: state key, build, insert) and with a warm cache (the hit path: state
+key and lookup). A mixed run then walks --users players through the menus in random order, with
+a click changing koin now and then, and reports the hit rate and renders/sec at EMBED_CACHE_SIZE.
+
+    python bench_render.py                          # semua menu; 200, 2000 dan 20000 user campuran
+    python bench_render.py --renders 50000 --users 20000 --change 0.3
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# Jangan sentuh database pemain saat mengimpor main
+os.environ.setdefault("FISHING_DB_PATH", ":memory:")
+
+import main
+
+RENDERS = {
+    "main": lambda stats: main.create_main_embed(stats.user_id),
+    "main_view": lambda stats: main.main_menu_view(stats.user_id),
+    "travel": main.create_travel_embed,
+    "travel_view": main.travel_view,
+    "shop": lambda stats: main.create_shop_embed(stats, main.inventory_summary(stats)),
+    "shop_view": lambda stats: main.shop_view(stats, main.inventory_summary(stats)),
+    "profile": main.create_profile_embed,
+    "fish_view": main.fishing_view,
+    "back_view": lambda stats: main.back_view(stats.user_id),
+}
+
+
+def fished_user(user_id, catches, rng):
+    stats = main.get_user_stats(user_id)
+    stats["koin"] = rng.uniform(0, 5e6)
+    for island in main.ISLAND_LIST[:rng.randrange(1, len(main.ISLAND_LIST) + 1)]:
+        if island not in stats["unlocked_islands"]:
+            stats["unlocked_islands"].append(island)
+    for _ in range(catches):
+        main.perform_fishing(stats)
+    return stats
+
+
+def renders_per_second(render, stats, renders, cached):
+    render(stats)
+    started = time.perf_counter()
+    for _ in range(renders):
+        if not cached:
+            main._RENDER_CACHE.clear()
+        render(stats)
+    return renders / (time.perf_counter() - started)
+
+
+def mixed_run(users, renders, change, seed):
+    """Random (player, menu) renders; ``change`` of them follow a click that changed koin."""
+    rng, kinds = random.Random(seed), list(RENDERS)
+    started = time.perf_counter()
+    for _ in range(renders):
+        stats = users[rng.randrange(len(users))]
+        if rng.random() < change:
+            stats["koin"] += 1
+        RENDERS[kinds[rng.randrange(len(kinds))]](stats)
+    return renders / (time.perf_counter() - started)
+
+
+def mixed_hit_rate(users, renders, change, seed):
+    """The same walk again with builds counted, kept out of the timed run."""
+    misses, cached_render = [0], main.cached_render
+
+    def counting_cached_render(kind, user_id, state_key, build):
+        def counted_build():
+            misses[0] += 1
+            return build()
+        return cached_render(kind, user_id, state_key, counted_build)
+
+    main.cached_render = counting_cached_render
+    try:
+        mixed_run(users, renders, change, seed)
+    finally:
+        main.cached_render = cached_render
+    return 1 - misses[0] / renders
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renders", type=int, default=20_000, help="renders per menu and per mixed run")
+    parser.add_argument("--catches", type=int, default=100, help="catches per player (fills inventory and catch log)")
+    parser.add_argument("--users", type=int, nargs="+", default=[200, 2000, 20_000])
+    parser.add_argument("--change", type=float, default=0.2, help="fraction of mixed renders after a koin change")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+async def run_benchmark(args):
+    """Everything runs inside the event loop: py-cord builds View objects only on a running loop."""
+    rng = random.Random(args.seed)
+    # Tanpa event supaya hasil bisa dibandingkan antar run
+    main.EVENTS.replace_all([])
+    stats = fished_user(1, args.catches, rng)
+
+    print(f"{'menu':<12} {'miss/s':>10} {'hit/s':>11} {'speedup':>8}")
+    for kind, render in RENDERS.items():
+        miss = renders_per_second(render, stats, args.renders, cached=False)
+        hit = renders_per_second(render, stats, args.renders, cached=True)
+        print(f"{kind:<12} {miss:>10,.0f} {hit:>11,.0f} {hit / miss:>7.1f}x")
+
+    print(f"\n{'users':>8} {'renders/s':>10} {'hit rate':>9}  (EMBED_CACHE_SIZE {main.EMBED_CACHE_SIZE:,})")
+    players = [stats]
+    for users in sorted(args.users):
+        players += [fished_user(user_id, rng.randrange(args.catches + 1), rng)
+                    for user_id in range(len(players) + 1, users + 1)]
+        main._RENDER_CACHE.clear()
+        mixed_run(players[:users], args.renders, args.change, args.seed)  # pemanasan cache
+        rate = mixed_run(players[:users], args.renders, args.change, args.seed + 1)
+        hit_rate = mixed_hit_rate(players[:users], args.renders, args.change, args.seed + 2)
+        print(f"{users:>8,} {rate:>10,.0f} {hit_rate:>8.1%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark(parse_args(sys.argv[1:])))
@@ -0,0 +1,80 @@
+"""Benchmark for the per-island alias sampler (FishSampler / get_fish_sampler in main.py).
+
+Times draws/sec of the old per-catch path (rebuild choices/weights lists, random.choices) against
+an alias draw from the cached sampler, and checks both produce the same catch distribution.
+
+    python bench_sampler.py                        # semua pulau, luck 0 dan 250
+    python bench_sampler.py --islands Ocean --luck 0 100 500 --draws 500000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Jangan sentuh database pemain saat mengimpor main
+os.environ.setdefault("FISHING_DB_PATH", ":memory:")
+
+import main
+
+
+def draw_choices(location, total_luck, rng):
+    """Baseline: the pre-alias perform_fishing, lists rebuilt and weights summed on every catch."""
+    choices = []
+    weights = []
+    for fish in main.FISH_POOL_BY_ISLAND[location]:
+        choices.append(fish)
+        weights.append(main.fish_catch_weight(fish["chance"], total_luck))
+    return rng.choices(choices, weights=weights, k=1)[0]["name"]
+
+
+def draw_alias(location, total_luck, rng):
+    sampler = main.get_fish_sampler(location, total_luck)
+    return main.FISH_CATALOG.names[sampler.draw(rng.random(), rng.random())]
+
+
+def timed_draws(fn, location, total_luck, draws, seed):
+    rng = random.Random(seed)
+    counts = {}
+    started = time.perf_counter()
+    for _ in range(draws):
+        name = fn(location, total_luck, rng)
+        counts[name] = counts.get(name, 0) + 1
+    return counts, time.perf_counter() - started
+
+
+def total_variation(a, b, draws):
+    return sum(abs(a.get(k, 0) - b.get(k, 0)) for k in set(a) | set(b)) / (2 * draws)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--islands", nargs="+", choices=list(main.FISH_POOL_BY_ISLAND),
+                        default=list(main.FISH_POOL_BY_ISLAND))
+    parser.add_argument("--luck", nargs="+", type=int, default=[0, 250])
+    parser.add_argument("--draws", type=int, default=200_000)
+    parser.add_argument("--max-tv", type=float, default=0.01,
+                        help="largest total-variation distance allowed between the two distributions")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    # Tanpa event aktif supaya baseline (tanpa multiplier rarity) sebanding
+    main.EVENTS.replace_all([])
+
+    print(f"{'island':<17} {'luck':>5} {'fish':>5} {'choices/s':>12} {'alias/s':>12} {'speedup':>8} {'TV':>7}")
+    worst = 0.0
+    for location in args.islands:
+        for total_luck in args.luck:
+            baseline, baseline_s = timed_draws(draw_choices, location, total_luck, args.draws, args.seed)
+            alias, alias_s = timed_draws(draw_alias, location, total_luck, args.draws, args.seed + 1)
+            tv = total_variation(baseline, alias, args.draws)
+            worst = max(worst, tv)
+            print(f"{location:<17} {total_luck:>5} {len(main.FISH_POOL_BY_ISLAND[location]):>5} "
+                  f"{args.draws / baseline_s:>12,.0f} {args.draws / alias_s:>12,.0f} "
+                  f"{baseline_s / alias_s:>7.1f}x {tv:>7.4f}")
+
+    if worst > args.max_tv:
+        sys.exit(f"FAIL: alias distribution differs from random.choices (TV {worst:.4f} > {args.max_tv})")
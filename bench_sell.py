@@ -0,0 +1,103 @@
+"""Benchmark for the bulk sell engine (sell_inventory in main.py).
+
+Builds a synthetic catalog with thousands of species, fills an inventory with millions of
+units and times each sell mode against a per-fish baseline (koin and quest update per unit).
+
+    python bench_sell.py                          # 5000 species, 5 juta ekor
+    python bench_sell.py --species 20000 --units 50000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from array import array
+
+# Jangan sentuh database pemain saat mengimpor main
+os.environ.setdefault("FISHING_DB_PATH", ":memory:")
+
+import main
+
+
+def synthetic_catalog(species, seed):
+    rng = random.Random(seed)
+    pool = []
+    for i in range(species):
+        chance = rng.uniform(1, 1_000_000)
+        weight_min = rng.uniform(0.1, 50)
+        pool.append({
+            "name": f"Bench Fish {i}", "rarity": rng.choice(main.RARITY_TIERS), "chance": chance,
+            "weight_min": weight_min, "weight_max": weight_min * rng.uniform(1, 10),
+            "base_price": chance / 10000 * 1.5, "is_secret_weight": False,
+        })
+    return main.FishCatalog({"Bench Island": pool})
+
+
+def filled_user(species, units, favorites, seed):
+    rng = random.Random(seed)
+    stats = main.UserStats()
+    stats.inventory_counts = array("I", [0] * species)
+    for _ in range(species):
+        stats.inventory_counts[rng.randrange(species)] += 1
+    # Sisa unit dibagi rata supaya total tepat `units`
+    base, extra = divmod(units - species, species)
+    for fish_id in range(species):
+        stats.inventory_counts[fish_id] += base + (fish_id < extra)
+    stats.favorite_mask = sum(1 << rng.randrange(species) for _ in range(favorites))
+    return stats
+
+
+def sell_per_fish(user_stats):
+    """Baseline: one koin and quest update per unit, as a naive handler would do."""
+    counts, prices = user_stats.inventory_counts, main.FISH_CATALOG.base_price
+    units, coins = 0, 0.0
+    for fish_id in range(len(counts)):
+        for _ in range(counts[fish_id]):
+            user_stats["koin"] += prices[fish_id]
+            main.update_quest_progress(user_stats, "sell", value=1)
+            units += 1
+            coins += prices[fish_id]
+        counts[fish_id] = 0
+    return units, coins
+
+
+def timed_run(label, fn, make_user):
+    user_stats = make_user()
+    started = time.perf_counter()
+    units, coins = fn(user_stats)
+    elapsed = time.perf_counter() - started
+    rate = units / elapsed if elapsed else float("inf")
+    print(f"{label:<28} {units:>12,} units {coins:>18,.2f} koin {elapsed * 1000:>10.2f} ms {rate:>16,.0f} units/s")
+    return units, coins
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--species", type=int, default=5000)
+    parser.add_argument("--units", type=int, default=5_000_000)
+    parser.add_argument("--favorites", type=int, default=100)
+    parser.add_argument("--baseline-units", type=int, default=200_000,
+                        help="inventory size for the per-fish baseline (it is slow)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    main.FISH_CATALOG = synthetic_catalog(args.species, args.seed)
+    make_user = lambda: filled_user(args.species, args.units, args.favorites, args.seed)
+
+    print(f"{args.species:,} species, {args.units:,} units, {args.favorites} favorites")
+    total = timed_run("sell all", main.sell_inventory, make_user)
+    except_favorites = timed_run("sell all except favorites", lambda s: main.sell_inventory(s, keep_favorites=True), make_user)
+    by_tier = [timed_run(f"sell {name}", lambda s, t=tier: main.sell_inventory(s, tier=t), make_user)
+               for tier, name in enumerate(main.RARITY_TIERS)]
+
+    # Hasil per rarity harus menjumlah ke hasil sell all
+    assert sum(units for units, _ in by_tier) == total[0] == args.units
+    assert abs(sum(coins for _, coins in by_tier) - total[1]) <= 1e-9 * total[1]
+    assert except_favorites[0] <= total[0]
+
+    baseline_units = min(args.baseline_units, args.units)
+    timed_run("per-fish baseline", sell_per_fish,
+              lambda: filled_user(args.species, max(baseline_units, args.species), 0, args.seed))
@@ -0,0 +1,112 @@
+"""Throughput benchmark for the write-behind storage in main.py with 100k simulated users.
+
+Fills the working set with users that have inventories, quests and catch logs, then times the
+stages of the persistence path on a file database: the first flush of everyone, steady-state
+flushes of a dirty fraction, the incremental collect used by the running bot, cold loads of
+evicted users and the leaderboard score scan at startup.
+
+    python bench_store.py                            # 100k user, 10% dirty per flush
+    python bench_store.py --users 200000 --dirty 0.02 --partitions 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Jangan sentuh database pemain saat mengimpor main; path benchmark di-set di bawah
+os.environ.setdefault("FISHING_DB_PATH", ":memory:")
+
+import main
+
+
+def fill_users(users, seed):
+    rng = random.Random(seed)
+    catalog = main.FISH_CATALOG
+    for user_id in range(1, users + 1):
+        stats = main.UserStats(user_id)
+        stats["koin"] = rng.uniform(0, 1e6)
+        for _ in range(rng.randrange(1, 40)):
+            fish_id = rng.randrange(len(catalog))
+            stats.add_fish(fish_id, rng.randrange(1, 50))
+            stats.catch_log.append(fish_id, catalog.weight_min[fish_id], time.time(), 0)
+        main.USER_DATA[user_id] = stats
+        main.mark_dirty(user_id)
+
+
+def timed(label, fn, rows_label="users"):
+    started = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else float("inf")
+    print(f"{label:<38} {count:>9,} {rows_label:<6} {elapsed * 1000:>10.1f} ms {rate:>12,.0f} {rows_label}/s")
+    return elapsed
+
+
+def timed_flush(label):
+    """flush_dirty_users in two timed stages: serializing the rows, then one save_many transaction."""
+    rows = []
+    timed(f"{label}: serialize", lambda: rows.extend(main.collect_dirty_rows()) or len(rows), "rows")
+    timed(f"{label}: write", lambda: main.user_store().save_many(rows) or len(rows), "rows")
+
+
+def mark_fraction(user_ids, fraction, rng):
+    dirty = rng.sample(user_ids, int(len(user_ids) * fraction))
+    for user_id in dirty:
+        main.USER_DATA[user_id]["koin"] += 1
+        main.mark_dirty(user_id)
+    return dirty
+
+
+def flush_incrementally():
+    rows = asyncio.run(main.collect_dirty_rows_incrementally())
+    main._IN_FLIGHT_WRITES.clear()
+    main.user_store().save_many(rows)
+    return len(rows)
+
+
+def cold_loads(user_ids):
+    for user_id in user_ids:
+        main.load_user(user_id)
+    return len(user_ids)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--dirty", type=float, default=0.10, help="fraction of users changed per steady-state flush")
+    parser.add_argument("--flushes", type=int, default=5)
+    parser.add_argument("--loads", type=int, default=10_000)
+    parser.add_argument("--partitions", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        main.DB_PATH = os.path.join(tmp, "bench.db")
+        main.DB_PARTITIONS = args.partitions
+        main.MAX_RESIDENT_USERS = args.users
+
+        timed("fill working set", lambda: fill_users(args.users, args.seed) or args.users)
+        timed_flush("first flush (all users)")
+
+        user_ids = list(main.USER_DATA)
+        for flush in range(args.flushes):
+            mark_fraction(user_ids, args.dirty, rng)
+            timed_flush(f"flush {args.dirty:.0%} dirty #{flush + 1}")
+        mark_fraction(user_ids, args.dirty, rng)
+        timed(f"incremental flush {args.dirty:.0%} dirty", flush_incrementally, "rows")
+
+        sample = rng.sample(user_ids, min(args.loads, len(user_ids)))
+        for user_id in sample:
+            del main.USER_DATA[user_id]
+        timed("cold load (evicted users)", lambda: cold_loads(sample))
+        timed("load_scores (startup)", lambda: len(main.user_store().load_scores()), "rows")
+        main.close_user_store()
+        size = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp))
+        print(f"database size: {size / 1e6:,.1f} MB ({size / args.users:,.0f} bytes/user)")
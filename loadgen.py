@@ -0,0 +1,334 @@
+"""Offline load generator: replays synthetic or recorded clicks through the real interaction handlers.
+
+No Discord connection. Fake Interaction/response/followup objects go straight into
+main.route_component (every button/select) and the /menu command callback on one event
+loop, with the bot's background tasks (write-behind flusher, cooldown scheduler, outbound
+queue) running. Reports handler latency per action (p50/p99/max), event-loop lag and
+allocations per interaction.
+
+    python loadgen.py                                        # 2000 user, 20000 klik, mix default
+    python loadgen.py --rate 0 --mix auto_fish_button=10 main_menu=1
+    python loadgen.py --record traffic.jsonl                 # simpan traffic sintetis
+    python loadgen.py --cooldown 0.5 --max-offline-catches 20000 --offload-workers 2   # batch besar via pool
+    python loadgen.py --replay traffic.jsonl --max-p99-ms 50 --max-lag-ms 100   # CI: exit 1 kalau lewat batas
+
+Traffic file: satu JSON per baris, {"at": detik sejak start, "user_id": ..., "action": ..., "values": [...] | null}.
+Action "menu" adalah slash command /menu; action lain adalah action di COMPONENT_HANDLERS.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Jangan sentuh database pemain saat mengimpor main
+os.environ.setdefault("FISHING_DB_PATH", ":memory:")
+
+import discord
+import main
+
+DEFAULT_MIX = {
+    "menu": 1, "main_menu": 2, "main_fish": 2, "auto_fish_button": 8, "main_travel": 1,
+    "set_fishing_location": 1, "travel_buy_next": 0.2, "main_top": 1, "main_shop": 1,
+    "shop_sell_all": 0.5, "main_profile": 1,
+}
+
+
+# --- Fake Discord objects ---
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+class FakeMessage:
+    def __init__(self, message_id):
+        self.id = message_id
+
+
+class FakeResponse:
+    def __init__(self):
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def edit_message(self, **kwargs):
+        self._done = True
+
+    async def send_message(self, *args, **kwargs):
+        self._done = True
+
+    async def defer(self, **kwargs):
+        self._done = True
+
+
+class FakeFollowup:
+    async def send(self, *args, **kwargs):
+        pass
+
+
+class FakeInteraction:
+    def __init__(self, user_id, custom_id=None, values=None, interaction_type=discord.InteractionType.component):
+        self.id = discord.utils.time_snowflake(datetime.datetime.now(datetime.timezone.utc))
+        self.type = interaction_type
+        self.user = FakeUser(user_id)
+        self.data = {"custom_id": custom_id} if custom_id is not None else {}
+        if values is not None:
+            self.data["values"] = values
+        self.response = FakeResponse()
+        self.followup = FakeFollowup()
+        # Satu pesan menu per user, seperti di Discord
+        self.message = FakeMessage(user_id)
+        self.channel_id = user_id % 64
+        self.guild_id = user_id % 64
+
+    async def edit_original_response(self, **kwargs):
+        pass
+
+
+class FakeContext:
+    """Just enough of ApplicationContext for menu_command."""
+
+    def __init__(self, user_id):
+        self.author = FakeUser(user_id)
+        self.interaction = FakeInteraction(user_id, interaction_type=discord.InteractionType.application_command)
+
+    async def respond(self, *args, **kwargs):
+        self.interaction.response._done = True
+
+
+# --- Traffic ---
+
+def synthetic_traffic(users, clicks, rate, mix, seed):
+    """Poisson arrivals at ``rate`` clicks/s (0 = back to back), users and actions drawn uniformly / by mix weight."""
+    rng = random.Random(seed)
+    actions, weights = list(mix), list(mix.values())
+    at = 0.0
+    for _ in range(clicks):
+        if rate > 0:
+            at += rng.expovariate(rate)
+        yield {"at": at, "user_id": 10_000 + rng.randrange(users),
+               "action": rng.choices(actions, weights)[0], "values": None}
+
+
+def load_traffic(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def resolve_values(click, rng):
+    """Select values for clicks that did not record them, picked from the user's current state."""
+    if click.get("values") is not None:
+        return click["values"]
+    action = click["action"]
+    if action == "set_fishing_location":
+        return [rng.choice(list(main.get_user_stats(click["user_id"])["unlocked_islands"]))]
+    if action == "shop_sell_rarity":
+        return ["Common"]
+    return None
+
+
+async def dispatch(click, rng):
+    user_id, action = click["user_id"], click["action"]
+    if action == "menu":
+        await main.menu_command.callback(FakeContext(user_id))
+    else:
+        interaction = FakeInteraction(user_id, main.component_id(action, user_id), resolve_values(click, rng))
+        await main.route_component(interaction)
+
+
+# --- Measurement ---
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def summarize_latencies(values):
+    values = sorted(values)
+    return {"count": len(values), "p50_ms": percentile(values, 0.50) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000, "max_ms": (values[-1] if values else 0.0) * 1000}
+
+
+async def monitor_loop_lag(samples, interval):
+    """Oversleep of a periodic timer = how long the loop was blocked by something else."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - started - interval))
+
+
+async def run_load(traffic, seed, lag_interval):
+    rng = random.Random(seed)
+    latencies = {}
+    errors = {}
+    lag_samples = []
+    tasks = set()
+
+    async def timed_click(click):
+        started = time.perf_counter()
+        try:
+            await dispatch(click, rng)
+        except Exception as e:
+            errors[click["action"]] = errors.get(click["action"], 0) + 1
+            if errors[click["action"]] == 1:
+                print(f"{click['action']} failed: {e!r}")
+        latencies.setdefault(click["action"], []).append(time.perf_counter() - started)
+
+    monitor = asyncio.create_task(monitor_loop_lag(lag_samples, lag_interval))
+    started = time.perf_counter()
+    for click in traffic:
+        delay = click["at"] - (time.perf_counter() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(timed_click(click))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        if click["at"] == 0.0:
+            # Mode back-to-back: satu klik selesai dulu sebelum klik berikutnya
+            await task
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    monitor.cancel()
+    return latencies, errors, lag_samples, elapsed
+
+
+async def measure_allocations(traffic, seed):
+    """Run clicks one by one under tracemalloc: transient peak and net retained memory per interaction."""
+    rng = random.Random(seed)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    peaks = []
+    for click in traffic:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await dispatch(click, rng)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diff = after.compare_to(before, "filename")
+    n = max(1, len(traffic))
+    return {
+        "interactions": len(traffic),
+        "peak_bytes_avg": sum(peaks) / n,
+        "retained_bytes_per_interaction": sum(stat.size_diff for stat in diff) / n,
+        "retained_blocks_per_interaction": sum(stat.count_diff for stat in diff) / n,
+    }
+
+
+async def run(args):
+    main.COOLDOWN_TIME = args.cooldown
+    main.MAX_OFFLINE_CATCHES = args.max_offline_catches
+    # Background task yang sama dengan on_ready (tanpa bus dan metrics server)
+    main.start_background_task("write_behind_flusher", main.write_behind_flusher)
+    main.start_background_task("cooldown_scheduler", main.COOLDOWN_TIMERS.run)
+    main.start_background_task("outbound_queue", main.OUTBOUND.run)
+
+    if args.replay:
+        traffic = load_traffic(args.replay)
+    else:
+        traffic = list(synthetic_traffic(args.users, args.clicks, args.rate, args.mix, args.seed))
+    if args.record:
+        with open(args.record, "w") as f:
+            f.writelines(json.dumps(click) + "\n" for click in traffic)
+
+    latencies, errors, lag_samples, elapsed = await run_load(traffic, args.seed, args.lag_interval_ms / 1000)
+    report = {
+        "clicks": len(traffic),
+        "seconds": elapsed,
+        "clicks_per_second": len(traffic) / elapsed if elapsed else 0.0,
+        "actions": {action: dict(summarize_latencies(values), errors=errors.get(action, 0))
+                    for action, values in sorted(latencies.items())},
+        "all": summarize_latencies([v for values in latencies.values() for v in values]),
+        "errors": sum(errors.values()),
+        "loop_lag": summarize_latencies(lag_samples),
+    }
+    if args.alloc_clicks:
+        report["allocations"] = await measure_allocations(traffic[:args.alloc_clicks], args.seed)
+    for task in main._BACKGROUND_TASKS.values():
+        task.cancel()
+    return report
+
+
+def print_report(report):
+    print(f"{report['clicks']:,} clicks in {report['seconds']:.2f}s ({report['clicks_per_second']:,.0f}/s), "
+          f"{report['errors']} errors")
+    print(f"{'Action':<24} {'Count':>8} {'Err':>5} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for action, row in list(report["actions"].items()) + [("ALL", dict(report["all"], errors=report["errors"]))]:
+        print(f"{action:<24} {row['count']:>8,} {row['errors']:>5} {row['p50_ms']:>9.3f} {row['p99_ms']:>9.3f} {row['max_ms']:>9.3f}")
+    lag = report["loop_lag"]
+    print(f"Event-loop lag: p50 {lag['p50_ms']:.3f} ms  p99 {lag['p99_ms']:.3f} ms  max {lag['max_ms']:.3f} ms "
+          f"({lag['count']:,} samples)")
+    if "allocations" in report:
+        alloc = report["allocations"]
+        print(f"Allocations ({alloc['interactions']:,} interactions): peak {alloc['peak_bytes_avg']:,.0f} B/interaction, "
+              f"retained {alloc['retained_bytes_per_interaction']:,.0f} B "
+              f"({alloc['retained_blocks_per_interaction']:,.1f} blocks)/interaction")
+
+
+def parse_mix(items):
+    mix = {}
+    for item in items:
+        action, _, weight = item.partition("=")
+        if action != "menu" and action not in main.COMPONENT_HANDLERS:
+            raise argparse.ArgumentTypeError(f"unknown action {action!r}")
+        mix[action] = float(weight or 1)
+    return mix
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--clicks", type=int, default=20_000)
+    parser.add_argument("--rate", type=float, default=1000, help="clicks per second (0 = back to back)")
+    parser.add_argument("--mix", nargs="+", default=None, metavar="ACTION=WEIGHT",
+                        help="click mix, e.g. auto_fish_button=8 main_menu=2 (default: a typical session)")
+    parser.add_argument("--replay", help="replay a traffic JSONL file instead of synthetic traffic")
+    parser.add_argument("--record", help="write the traffic that was run to a JSONL file")
+    parser.add_argument("--cooldown", type=float, default=main.COOLDOWN_TIME, help="override COOLDOWN_TIME")
+    parser.add_argument("--max-offline-catches", type=int, default=main.MAX_OFFLINE_CATCHES)
+    parser.add_argument("--offload-workers", type=int, default=main.OFFLOAD_WORKERS,
+                        help="process pool size for run_cpu_job (0 = inline)")
+    parser.add_argument("--lag-interval-ms", type=float, default=10)
+    parser.add_argument("--alloc-clicks", type=int, default=500, help="clicks replayed under tracemalloc (0 = skip)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report as JSON")
+    parser.add_argument("--max-p99-ms", type=float, help="fail if overall handler p99 exceeds this")
+    parser.add_argument("--max-lag-ms", type=float, help="fail if event-loop lag p99 exceeds this")
+    args = parser.parse_args(argv)
+    try:
+        args.mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    # Sebelum event loop dan thread apa pun, sama seperti main.py
+    main.start_offload_pool(args.offload_workers)
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        main.stop_offload_pool()
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failures = []
+    if report["errors"]:
+        failures.append(f"{report['errors']} handler errors")
+    if args.max_p99_ms is not None and report["all"]["p99_ms"] > args.max_p99_ms:
+        failures.append(f"p99 {report['all']['p99_ms']:.3f} ms > {args.max_p99_ms} ms")
+    if args.max_lag_ms is not None and report["loop_lag"]["p99_ms"] > args.max_lag_ms:
+        failures.append(f"loop lag p99 {report['loop_lag']['p99_ms']:.3f} ms > {args.max_lag_ms} ms")
+    if failures:
+        sys.exit("FAIL: " + "; ".join(failures))
@@ -2,9 +2,33 @@ import discord
 from discord.ext import commands
 from discord.ui import Button, View, Select
 import os
+import sys
+import base64
+import hashlib
+import inspect
 import random
+import secrets
 import time
 import math
+import operator
+import json
+import sqlite3
+import subprocess
+import multiprocessing
+import asyncio
+import threading
+import contextlib
+import signal
+import urllib.parse
+import functools
+import bisect
+import heapq
+import itertools
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections.abc import MutableMapping
 from typing import Dict, Any, List, Optional, Tuple
 
 # --- BOT CONFIGURATION ---
@@ -17,11 +41,51 @@ if not TOKEN:
 # Gunakan 'R$' sebagai mata uang utama
 CURRENCY_SYMBOL = "R$"
 COOLDOWN_TIME = 30 # Cooldown untuk Auto Fishing
+# Batas tangkapan yang dihitung saat user kembali (120 x 30 detik = 1 jam)
+MAX_OFFLINE_CATCHES = 120
+# Riwayat tangkapan per user: setelah CATCH_LOG_MAX baris mentah, semua kecuali CATCH_LOG_KEEP
+# baris terbaru dipadatkan menjadi agregat per ikan (lihat CatchLog)
+CATCH_LOG_MAX = int(os.environ.get('FISHING_CATCH_LOG_MAX', '256'))
+CATCH_LOG_KEEP = 32
+
+# Lokasi database SQLite dan interval write-behind (ms)
+DB_PATH = os.environ.get('FISHING_DB_PATH', 'fishing_bot.db')
+FLUSH_INTERVAL_MS = int(os.environ.get('FISHING_FLUSH_INTERVAL_MS', '500'))
+# User yang diserialisasi per langkah flush sebelum event loop diberi giliran
+FLUSH_CHUNK_USERS = 50
+# Hasil kompilasi RAW_FISH_INPUT (lihat compile_fish_catalog)
+FISH_CATALOG_PATH = os.environ.get('FISHING_CATALOG_PATH', 'fish_catalog.json')
+# Daily quest di-reset per epoch (hari UTC), bukan 24 jam sejak reset terakhir per user
+DAILY_RESET_SECONDS = 24 * 3600
+# Maksimal user yang disimpan di memori; sisanya dimuat dari database saat dibutuhkan
+MAX_RESIDENT_USERS = int(os.environ.get('FISHING_MAX_RESIDENT_USERS', '10000'))
+# Mode multi-process: SHARD_PROCESSES proses bot, masing-masing menjalankan sebagian shard gateway
+# dan memegang sebagian user (lihat owns_user). `python main.py run-shards N` menjalankan semuanya.
+SHARD_PROCESSES = int(os.environ.get('FISHING_SHARD_PROCESSES', '1'))
+PROCESS_INDEX = int(os.environ.get('FISHING_PROCESS_INDEX', '0'))
+SHARD_COUNT = int(os.environ.get('FISHING_SHARD_COUNT', str(SHARD_PROCESSES)))
+# Jumlah file database user (dipartisi per hash user_id). Jangan diubah setelah ada data.
+DB_PARTITIONS = int(os.environ.get('FISHING_DB_PARTITIONS', '1'))
+# Pub/sub antar proses shard (file SQLite bersama) dan interval polling-nya (ms)
+BUS_PATH = os.environ.get('FISHING_BUS_PATH', 'fishing_bus.db')
+BUS_POLL_MS = int(os.environ.get('FISHING_BUS_POLL_MS', '50'))
+# Pool proses untuk pekerjaan CPU berat (lihat run_cpu_job); 0 = semua dijalankan di event loop
+OFFLOAD_WORKERS = int(os.environ.get('FISHING_OFFLOAD_WORKERS', '0'))
+# Interaction yang pekerjaannya diperkirakan lebih lama dari ini di-defer dulu (ms)
+LATENCY_BUDGET_MS = int(os.environ.get('FISHING_LATENCY_BUDGET_MS', '250'))
 
 intents = discord.Intents.default()
 # Wajib mengaktifkan message_content intent
 intents.message_content = True 
-bot = commands.Bot(command_prefix='/', intents=intents)
+if SHARD_PROCESSES > 1:
+    # Shard dibagi bergiliran antar proses: proses i menjalankan shard i, i+N, i+2N, ...
+    bot = commands.AutoShardedBot(command_prefix='/', intents=intents, shard_count=SHARD_COUNT,
+                                  shard_ids=list(range(PROCESS_INDEX, SHARD_COUNT, SHARD_PROCESSES)))
+else:
+    bot = commands.Bot(command_prefix='/', intents=intents)
+# Arahkan request API (termasuk follow-up) ke fake Discord HTTP server lokal saat pengujian
+if os.environ.get('DISCORD_API_BASE_URL'):
+    discord.http.Route.API_BASE_URL = os.environ['DISCORD_API_BASE_URL']
 
 # Embed Colors based on Rarity (Hex Codes)
 RARITY_COLORS = {
@@ -36,8 +100,9 @@ RARITY_COLORS = {
 }
 
 # --- USER DATA (Database Simulation) ---
-USER_DATA: Dict[int, Dict[str, Any]] = {}
-GLOBAL_EVENT_BOOST: Dict[str, Any] = {"luck_multiplier": 1, "is_active": False}
+# Working set LRU (paling lama tidak dipakai di depan), bukan seluruh database
+USER_DATA: "OrderedDict[int, UserStats]" = OrderedDict()
+USER_CACHE_STATS = {"hits": 0, "misses": 0, "evictions": 0, "busy_skips": 0}
 
 
 # --- STATIC DATA: ISLANDS, RODS, BAITS, AND FISH (UPDATED FOR SPECIFIC POOL) ---
@@ -61,6 +126,7 @@ ISLAND_LIST = list(ISLAND_DATA.keys())
 def parse_fish_data_by_island(fish_str: str) -> Dict[str, List[Dict[str, Any]]]:
     lines = fish_str.strip().split('\n')
     parsed_data: Dict[str, List[Dict[str, Any]]] = {}
+    seen_names: Dict[str, set] = {}
     current_location = "Fisherman Island"
     
     secret_weights = {
@@ -91,15 +157,13 @@ def parse_fish_data_by_island(fish_str: str) -> Dict[str, List[Dict[str, Any]]]:
         parts = line.split(',')
         
         # Check for new location marker (e.g., '1. Fisherman Island')
-        if parts[0].isdigit():
-            try:
-                location_id = int(parts[0].split('.')[0])
-                if location_id in location_map:
-                    current_location = location_map[location_id]
-                    if len(parts) > 1 and parts[1].strip() in location_map.values():
-                        continue
-            except ValueError:
-                pass
+        location_marker = parts[0].split('.')[0].strip()
+        if location_marker.isdigit():
+            location_id = int(location_marker)
+            if location_id in location_map:
+                current_location = location_map[location_id]
+                # Sisa baris adalah ikan pertama di pulau ini
+                parts[0] = ''
         
         # Parse the fish line
         if len(parts) >= 4:
@@ -154,8 +218,10 @@ def parse_fish_data_by_island(fish_str: str) -> Dict[str, List[Dict[str, Any]]]:
             
             if current_location not in parsed_data:
                 parsed_data[current_location] = []
+                seen_names[current_location] = set()
             
-            if fish_name not in [f['name'] for f in parsed_data[current_location]]:
+            if fish_name not in seen_names[current_location]:
+                seen_names[current_location].add(fish_name)
                 parsed_data[current_location].append(fish_data)
                 
     return parsed_data
@@ -333,8 +399,155 @@ RAW_FISH_INPUT = """
 ,Beanie Leedsicheye,Common,2
 """
 
+# --- COMPILED FISH TABLE ---
+# Naikkan versi ini kalau format artifact berubah; perubahan parser sudah tertangkap oleh checksum
+CATALOG_FORMAT_VERSION = 1
+CATALOG_FISH_FIELDS = {
+    "name": str, "rarity": str, "chance": float, "weight_min": (int, float),
+    "weight_max": (int, float), "is_secret_weight": bool, "base_price": float,
+}
+
+def fish_parser_fingerprint():
+    """Source of parse_fish_data_by_island: covers secret_weights, the base_price formula and the parsing rules."""
+    try:
+        return inspect.getsource(parse_fish_data_by_island)
+    except OSError:
+        # Tanpa file sumber (mis. hanya .pyc): bytecode dan konstanta berubah kalau logikanya berubah
+        code = parse_fish_data_by_island.__code__
+        return f"{code.co_code.hex()}\n{code.co_consts!r}"
+
+def fish_catalog_checksum():
+    """SHA-256 over everything the artifact is derived from: format version, parser and RAW_FISH_INPUT."""
+    digest = hashlib.sha256(f"{CATALOG_FORMAT_VERSION}\n".encode())
+    digest.update(fish_parser_fingerprint().encode())
+    digest.update(RAW_FISH_INPUT.encode())
+    return digest.hexdigest()
+
+def validate_fish_catalog(artifact):
+    """Raise ValueError unless the artifact matches the compiled catalog schema."""
+    if not isinstance(artifact, dict):
+        raise ValueError("catalog artifact must be an object")
+    if artifact.get("version") != CATALOG_FORMAT_VERSION:
+        raise ValueError(f"unsupported catalog version {artifact.get('version')!r}")
+    if not isinstance(artifact.get("checksum"), str):
+        raise ValueError("catalog checksum missing")
+    islands = artifact.get("islands")
+    if not isinstance(islands, dict):
+        raise ValueError("catalog islands must be an object")
+    for island, pool in islands.items():
+        if island not in ISLAND_DATA or not isinstance(pool, list):
+            raise ValueError(f"invalid island entry {island!r}")
+        for fish in pool:
+            if not isinstance(fish, dict) or fish.keys() != CATALOG_FISH_FIELDS.keys():
+                raise ValueError(f"invalid fish entry on {island}: {fish!r}")
+            for field, field_type in CATALOG_FISH_FIELDS.items():
+                if not isinstance(fish[field], field_type):
+                    raise ValueError(f"invalid {field} for {fish['name']!r} on {island}")
+            if fish["rarity"] not in RARITY_COLORS:
+                raise ValueError(f"unknown rarity {fish['rarity']!r} for {fish['name']!r}")
+
+def compile_fish_catalog(path=FISH_CATALOG_PATH):
+    """Parse RAW_FISH_INPUT and write the versioned JSON artifact loaded at startup."""
+    islands = parse_fish_data_by_island(RAW_FISH_INPUT)
+    artifact = {"version": CATALOG_FORMAT_VERSION, "checksum": fish_catalog_checksum(), "islands": islands}
+    validate_fish_catalog(artifact)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return islands
+
+def load_fish_pool(path=FISH_CATALOG_PATH):
+    # Fast path: artifact yang valid dan checksum-nya cocok dengan RAW_FISH_INPUT
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            artifact = json.load(f)
+        validate_fish_catalog(artifact)
+        if artifact["checksum"] == fish_catalog_checksum():
+            return artifact["islands"]
+        print(f"Fish catalog {path} is stale, reparsing RAW_FISH_INPUT.")
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Ignoring fish catalog {path}: {e}")
+
+    # Fallback: parse ulang, lalu coba simpan untuk start berikutnya
+    try:
+        return compile_fish_catalog(path)
+    except OSError:
+        return parse_fish_data_by_island(RAW_FISH_INPUT)
+
 # GLOBAL POOL for easy reference, but fishing will use the specific pool
-FISH_POOL_BY_ISLAND = parse_fish_data_by_island(RAW_FISH_INPUT)
+FISH_POOL_BY_ISLAND = load_fish_pool()
+
+RARITY_TIERS = ["Common", "Uncommon", "Rare", "Epic", "Legendary", "Mythic", "Secret"]
+RARITY_TIER_IDS = {name: i for i, name in enumerate(RARITY_TIERS)}
+
+
+class FishCatalog:
+    """Every fish interned once with a small integer ID, attributes stored in parallel arrays.
+
+    A fish shared by several islands (Ruby, Sea Shell, ...) gets one ID. Same name with
+    different stats (Parrot Fish is Uncommon on Crater Island, Rare in Ancient Jungle)
+    gets separate IDs; ``keys`` tells them apart for inventory storage.
+    """
+
+    def __init__(self, pool_by_island):
+        self.names: List[str] = []
+        self.keys: List[str] = []
+        self.rarity = array("B")
+        self.chance = array("d")
+        self.weight_min = array("d")
+        self.weight_max = array("d")
+        self.base_price = array("d")
+        self.is_secret_weight = array("B")
+        self.ids_by_key: Dict[str, int] = {}
+        # ID per tier rarity, urut naik (untuk jual per rarity tanpa scan seluruh inventory)
+        self.ids_by_tier = [array("H") for _ in RARITY_TIERS]
+        # Pool per pulau = members[start:end]
+        self.members = array("H")
+        self.island_slices: Dict[str, Tuple[int, int]] = {}
+
+        interned: Dict[Tuple[str, str, float], int] = {}
+        for island, pool in pool_by_island.items():
+            start = len(self.members)
+            for fish in pool:
+                signature = (fish["name"], fish["rarity"], fish["chance"])
+                fish_id = interned.get(signature)
+                if fish_id is None:
+                    fish_id = interned[signature] = self._add(fish)
+                self.members.append(fish_id)
+            self.island_slices[island] = (start, len(self.members))
+
+    def _add(self, fish):
+        fish_id = len(self.names)
+        key = fish["name"]
+        if key in self.ids_by_key:
+            key = f"{fish['name']} [{fish['rarity']}]"
+        self.names.append(fish["name"])
+        self.keys.append(key)
+        self.ids_by_key[key] = fish_id
+        self.rarity.append(RARITY_TIER_IDS[fish["rarity"]])
+        self.ids_by_tier[RARITY_TIER_IDS[fish["rarity"]]].append(fish_id)
+        self.chance.append(fish["chance"])
+        self.weight_min.append(fish["weight_min"])
+        self.weight_max.append(fish["weight_max"])
+        self.base_price.append(fish["base_price"])
+        self.is_secret_weight.append(fish["is_secret_weight"])
+        return fish_id
+
+    def __len__(self):
+        return len(self.names)
+
+    def island_fish_ids(self, island):
+        start, end = self.island_slices.get(island, (0, 0))
+        return self.members[start:end]
+
+    def rarity_name(self, fish_id):
+        return RARITY_TIERS[self.rarity[fish_id]]
+
+
+FISH_CATALOG = FishCatalog(FISH_POOL_BY_ISLAND)
 
 
 ROD_DATA = {
@@ -374,463 +587,3131 @@ BAIT_DATA = {
 QUEST_DATA = {
     "Lava Rod Quest": {"type": "catch_rarity", "rarity": "Rare", "goal": 3, "reward_item": "Lava Rod", "title": "Kohana Quest: Catch 3 Rare Fish"},
     "Ghostfinn Rod Quest": {"type": "catch_rarity", "rarity": "Mythic", "goal": 3, "reward_item": "Ghostfinn Rod", "title": "Deep Sea Quest: Catch 3 Mythic Fish"},
-    "Element Rod Quest": {"type": "catch_rarity", "rarity": "Secret", "goal": 1, "reward_item": "Element Rod", "title": "Final Trial: Catch 1 Secret Fish"},
+    # Element Rod Quest hanya bisa di-progress setelah punya Ghostfinn
+    "Element Rod Quest": {"type": "catch_rarity", "rarity": "Secret", "goal": 1, "reward_item": "Element Rod", "requires_rod": "Ghostfinn Rod", "title": "Final Trial: Catch 1 Secret Fish"},
     "daily_1": {"type": "catch_rarity", "rarity": "Common", "goal": 5, "reward_koin": 500, "title": "Daily: Catch 5 Common Fish"},
     "daily_2": {"type": "sell_count", "goal": 10, "reward_koin": 1000, "title": "Daily: Sell 10 Fish"},
 }
 
 
-# --- UTILITY FUNCTIONS ---
+# --- QUEST INDEX ---
+# Quest di-index berdasarkan (trigger_type, rarity) supaya update hanya menyentuh quest yang cocok
 
-def get_user_stats(user_id):
-    if user_id not in USER_DATA:
-        initial_progress = {q_id: 0 for q_id in QUEST_DATA if q_id.endswith("Quest")}
-        
-        USER_DATA[user_id] = {
-            "koin": 500.0,
-            "current_rod": "Starter Rod",
-            "current_bait": "Starter Bait",
-            "location": "Fisherman Island",
-            "unlocked_islands": ["Fisherman Island"],
-            "last_fished": 0,
-            "inventory": {}, 
-            "owned_rods": ["Starter Rod"], 
-            "owned_baits": ["Starter Bait"], 
-            "rod_enchantment": {"Starter Rod": 0},
-            "quest_progress": initial_progress, 
-            "daily_quests": generate_daily_quests(),
-            "last_daily_reset": time.time(),
-        }
-    
-    if time.time() - USER_DATA[user_id]["last_daily_reset"] > 24 * 3600:
-        USER_DATA[user_id]["daily_quests"] = generate_daily_quests()
-        USER_DATA[user_id]["last_daily_reset"] = time.time()
+def quest_trigger_key(q_data):
+    if q_data["type"] == "catch_rarity":
+        return ("catch", q_data["rarity"])
+    if q_data["type"] == "sell_count":
+        return ("sell", None)
+    return (q_data["type"], None)
 
-    return USER_DATA[user_id]
+PERMANENT_QUESTS_BY_TRIGGER: Dict[Tuple[str, Optional[str]], List[str]] = {}
+DAILY_QUESTS_BY_TRIGGER: Dict[Tuple[str, Optional[str]], set] = {}
+for _q_id, _q_data in QUEST_DATA.items():
+    if _q_id.endswith("Quest"):
+        PERMANENT_QUESTS_BY_TRIGGER.setdefault(quest_trigger_key(_q_data), []).append(_q_id)
+    elif _q_id.startswith("daily_"):
+        DAILY_QUESTS_BY_TRIGGER.setdefault(quest_trigger_key(_q_data), set()).add(_q_id)
 
-def generate_daily_quests():
-    pool = [data for q_id, data in QUEST_DATA.items() if q_id.startswith("daily_")]
-    return {
-        f"daily_{i}": {**random.choice(pool), "progress": 0, "claimed": False}
-        for i in range(3)
-    }
 
-def calculate_total_luck(user_stats):
-    rod = ROD_DATA.get(user_stats["current_rod"], ROD_DATA["Starter Rod"])
-    bait = BAIT_DATA.get(user_stats["current_bait"], BAIT_DATA["Starter Bait"])
-    
-    ench_level = user_stats["rod_enchantment"].get(user_stats["current_rod"], 0)
-    ench_luck = ench_level * 10 
-    
-    total_luck = rod["luck_bonus"] + bait["luck_bonus"] + ench_luck
-    
-    total_luck *= GLOBAL_EVENT_BOOST["luck_multiplier"]
-    
-    return int(total_luck)
+# --- USER STATS RECORD ---
+# ID integer untuk data statis; urutan mengikuti dict di atas
+ISLAND_IDS = {name: i for i, name in enumerate(ISLAND_LIST)}
+ROD_LIST = list(ROD_DATA.keys())
+ROD_IDS = {name: i for i, name in enumerate(ROD_LIST)}
+BAIT_LIST = list(BAIT_DATA.keys())
+BAIT_IDS = {name: i for i, name in enumerate(BAIT_LIST)}
+PERMANENT_QUEST_LIST = [q_id for q_id in QUEST_DATA if q_id.endswith("Quest")]
+PERMANENT_QUEST_IDS = {q_id: i for i, q_id in enumerate(PERMANENT_QUEST_LIST)}
 
-def update_quest_progress(user_stats, trigger_type, value=None, item_name=None, rarity=None):
-    # Quest Rod (Permanent)
-    for q_id, q_data in QUEST_DATA.items():
-        if q_id.endswith("Quest"):
-            progress = user_stats["quest_progress"].get(q_id, 0)
-            if progress < q_data["goal"]: 
-                if q_data["type"] == "catch_rarity" and trigger_type == "catch" and rarity == q_data["rarity"]:
-                    # Logic: Element Rod Quest hanya bisa di-progress setelah punya Ghostfinn
-                    if q_id == "Element Rod Quest" and "Ghostfinn Rod" not in user_stats["owned_rods"]:
-                        continue
-                        
-                    user_stats["quest_progress"][q_id] = min(user_stats["quest_progress"].get(q_id, 0) + (value or 1), q_data["goal"])
 
-    # Daily Quests
-    for q_id, q_data in user_stats["daily_quests"].items():
-        if not q_data["claimed"] and q_data["progress"] < q_data["goal"]:
-            if q_data["type"] == "catch_rarity" and trigger_type == "catch" and rarity == q_data["rarity"]:
-                q_data["progress"] = min(q_data["progress"] + (value or 1), q_data["goal"])
-            elif q_data["type"] == "sell_count" and trigger_type == "sell":
-                q_data["progress"] = min(q_data["progress"] + value, q_data["goal"])
-                
-def check_quest_completion(user_stats):
-    completed_count = 0
-    
-    # Quest Rod (Permanent)
-    for q_id, q_data in QUEST_DATA.items():
-         if q_id.endswith("Quest"):
-            progress = user_stats["quest_progress"].get(q_id, 0)
-            # 1.5 menandakan sudah completed tapi belum diklaim (jika 1.5 = sudah diklaim)
-            if progress >= q_data["goal"] and progress < q_data["goal"] + 0.5: 
-                completed_count += 1
-                
-    # Daily Quests
-    for q_id, q_data in user_stats["daily_quests"].items():
-        if q_data["progress"] >= q_data["goal"] and not q_data["claimed"]:
-            completed_count += 1
-            
-    return completed_count
+class BitSetView:
+    """List-like view (``in``, iteration, ``append``) over a name bitmask stored on UserStats."""
+    __slots__ = ("owner", "attr", "names", "ids")
 
-def perform_fishing(user_stats):
-    total_luck = calculate_total_luck(user_stats)
-    current_location = user_stats["location"]
-    
-    fish_pool_location = FISH_POOL_BY_ISLAND.get(current_location, [])
-    
-    if not fish_pool_location: 
-        return "Failed", f"No fish data found for **{current_location}**.", "0.00", "Failed", 0.00
-        
-    choices = []
-    weights = []
-    
-    for fish in fish_pool_location:
-        base_chance = fish["chance"]
-        
-        # Formula untuk Adjusted Weight: Luck mempengaruhi peluang mendapatkan ikan langka.
-        # Semakin kecil base_chance (semakin langka), semakin besar bobotnya jika luck tinggi.
-        adjusted_weight = (1 / base_chance) * (1 + (total_luck / 100))
-        
-        choices.append(fish)
-        weights.append(adjusted_weight)
-    
-    # Pilih ikan berdasarkan weights
-    chosen_fish = random.choices(choices, weights=weights, k=1)[0]
-    
-    # Tentukan berat ikan
-    weight_kg = random.uniform(chosen_fish["weight_min"], chosen_fish["weight_max"])
-    
-    rod_data = ROD_DATA.get(user_stats["current_rod"])
-    max_rod_weight = rod_data["max_weight_kg"]
-    
-    # Weight Check (Gagal Tarik)
-    if weight_kg > max_rod_weight:
-        update_quest_progress(user_stats, "catch", value=1, rarity=chosen_fish["rarity"]) 
-        return "Failed", f"LOST IT! The **{chosen_fish['name']}**'s weight ({weight_kg:,.2f} kg) exceeded your **{user_stats['current_rod']}** capacity ({max_rod_weight:,} kg). You need a stronger Rod to catch this {chosen_fish['rarity']} fish!", f"{weight_kg:,.2f}", chosen_fish["rarity"], 0.00
+    def __init__(self, owner, attr, names, ids):
+        self.owner = owner
+        self.attr = attr
+        self.names = names
+        self.ids = ids
 
-    # Success
-    weight_ratio = max(1.0, float(weight_kg) / float(chosen_fish["weight_min"]))
-    coins_earned = chosen_fish["base_price"] * weight_ratio
-    
-    user_stats["koin"] += coins_earned
-    fish_name = chosen_fish['name']
-    user_stats["inventory"][fish_name] = user_stats["inventory"].get(fish_name, 0) + 1
-    
-    update_quest_progress(user_stats, "catch", value=1, rarity=chosen_fish["rarity"])
+    def __contains__(self, name):
+        item_id = self.ids.get(name)
+        return item_id is not None and (getattr(self.owner, self.attr) >> item_id) & 1 == 1
 
-    return "Success", chosen_fish, f"{weight_kg:,.2f}", chosen_fish["rarity"], coins_earned
+    def __iter__(self):
+        mask = getattr(self.owner, self.attr)
+        return (name for i, name in enumerate(self.names) if (mask >> i) & 1)
 
+    def __len__(self):
+        return bin(getattr(self.owner, self.attr)).count("1")
 
-# --- DISCORD BOT VIEWS (Interactions) ---
-class BackView(View):
-    def __init__(self, user_id, bot_instance, timeout=120):
-        super().__init__(timeout=timeout)
-        self.user_id = user_id
-        self.bot = bot_instance
+    def __repr__(self):
+        return repr(list(self))
 
-    @discord.ui.button(label="↩️ Main Menu", style=discord.ButtonStyle.secondary, row=4)
-    async def back_to_main_menu(self, button: Button, interaction: discord.Interaction):
-        if interaction.user.id != self.user_id:
-            return await interaction.response.send_message("This is not your menu!", ephemeral=True)
-        
-        main_view = MainMenuView(self.user_id, self.bot)
-        await interaction.response.edit_message(
-            embed=main_view.create_main_embed(), 
-            view=main_view
-        )
+    def append(self, name):
+        setattr(self.owner, self.attr, getattr(self.owner, self.attr) | (1 << self.ids[name]))
 
-class MainMenuView(BackView):
-    def __init__(self, user_id, bot_instance):
-        super().__init__(user_id, bot_instance)
-        self.clear_items() 
 
-        self.add_item(Button(label="🎣 Auto Fishing", custom_id="main_fish", style=discord.ButtonStyle.green)) 
-        
-        self.add_item(Button(label="🌍 Travel", custom_id="main_travel", style=discord.ButtonStyle.blurple))
-        self.add_item(Button(label="🏪 Shop & Sell", custom_id="main_shop", style=discord.ButtonStyle.blurple))
-        self.add_item(Button(label="⚙️ Equip & Upgrade", custom_id="main_equip", style=discord.ButtonStyle.blurple))
+class IdArrayView(MutableMapping):
+    """Dict-like view (name -> value) over an array indexed by interned ID. Zero means absent."""
+    __slots__ = ("data", "names", "ids")
 
-        self.add_item(Button(label="⭐ Quests", custom_id="main_quests", style=discord.ButtonStyle.red))
-        self.add_item(Button(label="🏆 Leaderboard", custom_id="main_top", style=discord.ButtonStyle.red))
-        self.add_item(Button(label="👤 Profile", custom_id="main_profile", style=discord.ButtonStyle.grey))
-        
-        # Tambahkan callback untuk semua tombol di Main Menu
-        for item in self.children:
-            if isinstance(item, Button) and item.custom_id.startswith("main_"):
-                item.callback = self.main_menu_callback
-
-    def create_main_embed(self):
-        user_stats = get_user_stats(self.user_id)
-        embed = discord.Embed(
-            title="🐠 Welcome to the Auto Fishing Bot!",
-            description="Use the buttons below to manage your automated fishing journey.",
-            color=0x4169E1
-        )
-        
-        embed.add_field(name=f"💰 Money ({CURRENCY_SYMBOL})", value=f"**{CURRENCY_SYMBOL}{user_stats['koin']:,.2f}**", inline=True)
-        embed.add_field(name="📍 Location", value=user_stats['location'], inline=True)
-        
-        completed = check_quest_completion(user_stats)
-        luck_text = f"Total Luck: {calculate_total_luck(user_stats)}%"
-        if GLOBAL_EVENT_BOOST["is_active"]:
-            luck_text += f" (Event x{GLOBAL_EVENT_BOOST['luck_multiplier']:.0f})"
+    def __init__(self, data, names, ids):
+        self.data = data
+        self.names = names
+        self.ids = ids
 
-        if completed > 0:
-            embed.set_footer(text=f"⭐ {completed} Quests Ready to Claim! Press 'Quests' button. | {luck_text}")
-        else:
-            embed.set_footer(text=f"{luck_text} | Happy Fishing!")
-            
-        return embed
-    
-    async def main_menu_callback(self, interaction: discord.Interaction):
-        if interaction.user.id != self.user_id:
-            return await interaction.response.send_message("This is not your menu!", ephemeral=True)
-        
-        custom_id = interaction.data['custom_id']
-        user_stats = get_user_stats(self.user_id)
-        
-        if custom_id == "main_fish":
-            fish_view = AutoFishingView(self.user_id, self.bot)
-            await interaction.response.edit_message(
-                embed=fish_view.create_fishing_embed(user_stats),
-                view=fish_view
-            )
-        elif custom_id == "main_travel":
-            travel_view = TravelView(self.user_id, self.bot)
-            await interaction.response.edit_message(
-                embed=travel_view.create_travel_embed(user_stats),
-                view=travel_view
-            )
-        # TODO: Implement remaining menu options (Shop, Equip, Quests, etc.)
+    def __getitem__(self, name):
+        item_id = self.ids[name]
+        if item_id >= len(self.data) or not self.data[item_id]:
+            raise KeyError(name)
+        return self.data[item_id]
+
+    def __setitem__(self, name, value):
+        item_id = self.ids[name]
+        if item_id >= len(self.data):
+            self.data.extend([0] * (item_id + 1 - len(self.data)))
+        self.data[item_id] = value
+
+    def __delitem__(self, name):
+        self[name]  # KeyError kalau memang tidak ada
+        self.data[self.ids[name]] = 0
+
+    def __iter__(self):
+        return (self.names[i] for i, value in enumerate(self.data) if value)
+
+    def __len__(self):
+        return sum(1 for value in self.data if value)
+
+
+class DailyQuest:
+    """One rolled daily quest: static fields come from QUEST_DATA, only progress is stored."""
+    __slots__ = ("quest_id", "progress", "claimed")
+
+    def __init__(self, quest_id, progress=0, claimed=False):
+        self.quest_id = quest_id
+        self.progress = progress
+        self.claimed = claimed
+
+    def __getitem__(self, key):
+        if key == "progress" or key == "claimed":
+            return getattr(self, key)
+        return QUEST_DATA[self.quest_id][key]
+
+    def __setitem__(self, key, value):
+        if key != "progress" and key != "claimed":
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+def pack_array(values):
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+def unpack_array(typecode, text):
+    values = array(typecode)
+    values.frombytes(base64.b64decode(text))
+    return values
+
+
+# Baris CatchLog dari data lama (sebelum stream index dicatat) tidak bisa di-replay
+CATCH_INDEX_UNKNOWN = 0xFFFFFFFF
+
+class CatchLog:
+    """Append-only roll history in parallel arrays, periodically compacted into per-fish aggregates.
+
+    Every roll is a raw row, misses included: fish id, weight kg, unix time, island id, plus what
+    replay_catch needs to reproduce it (stream index, total luck, rod id, rarity boost) and a lost
+    flag, at 22 bytes each. Rarity boosts are tuples, stored once per log in ``boosts`` and
+    referenced by index. Aggregates only count landed fish and are arrays indexed by fish ID:
+    catch count, total weight, heaviest weight and when it was caught. Coin value is not stored;
+    it follows from fish ID and weight (see catch_value).
+    """
+    __slots__ = ("fish", "weight", "time", "island", "index", "luck", "rod", "boost", "lost", "boosts",
+                 "count", "weight_sum", "weight_max", "weight_max_time")
+    ROW_COLUMNS = ("fish", "weight", "time", "island", "index", "luck", "rod", "boost", "lost")
+
+    def __init__(self):
+        self.fish = array("H")
+        self.weight = array("f")
+        self.time = array("I")
+        self.island = array("B")
+        self.index = array("I")
+        self.luck = array("I")
+        self.rod = array("B")
+        self.boost = array("B")
+        self.lost = array("B")
+        self.boosts: List[Tuple[float, ...]] = []
+        self.count = array("I")
+        self.weight_sum = array("d")
+        self.weight_max = array("f")
+        self.weight_max_time = array("I")
+
+    def __len__(self):
+        return sum(self.count) + len(self.fish) - sum(self.lost)
+
+    def copy(self):
+        log = CatchLog.__new__(CatchLog)
+        for slot in CatchLog.__slots__:
+            setattr(log, slot, getattr(self, slot)[:])
+        return log
+
+    def append(self, fish_id, weight_kg, timestamp, island_id, catch_index=CATCH_INDEX_UNKNOWN,
+               total_luck=0, rod_id=0, rarity_boost=(), lost=False):
+        self._add_row(fish_id, weight_kg, timestamp, island_id, catch_index, total_luck, rod_id, rarity_boost, lost)
+        if len(self.fish) >= CATCH_LOG_MAX:
+            self.compact(CATCH_LOG_KEEP)
+
+    def _add_row(self, fish_id, weight_kg, timestamp, island_id, catch_index, total_luck, rod_id, rarity_boost, lost):
+        if rarity_boost not in self.boosts:
+            self.boosts.append(rarity_boost)
+        self.fish.append(fish_id)
+        self.weight.append(weight_kg)
+        self.time.append(int(timestamp))
+        self.island.append(island_id)
+        self.index.append(catch_index)
+        self.luck.append(total_luck)
+        self.rod.append(rod_id)
+        self.boost.append(self.boosts.index(rarity_boost))
+        self.lost.append(lost)
+
+    def compact(self, keep=0):
+        """Fold all but the newest ``keep`` raw rows into the aggregates."""
+        cut = len(self.fish) - keep
+        if cut <= 0:
+            return
+        self._fold(self.count, self.weight_sum, self.weight_max, self.weight_max_time, cut)
+        for column in self.ROW_COLUMNS:
+            del getattr(self, column)[:cut]
+        # Boost yang tidak dipakai baris tersisa dibuang, supaya tabelnya tidak tumbuh terus
+        used = sorted(set(self.boost))
+        if len(used) < len(self.boosts):
+            remap = {old: new for new, old in enumerate(used)}
+            self.boosts = [self.boosts[i] for i in used]
+            self.boost = array("B", [remap[b] for b in self.boost])
+
+    def _fold(self, count, weight_sum, weight_max, weight_max_time, rows):
+        size = max(self.fish[:rows]) + 1
+        if size > len(count):
+            grow = size - len(count)
+            count.extend([0] * grow)
+            weight_sum.extend([0.0] * grow)
+            weight_max.extend([0.0] * grow)
+            weight_max_time.extend([0] * grow)
+        for fish_id, weight_kg, timestamp, lost in zip(self.fish[:rows], self.weight[:rows], self.time[:rows],
+                                                       self.lost[:rows]):
+            if lost:
+                continue
+            count[fish_id] += 1
+            weight_sum[fish_id] += weight_kg
+            if weight_kg > weight_max[fish_id]:
+                weight_max[fish_id] = weight_kg
+                weight_max_time[fish_id] = timestamp
+
+    def aggregates(self):
+        """(count, weight_sum, weight_max, weight_max_time) per fish ID, including raw rows not yet compacted."""
+        columns = (array("I", self.count), array("d", self.weight_sum),
+                   array("f", self.weight_max), array("I", self.weight_max_time))
+        if self.fish:
+            self._fold(*columns, len(self.fish))
+        return columns
+
+    def recent(self, n):
+        """Newest ``n`` landed fish from the raw rows, newest first."""
+        rows = []
+        for row in reversed(range(len(self.fish))):
+            if len(rows) == n:
+                break
+            if not self.lost[row]:
+                rows.append((self.fish[row], self.weight[row], self.time[row], self.island[row]))
+        return rows
+
+    def rolls(self):
+        """Raw rows with their replay inputs: (catch_index, fish_id, weight_kg, island_id, total_luck,
+        rod_id, rarity_boost, lost), oldest first."""
+        boosts = self.boosts
+        return [(index, fish_id, weight_kg, island_id, luck, rod_id, boosts[boost], bool(lost))
+                for fish_id, weight_kg, island_id, index, luck, rod_id, boost, lost in zip(
+                    self.fish, self.weight, self.island, self.index, self.luck, self.rod, self.boost, self.lost)]
+
+    # --- serialization: ID ikan/pulau/rod dipetakan ke key/nama, sama seperti inventory ---
+    def to_dict(self):
+        fish_ids = sorted(set(self.fish).union(f for f, n in enumerate(self.count) if n))
+        local_fish = {fish_id: i for i, fish_id in enumerate(fish_ids)}
+        island_ids = sorted(set(self.island))
+        local_island = {island_id: i for i, island_id in enumerate(island_ids)}
+        rod_ids = sorted(set(self.rod))
+        local_rod = {rod_id: i for i, rod_id in enumerate(rod_ids)}
+        # Ikan yang baru ada di baris mentah belum punya slot agregat
+        at = lambda column, fish_id: column[fish_id] if fish_id < len(column) else 0
+        return {
+            "fish_keys": [FISH_CATALOG.keys[f] for f in fish_ids],
+            "islands": [ISLAND_LIST[i] for i in island_ids],
+            "rods": [ROD_LIST[r] for r in rod_ids],
+            "boosts": [list(boost) for boost in self.boosts],
+            "fish": pack_array(array("H", [local_fish[f] for f in self.fish])),
+            "weight": pack_array(self.weight),
+            "time": pack_array(self.time),
+            "island": pack_array(array("B", [local_island[i] for i in self.island])),
+            "index": pack_array(self.index),
+            "luck": pack_array(self.luck),
+            "rod": pack_array(array("B", [local_rod[r] for r in self.rod])),
+            "boost": pack_array(self.boost),
+            "lost": pack_array(self.lost),
+            "count": pack_array(array("I", [at(self.count, f) for f in fish_ids])),
+            "weight_sum": pack_array(array("d", [at(self.weight_sum, f) for f in fish_ids])),
+            "weight_max": pack_array(array("f", [at(self.weight_max, f) for f in fish_ids])),
+            "weight_max_time": pack_array(array("I", [at(self.weight_max_time, f) for f in fish_ids])),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        log = cls()
+        # Ikan/pulau/rod yang sudah tidak ada di katalog dilewati (None)
+        fish_ids = [FISH_CATALOG.ids_by_key.get(key) for key in data["fish_keys"]]
+        island_ids = [ISLAND_IDS.get(name) for name in data["islands"]]
+        fish, island = unpack_array("H", data["fish"]), unpack_array("B", data["island"])
+        if "index" in data:
+            rod_ids = [ROD_IDS.get(name) for name in data["rods"]]
+            log.boosts = [tuple(boost) for boost in data["boosts"]]
+            rod = unpack_array("B", data["rod"])
+            replay = [unpack_array(code, data[name]) for code, name in
+                      (("I", "index"), ("I", "luck"), ("B", "boost"), ("B", "lost"))]
         else:
-            await interaction.response.send_message(f"Feature '{custom_id.replace('main_', '').title()}' not implemented yet.", ephemeral=True)
+            # Log dari sebelum input replay dicatat: hanya ikan yang berhasil, index tidak diketahui
+            rod_ids, log.boosts = [0], [()]
+            rod = array("B", [0]) * len(fish)
+            replay = [array(code, [value]) * len(fish) for code, value in
+                      (("I", CATCH_INDEX_UNKNOWN), ("I", 0), ("B", 0), ("B", 0))]
+        raw = [fish, unpack_array("f", data["weight"]), unpack_array("I", data["time"]), island,
+               replay[0], replay[1], rod, replay[2], replay[3]]
+        if None in fish_ids or None in island_ids or None in rod_ids:
+            rows = [r for r in range(len(fish))
+                    if fish_ids[fish[r]] is not None and island_ids[island[r]] is not None and rod_ids[rod[r]] is not None]
+            raw = [array(column.typecode, [column[r] for r in rows]) for column in raw]
+        fish, island, rod = raw[0], raw[3], raw[6]
+        raw[0] = array("H", [fish_ids[f] for f in fish])
+        raw[3] = array("B", [island_ids[i] for i in island])
+        raw[6] = array("B", [rod_ids[r] for r in rod])
+        for column, values in zip(cls.ROW_COLUMNS, raw):
+            setattr(log, column, values)
+
+        known = [(i, f) for i, f in enumerate(fish_ids) if f is not None]
+        if known:
+            size = max(f for _, f in known) + 1
+            log.count = array("I", [0] * size)
+            log.weight_sum = array("d", [0.0] * size)
+            log.weight_max = array("f", [0.0] * size)
+            log.weight_max_time = array("I", [0] * size)
+            stored = [unpack_array(code, data[name]) for code, name in
+                      (("I", "count"), ("d", "weight_sum"), ("f", "weight_max"), ("I", "weight_max_time"))]
+            for local_fish, fish_id in known:
+                log.count[fish_id] = stored[0][local_fish]
+                log.weight_sum[fish_id] = stored[1][local_fish]
+                log.weight_max[fish_id] = stored[2][local_fish]
+                log.weight_max_time[fish_id] = stored[3][local_fish]
+        return log
 
 
-class TravelLocationSelect(Select):
-    def __init__(self, user_stats, user_id):
-        options = [
-            discord.SelectOption(label=name, value=name, default=(name == user_stats['location']))
-            for name in user_stats["unlocked_islands"]
-        ]
-        super().__init__(placeholder="Set current location to fish...", options=options, custom_id="set_fishing_location", row=1)
+class UserStats:
+    """Compact per-user record. Keeps the old ``user_stats["key"]`` access working through views."""
+    __slots__ = (
+        "koin", "rod_id", "bait_id", "island_id", "unlocked_mask", "last_fished",
+        "inventory_counts", "owned_rod_mask", "owned_bait_mask", "enchant_levels",
+        "quest_values", "daily_quests", "daily_epoch", "claimable_quests",
+        "user_id", "total_catches", "rarest_tier", "favorite_mask", "catch_log",
+        "rng_seed", "catch_index",
+    )
+
+    KEYS = frozenset((
+        "koin", "current_rod", "current_bait", "location", "unlocked_islands", "last_fished",
+        "inventory", "owned_rods", "owned_baits", "rod_enchantment", "quest_progress",
+        "daily_quests", "last_daily_reset", "favorites",
+    ))
+
+    def __init__(self, user_id=0):
         self.user_id = user_id
-        
-    async def callback(self, interaction: discord.Interaction):
-        if interaction.user.id != self.user_id: return await interaction.response.send_message("Not your menu!", ephemeral=True)
-        user_stats = get_user_stats(self.user_id)
-        new_location = self.values[0]
-        user_stats["location"] = new_location
-        
-        travel_view = TravelView(self.user_id, interaction.client)
-        await interaction.response.edit_message(embed=travel_view.create_travel_embed(user_stats), view=travel_view)
-        await interaction.followup.send(f"📍 Lokasi memancing diatur ke **{new_location}**! Siap untuk tantangan ikan lokal.", ephemeral=True)
+        self.koin = 500.0
+        self.rod_id = ROD_IDS["Starter Rod"]
+        self.bait_id = BAIT_IDS["Starter Bait"]
+        self.island_id = ISLAND_IDS["Fisherman Island"]
+        self.unlocked_mask = 1 << ISLAND_IDS["Fisherman Island"]
+        self.last_fished = 0
+        self.inventory_counts = array("I")
+        self.owned_rod_mask = 1 << ROD_IDS["Starter Rod"]
+        self.owned_bait_mask = 1 << BAIT_IDS["Starter Bait"]
+        self.enchant_levels = array("H", [0] * len(ROD_LIST))
+        self.quest_values = array("d", [0] * len(PERMANENT_QUEST_LIST))
+        self.daily_quests = generate_daily_quests()
+        self.daily_epoch = CURRENT_DAILY_EPOCH
+        self.claimable_quests = 0
+        # Untuk leaderboard: jumlah ikan yang berhasil ditangkap dan tier terlangka (-1 = belum ada)
+        self.total_catches = 0
+        self.rarest_tier = -1
+        # Bit per fish ID: ikan favorit tidak ikut dijual oleh "Sell All Except Favorites"
+        self.favorite_mask = 0
+        self.catch_log = CatchLog()
+        # Stream RNG tangkapan (lihat roll_catch): seed rahasia per user + jumlah tangkapan yang sudah di-roll
+        self.rng_seed = secrets.randbits(64)
+        self.catch_index = 0
 
+    # --- dict-compatible access ---
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
 
-class TravelView(BackView):
-    def __init__(self, user_id, bot_instance):
-        super().__init__(user_id, bot_instance, timeout=300)
-        self.update_items()
-        
-    def create_travel_embed(self, user_stats):
-        embed = discord.Embed(
-            title="🌍 Travel to New Fishing Grounds",
-            description=f"Unlock new islands to access their unique fish pools and shop items. You are currently at **{user_stats['location']}**.",
-            color=0x3CB371
-        )
-        embed.add_field(name="Your Money", value=f"**{CURRENCY_SYMBOL}{user_stats['koin']:,.2f}**", inline=False)
-        
-        island_list = []
-        for name, data in ISLAND_DATA.items():
-            status = "✅ UNLOCKED" if name in user_stats["unlocked_islands"] else f"🔒 LOCKED ({CURRENCY_SYMBOL}{data['price']:,.2f})"
-            pool = FISH_POOL_BY_ISLAND.get(name, [])
-            max_rarity = max([f['rarity'] for f in pool]) if pool else "N/A"
-            island_list.append(f"**{name}** (Max Rarity: {max_rarity}) | {status}")
-            
-        embed.add_field(name="Available Islands", value="\n".join(island_list), inline=False)
-        return embed
+    def __setitem__(self, key, value):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        setattr(self, key, value)
 
-    def update_items(self):
-        self.clear_items()
-        user_stats = get_user_stats(self.user_id)
-        
-        next_island_to_unlock = None
-        for island_name in ISLAND_LIST:
-            if island_name not in user_stats["unlocked_islands"]:
-                next_island_to_unlock = island_name
-                break
-        
-        if next_island_to_unlock:
-            data = ISLAND_DATA[next_island_to_unlock]
-            self.add_item(Button(
-                label=f"Unlock {next_island_to_unlock} ({CURRENCY_SYMBOL}{data['price']:,})",
-                custom_id="travel_buy_next",
-                style=discord.ButtonStyle.primary,
-                row=0
-            ))
-        
-        unlocked_options = [
-            discord.SelectOption(label=name, value=name, default=(name == user_stats['location']))
-            for name in user_stats["unlocked_islands"]
-        ]
-        if unlocked_options:
-            self.add_item(TravelLocationSelect(user_stats, self.user_id))
-            
-        super().add_item(super().back_to_main_menu)
+    def __contains__(self, key):
+        return key in self.KEYS
 
-    @discord.ui.button(label="Buy Next Island", custom_id="travel_buy_next", style=discord.ButtonStyle.primary, row=0)
-    async def travel_buy_callback(self, button: Button, interaction: discord.Interaction):
-        # Callback logic is correct as provided in your initial code
-        if interaction.user.id != self.user_id: return await interaction.response.send_message("Not your menu!", ephemeral=True)
-        user_stats = get_user_stats(self.user_id)
-        
-        next_island_to_unlock = None
-        for island_name in ISLAND_LIST:
-            if island_name not in user_stats["unlocked_islands"]:
-                next_island_to_unlock = island_name
-                break
-        
-        if not next_island_to_unlock:
-            return await interaction.response.send_message("❌ You have unlocked all islands!", ephemeral=True)
-            
-        island_data = ISLAND_DATA[next_island_to_unlock]
-        price = island_data["price"]
-        
-        if user_stats["koin"] < price:
-            return await interaction.response.send_message(f"❌ Not enough coins! You need **{CURRENCY_SYMBOL}{price:,.2f}** to unlock **{next_island_to_unlock}**.", ephemeral=True)
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.KEYS else default
 
-        user_stats["koin"] -= price
-        user_stats["unlocked_islands"].append(next_island_to_unlock)
-        user_stats["location"] = next_island_to_unlock
-        
-        new_view = TravelView(self.user_id, self.bot)
-        await interaction.response.edit_message(embed=new_view.create_travel_embed(user_stats), view=new_view)
-        await interaction.followup.send(f"🎉 Unlocked and traveled to **{next_island_to_unlock}** for **{CURRENCY_SYMBOL}{price:,.2f}**! New challenges await!", ephemeral=True)
+    @property
+    def current_rod(self):
+        return ROD_LIST[self.rod_id]
 
+    @current_rod.setter
+    def current_rod(self, name):
+        self.rod_id = ROD_IDS[name]
 
-# --- Fish Implementation (Auto Fishing) ---
-class AutoFishingView(BackView):
-    COOLDOWN_TIME = 30 
+    @property
+    def current_bait(self):
+        return BAIT_LIST[self.bait_id]
 
-    def __init__(self, user_id, bot_instance):
-        super().__init__(user_id, bot_instance, timeout=300)
-        self.clear_items()
-        
-        user_stats = get_user_stats(user_id)
-        # Tentukan status tombol berdasarkan cooldown
-        is_cooldown = time.time() - user_stats["last_fished"] < self.COOLDOWN_TIME
-        
-        self.auto_fish_button = Button(
-            label="🎣 Reel In (Auto Fish)!", 
-            custom_id="auto_fish_button", 
-            style=discord.ButtonStyle.green, 
-            row=0,
-            disabled=is_cooldown
-        )
-        
-        self.add_item(self.auto_fish_button)
-        super().add_item(super().back_to_main_menu)
-        
-        # Tambahkan fungsi callback
-        self.auto_fish_button.callback = self.auto_fish_callback
-        
-    def create_fishing_embed(self, user_stats):
-        embed = discord.Embed(
-            title="🎣 Auto Fishing Management",
-            description=f"You are currently fishing at **{user_stats['location']}** with **{user_stats['current_rod']}** and **{user_stats['current_bait']}**.",
-            color=0x4169E1
-        )
-        remaining = max(0, self.COOLDOWN_TIME - (time.time() - user_stats["last_fished"]))
-        
-        embed.add_field(name="Cooldown Status", value=f"⏱️ Next Catch: **{remaining:.1f} seconds**", inline=False)
-        embed.add_field(name="Current Luck", value=f"✨ {calculate_total_luck(user_stats)}%", inline=True)
-        embed.add_field(name="Current Money", value=f"💰 {CURRENCY_SYMBOL}{user_stats['koin']:,.2f}", inline=True)
-        
-        return embed
+    @current_bait.setter
+    def current_bait(self, name):
+        self.bait_id = BAIT_IDS[name]
 
-    async def auto_fish_callback(self, interaction: discord.Interaction):
-        if interaction.user.id != self.user_id:
-            return await interaction.response.send_message("This is not your fishing pole!", ephemeral=True)
-            
-        user_stats = get_user_stats(self.user_id)
-        
-        if time.time() - user_stats["last_fished"] < self.COOLDOWN_TIME:
-            remaining = self.COOLDOWN_TIME - (time.time() - user_stats["last_fished"])
-            return await interaction.response.send_message(f"Your line is still out! Wait **{remaining:.1f}** seconds for the next catch.", ephemeral=True)
-        
-        user_stats["last_fished"] = time.time()
-        
-        status, result_data, weight, rarity, coins_earned = perform_fishing(user_stats)
-        
-        # Disable button while on cooldown
-        self.auto_fish_button.disabled = True
-        
-        embed = discord.Embed(title=f"🎣 Auto Fishing Catch at {user_stats['location']}!", 
-                              color=RARITY_COLORS.get(rarity, 0x000000))
-        
-        if status == "Success":
-            fish_name = result_data['name']
-
-            embed.description = f"🎉 **{rarity.upper()}!** You auto-reeled in a **{fish_name}**!"
-            embed.add_field(name="Result", 
-                            value=(f"**Rarity:** {rarity}\n"
-                                   f"**Weight:** {weight} kg\n"
-                                   f"**Reward:** **{CURRENCY_SYMBOL}{coins_earned:,.2f}**"), 
-                            inline=False)
-        else: # Failed
-            embed.description = status
-            embed.add_field(name="Weight Lost", value=f"**{weight} kg**", inline=False)
-            embed.color = RARITY_COLORS["Failed"]
-        
-        completed_quests = check_quest_completion(user_stats)
-        luck_text = f"Total Luck: {calculate_total_luck(user_stats)}%"
-        if GLOBAL_EVENT_BOOST["is_active"]:
-            luck_text += f" (Event x{GLOBAL_EVENT_BOOST['luck_multiplier']:.0f})"
-        
-        footer_text = f"{luck_text} | Next catch in {self.COOLDOWN_TIME}s."
-        if completed_quests > 0:
-             footer_text = f"⭐ {completed_quests} Quests Ready! | " + footer_text
-             
-        embed.set_footer(text=footer_text)
-        
-        # Update embed dan view
-        await interaction.response.edit_message(embed=self.create_fishing_embed(user_stats), view=self)
-        
-        # Kirim hasil pancingan sebagai follow-up message (Visible ke semua orang)
-        await interaction.followup.send(embed=embed)
+    @property
+    def location(self):
+        return ISLAND_LIST[self.island_id]
 
-        # Re-enable the button after cooldown (Ini perlu loop atau task, tapi kita pakai cara sederhana)
-        # Karena kita menggunakan edit_message, kita akan mengandalkan user untuk menekan lagi setelah cooldown habis.
+    @location.setter
+    def location(self, name):
+        self.island_id = ISLAND_IDS[name]
 
+    @property
+    def unlocked_islands(self):
+        return BitSetView(self, "unlocked_mask", ISLAND_LIST, ISLAND_IDS)
 
-# --- BOT EVENTS & COMMANDS ---
+    @unlocked_islands.setter
+    def unlocked_islands(self, names):
+        self.unlocked_mask = sum(1 << ISLAND_IDS[name] for name in set(names))
 
-@bot.event
-async def on_ready():
-    """Dipanggil saat bot berhasil login."""
-    print(f'Bot is ready. Logged in as {bot.user}')
-    await bot.change_presence(activity=discord.Game(name=f"R$ Fishing | /menu"))
-    
+    @property
+    def owned_rods(self):
+        return BitSetView(self, "owned_rod_mask", ROD_LIST, ROD_IDS)
+
+    @owned_rods.setter
+    def owned_rods(self, names):
+        self.owned_rod_mask = sum(1 << ROD_IDS[name] for name in set(names))
+
+    @property
+    def owned_baits(self):
+        return BitSetView(self, "owned_bait_mask", BAIT_LIST, BAIT_IDS)
+
+    @owned_baits.setter
+    def owned_baits(self, names):
+        self.owned_bait_mask = sum(1 << BAIT_IDS[name] for name in set(names))
+
+    @property
+    def inventory(self):
+        return IdArrayView(self.inventory_counts, FISH_CATALOG.keys, FISH_CATALOG.ids_by_key)
+
+    @inventory.setter
+    def inventory(self, counts):
+        self.inventory_counts = array("I")
+        for key, count in counts.items():
+            # Ikan yang sudah tidak ada di katalog dilewati
+            if key in FISH_CATALOG.ids_by_key:
+                self.add_fish(FISH_CATALOG.ids_by_key[key], count)
+
+    @property
+    def favorites(self):
+        return BitSetView(self, "favorite_mask", FISH_CATALOG.keys, FISH_CATALOG.ids_by_key)
+
+    @favorites.setter
+    def favorites(self, keys):
+        # Ikan yang sudah tidak ada di katalog dilewati
+        self.favorite_mask = sum(1 << FISH_CATALOG.ids_by_key[key] for key in set(keys) if key in FISH_CATALOG.ids_by_key)
+
+    def add_fish(self, fish_id, count=1):
+        counts = self.inventory_counts
+        if fish_id >= len(counts):
+            counts.extend([0] * (fish_id + 1 - len(counts)))
+        counts[fish_id] += count
+        self.total_catches += count
+        tier = FISH_CATALOG.rarity[fish_id]
+        if tier > self.rarest_tier:
+            self.rarest_tier = tier
+
+    @property
+    def rod_enchantment(self):
+        return IdArrayView(self.enchant_levels, ROD_LIST, ROD_IDS)
+
+    @rod_enchantment.setter
+    def rod_enchantment(self, levels):
+        self.enchant_levels = array("H", [0] * len(ROD_LIST))
+        for name, level in levels.items():
+            self.enchant_levels[ROD_IDS[name]] = level
+
+    @property
+    def last_daily_reset(self):
+        return self.daily_epoch * DAILY_RESET_SECONDS
+
+    @last_daily_reset.setter
+    def last_daily_reset(self, timestamp):
+        self.daily_epoch = int(timestamp // DAILY_RESET_SECONDS)
+
+    @property
+    def quest_progress(self):
+        return IdArrayView(self.quest_values, PERMANENT_QUEST_LIST, PERMANENT_QUEST_IDS)
+
+    @quest_progress.setter
+    def quest_progress(self, progress):
+        self.quest_values = array("d", [0] * len(PERMANENT_QUEST_LIST))
+        for q_id, value in progress.items():
+            if q_id in PERMANENT_QUEST_IDS:
+                self.quest_values[PERMANENT_QUEST_IDS[q_id]] = value
+
+    def recount_claimable_quests(self):
+        # Full scan, hanya saat load atau daily quest di-generate ulang
+        count = 0
+        for q_id, progress in self.quest_progress.items():
+            goal = QUEST_DATA[q_id]["goal"]
+            # 1.5 menandakan sudah completed tapi belum diklaim (jika 1.5 = sudah diklaim)
+            if goal <= progress < goal + 0.5:
+                count += 1
+        for q_data in self.daily_quests.values():
+            if q_data["progress"] >= q_data["goal"] and not q_data["claimed"]:
+                count += 1
+        self.claimable_quests = count
+        return count
+
+    def snapshot(self):
+        """Copy of every slot for rollback; containers are copied, immutable values shared."""
+        state = {slot: getattr(self, slot) for slot in UserStats.__slots__}
+        for slot in ("inventory_counts", "enchant_levels", "quest_values"):
+            state[slot] = state[slot][:]
+        state["daily_quests"] = {key: DailyQuest(q.quest_id, q.progress, q.claimed)
+                                 for key, q in self.daily_quests.items()}
+        state["catch_log"] = self.catch_log.copy()
+        return state
+
+    def restore(self, state):
+        # Di tempat (in-place), karena handler masih memegang referensi ke record ini
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+    # --- serialization (nama, bukan ID, supaya aman kalau urutan data statis berubah) ---
+    def to_dict(self):
+        return {
+            "koin": self.koin,
+            "current_rod": self.current_rod,
+            "current_bait": self.current_bait,
+            "location": self.location,
+            "unlocked_islands": list(self.unlocked_islands),
+            "last_fished": self.last_fished,
+            "inventory": dict(self.inventory),
+            "favorites": list(self.favorites),
+            "owned_rods": list(self.owned_rods),
+            "owned_baits": list(self.owned_baits),
+            "rod_enchantment": dict(self.rod_enchantment),
+            "quest_progress": dict(self.quest_progress),
+            "daily_quests": {
+                key: {"quest_id": q.quest_id, "progress": q.progress, "claimed": q.claimed}
+                for key, q in self.daily_quests.items()
+            },
+            "daily_epoch": self.daily_epoch,
+            "total_catches": self.total_catches,
+            "rarest_tier": self.rarest_tier,
+            "catch_log": self.catch_log.to_dict(),
+            "rng_seed": self.rng_seed,
+            "catch_index": self.catch_index,
+        }
+
+    @classmethod
+    def from_dict(cls, data, user_id=0):
+        stats = cls(user_id)
+        for key in cls.KEYS:
+            if key in data and key != "daily_quests":
+                setattr(stats, key, data[key])
+
+        quest_ids_by_title = {q["title"]: q_id for q_id, q in QUEST_DATA.items()}
+        daily_quests = {}
+        for key, q in data.get("daily_quests", {}).items():
+            # Format lama menyimpan salinan QUEST_DATA tanpa quest_id
+            quest_id = q.get("quest_id") or quest_ids_by_title.get(q.get("title"))
+            if quest_id in QUEST_DATA:
+                daily_quests[key] = DailyQuest(quest_id, q.get("progress", 0), q.get("claimed", False))
+        if daily_quests:
+            stats.daily_quests = daily_quests
+        if "daily_epoch" in data:
+            stats.daily_epoch = data["daily_epoch"]
+        # Record lama: hitung ulang dari inventory (inventory setter memanggil add_fish)
+        if "total_catches" in data:
+            stats.total_catches = data["total_catches"]
+            stats.rarest_tier = data["rarest_tier"]
+        if "catch_log" in data:
+            stats.catch_log = CatchLog.from_dict(data["catch_log"])
+        # Record lama belum punya stream: tetap memakai seed baru dari konstruktor
+        if "rng_seed" in data:
+            stats.rng_seed = data["rng_seed"]
+            stats.catch_index = data["catch_index"]
+        stats.recount_claimable_quests()
+        return stats
+
+
+# --- METRICS ---
+# Endpoint teks format Prometheus di 127.0.0.1:FISHING_METRICS_PORT (0 = mati); di mode shard proses i memakai port + i.
+METRICS_PORT = int(os.environ.get('FISHING_METRICS_PORT', '0'))
+METRICS_ENABLED = METRICS_PORT > 0
+# Sampling profiler (GET /debug/profile?seconds=N) hanya tersedia kalau FISHING_PROFILER=1
+PROFILER_ENABLED = os.environ.get('FISHING_PROFILER', '') == '1'
+PROFILER_INTERVAL_MS = 5
+PROFILER_MAX_SECONDS = 60
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 3.0, 5.0)
+# Discord membatalkan interaction yang tidak dijawab dalam 3 detik
+INTERACTION_DEADLINE = 3.0
+METRICS: List[Any] = []
+
+def render_labels(label, label_value, extra=""):
+    pairs = [f'{label}="{label_value}"'] if label and label_value is not None else []
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    """Monotonic counter, optionally split by one label."""
+
+    def __init__(self, name, help_text, label=None):
+        self.name, self.help_text, self.label = name, help_text, label
+        self.values: Dict[Any, float] = {}
+        METRICS.append(self)
+
+    def inc(self, label_value=None, amount=1):
+        self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{render_labels(self.label, v)} {n}" for v, n in self.values.items()]
+        return "\n".join(lines) + "\n"
+
+class Histogram:
+    """Fixed-bucket histogram (seconds), optionally split by one label; observe is one bisect."""
+
+    def __init__(self, name, help_text, label=None, buckets=LATENCY_BUCKETS):
+        self.name, self.help_text, self.label = name, help_text, label
+        self.buckets = buckets
+        # label_value -> [hitungan per bucket (+Inf di akhir), total detik]
+        self.series: Dict[Any, list] = {}
+        METRICS.append(self)
+
+    def observe(self, value, label_value=None):
+        series = self.series.get(label_value)
+        if series is None:
+            series = self.series[label_value] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_value, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), counts):
+                cumulative += n
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{render_labels(self.label, label_value, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{render_labels(self.label, label_value)} {total}")
+            lines.append(f"{self.name}_count{render_labels(self.label, label_value)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+class Gauge:
+    """Value read at scrape time from ``collect()`` (a number, or {label_value: number})."""
+
+    def __init__(self, name, help_text, collect, label=None, kind="gauge"):
+        self.name, self.help_text, self.collect, self.label, self.kind = name, help_text, collect, label, kind
+        METRICS.append(self)
+
+    def render(self):
+        value = self.collect()
+        values = value if isinstance(value, dict) else {None: value}
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{self.name}{render_labels(self.label, v)} {n}" for v, n in values.items()]
+        return "\n".join(lines) + "\n"
+
+def timed(histogram, label_value=None):
+    """Catat durasi setiap panggilan ke histogram; tanpa overhead sama sekali kalau metrics mati.
+
+    Untuk ``async def`` yang diukur adalah sampai coroutine selesai, bukan saat coroutine dibuat.
+    """
+    def decorator(fn):
+        if not METRICS_ENABLED:
+            return fn
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started, label_value)
+            return async_wrapper
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, label_value)
+        return wrapper
+    return decorator
+
+GET_USER_STATS_SECONDS = Histogram("fishing_get_user_stats_seconds", "Time to fetch (and load if needed) a user record.")
+FISHING_SECONDS = Histogram("fishing_perform_fishing_seconds", "Time to resolve a catch.", label="mode")
+EMBED_BUILD_SECONDS = Histogram("fishing_embed_build_seconds", "Time to build an embed (cache misses only).", label="embed")
+INTERACTION_HANDLER_SECONDS = Histogram("fishing_interaction_handler_seconds", "Time spent in the interaction handler.", label="action")
+INTERACTION_RESPONSE_SECONDS = Histogram(
+    "fishing_interaction_response_seconds",
+    "Age of the interaction (from its snowflake) when it was first answered; Discord's deadline is 3 s.", label="action")
+INTERACTION_DEADLINE_MISSED = Counter("fishing_interaction_deadline_missed_total",
+                                      "Interactions answered after Discord's 3 s deadline.", label="action")
+INTERACTION_ERRORS = Counter("fishing_interaction_errors_total", "Interaction handlers that raised.", label="action")
+OUTBOUND_LATENCY_SECONDS = Histogram("fishing_outbound_latency_seconds", "Enqueue-to-send latency of follow-ups.", label="priority")
+
+class TimedInteractionResponse(discord.InteractionResponse):
+    """InteractionResponse that remembers when the first answer (defer, send, edit, modal) went out.
+
+    py-cord sets ``_responded`` once the callback request succeeded; a property in its place
+    stamps the time, so handlers keep calling ``interaction.response`` as usual.
+    """
+
+    __slots__ = ("responded_at", "_done")
+
+    def __init__(self, parent):
+        self.responded_at = None
+        super().__init__(parent)
+
+    @property
+    def _responded(self):
+        return self._done
+
+    @_responded.setter
+    def _responded(self, value):
+        if value and self.responded_at is None:
+            self.responded_at = time.time()
+        self._done = value
+
+def track_response(interaction):
+    """Install TimedInteractionResponse, as long as nothing has used ``interaction.response`` yet."""
+    if METRICS_ENABLED and isinstance(interaction, discord.Interaction) and not hasattr(interaction, "_cs_response"):
+        interaction._cs_response = TimedInteractionResponse(interaction)
+
+def observe_interaction(action, interaction, started):
+    if not METRICS_ENABLED:
+        return
+    INTERACTION_HANDLER_SECONDS.observe(time.perf_counter() - started, action)
+    # Deadline Discord berlaku untuk jawaban pertama, bukan untuk sisa handler sesudahnya
+    answered = getattr(interaction.response, "responded_at", None) or time.time()
+    age = answered - discord.utils.snowflake_time(interaction.id).timestamp()
+    INTERACTION_RESPONSE_SECONDS.observe(age, action)
+    if age > INTERACTION_DEADLINE:
+        INTERACTION_DEADLINE_MISSED.inc(action)
+
+def render_metrics():
+    return "".join(metric.render() for metric in METRICS)
+
+def collapse_stack(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+def format_collapsed(counts):
+    """Collapsed stacks ("outer;inner count"), format flamegraph.pl/speedscope."""
+    return "".join(f"{stack} {n}\n" for stack, n in sorted(counts.items(), key=lambda item: -item[1]))
+
+def sample_stacks(thread_id, seconds, interval):
+    """Fallback sampler: polls another thread's stack. Biased toward points where that thread releases the GIL."""
+    counts: Dict[str, int] = {}
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            key = collapse_stack(frame)
+            counts[key] = counts.get(key, 0) + 1
+        time.sleep(interval)
+    return format_collapsed(counts)
+
+# Satu profil sekaligus: SIGPROF handler dan ITIMER_PROF berlaku untuk seluruh proses
+PROFILE_LOCK = asyncio.Lock()
+
+async def profile_loop(seconds, loop_thread_id):
+    """Sample the event loop thread for ``seconds``.
+
+    On Unix in the main thread this uses SIGPROF (CPU time), so idle time in select()
+    is not counted and busy handlers show up in proportion to the CPU they burn.
+    Runs hold PROFILE_LOCK; a second one waits for the first.
+    """
+    async with PROFILE_LOCK:
+        interval = PROFILER_INTERVAL_MS / 1000
+        if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+            return await asyncio.to_thread(sample_stacks, loop_thread_id, seconds, interval)
+        counts: Dict[str, int] = {}
+
+        def on_sample(signum, frame):
+            key = collapse_stack(frame)
+            counts[key] = counts.get(key, 0) + 1
+
+        previous = signal.signal(signal.SIGPROF, on_sample)
+        signal.setitimer(signal.ITIMER_PROF, interval, interval)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, previous)
+        return format_collapsed(counts)
+
+async def handle_metrics_request(reader, writer, loop_thread_id):
     try:
-        synced = await bot.tree.sync()
-        print(f"Synced {len(synced)} command(s)")
-    except Exception as e:
-        print(f"Failed to sync commands: {e}")
-
-@bot.tree.command(name="menu", description="Membuka Menu Utama Bot Memancing Interaktif.")
-async def menu_command(interaction: discord.Interaction):
-    user_id = interaction.user.id
-    # Memastikan user stats terinisialisasi
-    get_user_stats(user_id) 
-    
-    main_view = MainMenuView(user_id, bot)
-    await interaction.response.send_message(
-        embed=main_view.create_main_embed(), 
-        view=main_view,
-        ephemeral=True # Hanya bisa dilihat oleh pengguna (disarankan untuk menu)
-    )
+        request_line = (await reader.readline()).decode("latin-1").split()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        target = request_line[1] if len(request_line) > 1 else "/"
+        path, _, query = target.partition("?")
+        status, content_type, body = "404 Not Found", "text/plain", "not found\n"
+        if path == "/metrics":
+            status, content_type, body = "200 OK", "text/plain; version=0.0.4", render_metrics()
+        elif path == "/debug/profile" and PROFILER_ENABLED and PROFILE_LOCK.locked():
+            status, body = "409 Conflict", "a profile is already running\n"
+        elif path == "/debug/profile" and PROFILER_ENABLED:
+            seconds = min(float(urllib.parse.parse_qs(query).get("seconds", ["10"])[0]), PROFILER_MAX_SECONDS)
+            body = await profile_loop(seconds, loop_thread_id)
+            status = "200 OK"
+        data = body.encode()
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(data)}\r\n"
+                     f"Connection: close\r\n\r\n".encode() + data)
+        await writer.drain()
+    except (ConnectionError, ValueError) as e:
+        print(f"Metrics request failed: {e}")
+    finally:
+        writer.close()
 
-# --- RUN BOT ---
+async def serve_metrics():
+    """Background task: HTTP endpoint for /metrics (and /debug/profile when the profiler is enabled)."""
+    loop_thread_id = threading.get_ident()
+    server = await asyncio.start_server(lambda r, w: handle_metrics_request(r, w, loop_thread_id),
+                                        "127.0.0.1", METRICS_PORT + PROCESS_INDEX)
+    async with server:
+        await server.serve_forever()
 
-# Untuk Replit: Anda harus mengimpor dan memanggil keep_alive di sini
-# from keep_alive import keep_alive
-# keep_alive()
 
-if TOKEN:
-    bot.run(TOKEN)
-else:
-    print("FATAL ERROR: Bot tidak dapat dijalankan karena Token Discord tidak ditemukan.")
+# --- CPU OFFLOAD ---
+# Job di bawah batas ini lebih murah dijalankan langsung daripada dikirim (pickle + IPC) ke pool.
+# Nilai awal hanya tebakan; calibrate_cpu_jobs menggantinya dengan overhead pool yang terukur
+OFFLOAD_MIN_SECONDS = 0.005
+LOOP_LAG_INTERVAL = 0.1
+# Perkiraan detik per unit tiap jenis job: diukur saat start, lalu moving average dari job inline
+CPU_JOB_COSTS: Dict[str, float] = {"catches": 10e-6}
+OFFLOAD_POOL: Optional[ProcessPoolExecutor] = None
+
+CPU_JOB_SECONDS = Histogram("fishing_cpu_job_seconds", "Wall time of CPU jobs as seen by the event loop.", "kind")
+CPU_JOBS_DEFERRED = Counter("fishing_cpu_jobs_deferred_total", "Interactions deferred because their job could exceed the latency budget.", "kind")
+LOOP_LAG_SECONDS = Histogram("fishing_event_loop_lag_seconds", "How late a periodic timer fired, i.e. how long the loop was blocked.")
+
+def init_offload_worker():
+    # Ctrl+C ditangani proses utama, yang juga mematikan pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def start_offload_pool(workers=OFFLOAD_WORKERS):
+    """Start the process pool. Call before the bot opens connections or threads.
+
+    With fork, workers share the parent's catalog arrays copy-on-write instead of rebuilding them.
+    """
+    global OFFLOAD_POOL
+    if workers > 0 and OFFLOAD_POOL is None:
+        context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+        OFFLOAD_POOL = ProcessPoolExecutor(workers, mp_context=context, initializer=init_offload_worker)
+        # Worker dibuat sekarang, bukan saat job pertama datang
+        for future in [OFFLOAD_POOL.submit(os.getpid) for _ in range(workers)]:
+            future.result()
+    calibrate_cpu_jobs()
+
+def calibrate_cpu_jobs(units=MAX_OFFLINE_CATCHES, rounds=5):
+    """Replace the guessed costs with measured ones: seconds per catch inline, and the extra
+    round-trip time of the same job through the pool (the OFFLOAD_MIN_SECONDS threshold)."""
+    global OFFLOAD_MIN_SECONDS
+    job = (ISLAND_LIST[0], 0, ROD_IDS["Starter Rod"], NO_RARITY_BOOST, 1, 0, units)
+    inline = pooled = math.inf
+    for _ in range(rounds):
+        started = time.perf_counter()
+        resolve_catches(*job)
+        inline = min(inline, time.perf_counter() - started)
+        if OFFLOAD_POOL is not None:
+            started = time.perf_counter()
+            OFFLOAD_POOL.submit(resolve_catches, *job).result()
+            pooled = min(pooled, time.perf_counter() - started)
+    CPU_JOB_COSTS["catches"] = inline / units
+    if OFFLOAD_POOL is not None:
+        OFFLOAD_MIN_SECONDS = max(0.0, pooled - inline)
+    offload = f"offload from {OFFLOAD_MIN_SECONDS * 1000:.2f} ms" if OFFLOAD_POOL is not None else "offload off"
+    print(f"CPU jobs calibrated: {CPU_JOB_COSTS['catches'] * 1e6:.1f} us/catch, {offload}")
+
+def stop_offload_pool():
+    global OFFLOAD_POOL
+    if OFFLOAD_POOL is not None:
+        OFFLOAD_POOL.shutdown(cancel_futures=True)
+        OFFLOAD_POOL = None
+
+async def run_cpu_job(kind, units, fn, *args, interaction=None):
+    """Run CPU-bound ``fn(*args)`` (module-level, picklable) without holding up other interactions.
+
+    The estimate is ``units`` x the measured cost per unit of ``kind``. If it is over the latency
+    budget, ``interaction`` is deferred first, so the acknowledgement never waits on the job. If it
+    is over OFFLOAD_MIN_SECONDS and the pool is running, the job runs in the pool; otherwise inline.
+    """
+    estimate = units * CPU_JOB_COSTS[kind]
+    if interaction is not None and estimate > LATENCY_BUDGET_MS / 1000 and not interaction.response.is_done():
+        await interaction.response.defer()
+        CPU_JOBS_DEFERRED.inc(kind)
+
+    started = time.perf_counter()
+    pool = OFFLOAD_POOL
+    if pool is not None and estimate >= OFFLOAD_MIN_SECONDS:
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+        except BrokenProcessPool as e:
+            # Worker mati (mis. OOM): request ini dan berikutnya dilayani di loop
+            disable_offload_pool(pool, e)
+            pool = None
+    else:
+        pool = None
+    if pool is None:
+        inline_started = time.perf_counter()
+        result = fn(*args)
+        # Hanya durasi inline yang masuk ke estimasi; waktu lewat pool ikut menghitung IPC dan antrian
+        CPU_JOB_COSTS[kind] += 0.2 * ((time.perf_counter() - inline_started) / max(units, 1) - CPU_JOB_COSTS[kind])
+    if METRICS_ENABLED:
+        CPU_JOB_SECONDS.observe(time.perf_counter() - started, kind)
+    return result
+
+def disable_offload_pool(pool, error):
+    """Stop offloading after a worker died; logged once, however many jobs were in flight.
+
+    The pool is not recreated: forking once the bot has connections and threads is unsafe
+    (see start_offload_pool), so CPU jobs run inline until the next restart.
+    """
+    global OFFLOAD_POOL
+    if OFFLOAD_POOL is not pool:
+        return
+    OFFLOAD_POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+    print(f"Offload pool broken, CPU jobs run inline until restart: {error}")
+
+async def monitor_loop_lag():
+    """Background task: how late a LOOP_LAG_INTERVAL timer fires = how long something blocked the loop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - started - LOOP_LAG_INTERVAL))
+
+
+# --- PERSISTENCE (Write-Behind Storage) ---
+
+class UserStore:
+    """Storage backend for USER_DATA. Subclass this to plug in a different database.
+
+    Rows are ``(user_id, data_json, koin, total_catches, rarest_tier)``; the score columns
+    let the leaderboard start without loading every user.
+    """
+
+    def load(self, user_id) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def load_scores(self) -> List[Tuple[int, float, int, int]]:
+        raise NotImplementedError
+
+    def save_many(self, rows: List[Tuple[int, str, float, int, int]]):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class SQLiteUserStore(UserStore):
+    """Default backend: one JSON row per user in a WAL-mode SQLite file."""
+
+    SCORE_COLUMNS = {"koin": "REAL NOT NULL DEFAULT 0", "total_catches": "INTEGER NOT NULL DEFAULT 0",
+                     "rarest_tier": "INTEGER NOT NULL DEFAULT -1"}
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # BEGIN IMMEDIATE: proses shard lain yang membuka file yang sama menunggu sampai migrasi selesai
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS users (user_id INTEGER PRIMARY KEY, data TEXT NOT NULL)")
+        # Migrasi database lama yang belum punya kolom skor
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(users)")}
+        for column, column_type in self.SCORE_COLUMNS.items():
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE users ADD COLUMN {column} {column_type}")
+        self.conn.commit()
+
+    def load(self, user_id):
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load_scores(self):
+        with self.lock:
+            return self.conn.execute("SELECT user_id, koin, total_catches, rarest_tier FROM users").fetchall()
+
+    def save_many(self, rows):
+        # Satu transaksi per batch: setelah crash, batch ini tersimpan semua atau tidak sama sekali
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO users (user_id, data, koin, total_catches, rarest_tier) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data, koin = excluded.koin, "
+                "total_catches = excluded.total_catches, rarest_tier = excluded.rarest_tier",
+                rows,
+            )
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+def user_partition(user_id, partitions):
+    """Hash user_id ke 0..partitions-1. Bit rendah snowflake tidak merata, jadi diacak (Fibonacci hashing)."""
+    return ((user_id * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) * partitions >> 64
+
+class PartitionedUserStore(UserStore):
+    """Spreads users over several stores by user_partition(user_id), each with its own file and writer."""
+
+    def __init__(self, stores):
+        self.stores = stores
+
+    def store_for(self, user_id):
+        return self.stores[user_partition(user_id, len(self.stores))]
+
+    def load(self, user_id):
+        return self.store_for(user_id).load(user_id)
+
+    def load_scores(self):
+        return [row for store in self.stores for row in store.load_scores()]
+
+    def save_many(self, rows):
+        groups: Dict[int, List[Tuple]] = {}
+        for row in rows:
+            groups.setdefault(user_partition(row[0], len(self.stores)), []).append(row)
+        for index, group in groups.items():
+            self.stores[index].save_many(group)
+
+    def close(self):
+        for store in self.stores:
+            store.close()
+
+def partition_paths(path, partitions):
+    if path == ":memory:":
+        return [path] * partitions
+    root, ext = os.path.splitext(path)
+    return [f"{root}.{index}{ext}" for index in range(partitions)]
+
+# Dibuka saat pertama dipakai (startup bot atau tool), bukan saat import: import main tidak membuat file database
+USER_STORE: Optional[UserStore] = None
+
+def open_user_store():
+    if DB_PARTITIONS > 1:
+        return PartitionedUserStore([SQLiteUserStore(path) for path in partition_paths(DB_PATH, DB_PARTITIONS)])
+    return SQLiteUserStore(DB_PATH)
+
+def user_store():
+    global USER_STORE
+    if USER_STORE is None:
+        USER_STORE = open_user_store()
+    return USER_STORE
+
+def close_user_store():
+    global USER_STORE
+    if USER_STORE is not None:
+        USER_STORE.close()
+        USER_STORE = None
+
+_DIRTY_USERS = set()
+# Row user yang sudah di-evict tapi belum ditulis, dan batch yang sedang ditulis
+_PENDING_WRITES: Dict[int, Tuple] = {}
+_IN_FLIGHT_WRITES: Dict[int, Tuple] = {}
+
+def mark_dirty(user_id):
+    _DIRTY_USERS.add(user_id)
+
+def user_row(user_id, stats):
+    return (user_id, json.dumps(stats.to_dict()), stats.koin, stats.total_catches, stats.rarest_tier)
+
+def collect_dirty_rows():
+    rows = dict(_PENDING_WRITES)
+    _PENDING_WRITES.clear()
+    for user_id in _DIRTY_USERS:
+        if user_id in USER_DATA:
+            rows[user_id] = user_row(user_id, USER_DATA[user_id])
+    _DIRTY_USERS.clear()
+    return list(rows.values())
+
+def requeue_rows(rows):
+    """Put rows that were collected but not written back, so the next flush (or the shutdown
+    flush_dirty_users) writes them. Resident users are re-serialized; an evicted user keeps a
+    newer row from eviction if there is one."""
+    for row in rows:
+        if row[0] in USER_DATA:
+            _DIRTY_USERS.add(row[0])
+        else:
+            _PENDING_WRITES.setdefault(row[0], row)
+
+async def collect_dirty_rows_incrementally():
+    """collect_dirty_rows for the running bot: serializes FLUSH_CHUNK_USERS users at a time and
+    yields to the loop between chunks, so one flush of thousands of users is not one long stall."""
+    rows = {}
+    user_ids = list(_DIRTY_USERS)
+    try:
+        for start in range(0, len(user_ids), FLUSH_CHUNK_USERS):
+            for user_id in user_ids[start:start + FLUSH_CHUNK_USERS]:
+                # Bisa sudah di-evict selama yield sebelumnya; row-nya kalau begitu ada di _PENDING_WRITES
+                if user_id not in _DIRTY_USERS:
+                    continue
+                _DIRTY_USERS.discard(user_id)
+                if user_id in USER_DATA:
+                    # Langsung in-flight: kalau user di-evict lalu dimuat lagi sebelum flush, load_user memakai row ini
+                    rows[user_id] = _IN_FLIGHT_WRITES[user_id] = user_row(user_id, USER_DATA[user_id])
+            await asyncio.sleep(0)
+    except BaseException:
+        # Dibatalkan di tengah (shutdown): yang sudah diambil dari _DIRTY_USERS jangan sampai hilang
+        requeue_rows(rows.values())
+        for user_id in rows:
+            _IN_FLIGHT_WRITES.pop(user_id, None)
+        raise
+    # Row dari eviction selalu lebih baru daripada yang diserialisasi sebelum user itu di-evict
+    rows.update(_PENDING_WRITES)
+    _PENDING_WRITES.clear()
+    return list(rows.values())
+
+def flush_dirty_users():
+    rows = collect_dirty_rows()
+    if rows:
+        user_store().save_many(rows)
+    return len(rows)
+
+async def write_behind_flusher():
+    """Background task: writes every changed user in one transaction per interval."""
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL_MS / 1000)
+        rows = await collect_dirty_rows_incrementally()
+        if not rows:
+            continue
+        _IN_FLIGHT_WRITES.update((row[0], row) for row in rows)
+        try:
+            await asyncio.to_thread(user_store().save_many, rows)
+            if BUS is not None:
+                # Proses shard lain memperbarui leaderboard mereka dari skor ini
+                await asyncio.to_thread(BUS.publish, "scores", [(row[0],) + row[2:] for row in rows])
+        except asyncio.CancelledError:
+            # Shutdown saat menulis: thread-nya mungkin belum selesai, jadi flush terakhir menulis ulang
+            requeue_rows(rows)
+            raise
+        except Exception as e:
+            print(f"Failed to flush {len(rows)} user(s): {e}")
+            # Coba lagi di interval berikutnya
+            requeue_rows(rows)
+        finally:
+            _IN_FLIGHT_WRITES.clear()
+
+def load_user(user_id):
+    # Data yang belum sampai ke disk lebih baru dari isi database
+    row = _PENDING_WRITES.pop(user_id, None) or _IN_FLIGHT_WRITES.get(user_id)
+    stored = json.loads(row[1]) if row is not None else user_store().load(user_id)
+    return UserStats.from_dict(stored, user_id) if stored is not None else None
+
+def evict_idle_users():
+    skipped = 0
+    while len(USER_DATA) > MAX_RESIDENT_USERS and skipped < len(USER_DATA):
+        user_id, stats = USER_DATA.popitem(last=False)
+        if user_busy(user_id):
+            # Sedang dipakai transaksi, jangan di-evict di tengah jalan; dicoba lagi di eviction berikutnya
+            USER_DATA[user_id] = stats
+            USER_CACHE_STATS["busy_skips"] += 1
+            skipped += 1
+            continue
+        if user_id in _DIRTY_USERS:
+            _DIRTY_USERS.discard(user_id)
+            _PENDING_WRITES[user_id] = user_row(user_id, stats)
+        USER_CACHE_STATS["evictions"] += 1
+
+def get_user_cache_stats():
+    return {**USER_CACHE_STATS, "resident": len(USER_DATA), "pending_writes": len(_PENDING_WRITES)}
+
+
+# --- SHARD PROCESSES (Ownership & Pub/Sub) ---
+def owns_user(user_id):
+    """Hanya proses pemilik yang boleh memuat/mengubah state user; interaksi lain diteruskan ke sana."""
+    return SHARD_PROCESSES == 1 or user_partition(user_id, SHARD_PROCESSES) == PROCESS_INDEX
+
+class ProcessBus:
+    """Local pub/sub between shard processes: a shared WAL-mode SQLite table that every process polls."""
+
+    def __init__(self, path, process_index):
+        self.process_index = process_index
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("BEGIN IMMEDIATE")
+        # target NULL = broadcast ke semua proses selain pengirim
+        self.conn.execute("CREATE TABLE IF NOT EXISTS messages (id INTEGER PRIMARY KEY AUTOINCREMENT, sender INTEGER NOT NULL, "
+                          "target INTEGER, topic TEXT NOT NULL, payload TEXT NOT NULL, created REAL NOT NULL)")
+        # Pesan terakhir per topic yang di-retain, dibaca proses yang baru start
+        self.conn.execute("CREATE TABLE IF NOT EXISTS retained (topic TEXT PRIMARY KEY, payload TEXT NOT NULL)")
+        self.conn.commit()
+        self.last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM messages").fetchone()[0]
+
+    def publish(self, topic, payload, target=None, retain=False):
+        data = json.dumps(payload)
+        with self.lock, self.conn:
+            self.conn.execute("INSERT INTO messages (sender, target, topic, payload, created) VALUES (?, ?, ?, ?, ?)",
+                              (self.process_index, target, topic, data, time.time()))
+            if retain:
+                self.conn.execute("INSERT OR REPLACE INTO retained (topic, payload) VALUES (?, ?)", (topic, data))
+
+    def retained(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT topic, payload FROM retained").fetchall()
+        return [(topic, json.loads(payload)) for topic, payload in rows]
+
+    def poll(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT id, sender, target, topic, payload FROM messages WHERE id > ? ORDER BY id",
+                                     (self.last_id,)).fetchall()
+        if rows:
+            self.last_id = rows[-1][0]
+        return [(topic, json.loads(payload)) for _, sender, target, topic, payload in rows
+                if target == self.process_index or (target is None and sender != self.process_index)]
+
+    def prune(self, max_age):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM messages WHERE created < ?", (time.time() - max_age,))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+BUS: Optional[ProcessBus] = ProcessBus(BUS_PATH, PROCESS_INDEX) if SHARD_PROCESSES > 1 else None
+BUS_MESSAGE_TTL = 60
+BUS_HANDLERS: Dict[str, Any] = {}
+
+def bus_handler(topic):
+    def decorator(fn):
+        BUS_HANDLERS[topic] = fn
+        return fn
+    return decorator
+
+async def bus_listener():
+    """Background task: applies retained settings, then dispatches bus messages from other shard processes."""
+    for topic, payload in await asyncio.to_thread(BUS.retained):
+        # Topic retained dari versi lama yang sudah tidak dipakai dilewati
+        if topic in BUS_HANDLERS:
+            BUS_HANDLERS[topic](payload)
+    last_prune = time.time()
+    while True:
+        await asyncio.sleep(BUS_POLL_MS / 1000)
+        try:
+            messages = await asyncio.to_thread(BUS.poll)
+            if time.time() - last_prune > BUS_MESSAGE_TTL:
+                last_prune = time.time()
+                await asyncio.to_thread(BUS.prune, BUS_MESSAGE_TTL)
+        except sqlite3.Error as e:
+            print(f"Failed to poll shard bus: {e}")
+            continue
+        for topic, payload in messages:
+            try:
+                BUS_HANDLERS[topic](payload)
+            except Exception as e:
+                print(f"Failed to handle bus message '{topic}': {e}")
+
+async def forward_interaction(interaction, user_id):
+    # Raw payload dikirim ulang ke proses pemilik; di sana diproses seperti event gateway biasa
+    await asyncio.to_thread(BUS.publish, "interaction", interaction._raw_data,
+                            target=user_partition(user_id, SHARD_PROCESSES))
+
+@bus_handler("interaction")
+def handle_forwarded_interaction(payload):
+    bot._connection.parse_interaction_create(payload)
+
+
+# --- CONCURRENCY (Per-User Locks) ---
+# Satu lock per user yang sedang bertransaksi: user_id -> [lock, jumlah pemegang + penunggu].
+# Entri dihapus saat tidak ada yang memakai, jadi jumlahnya mengikuti user aktif, bukan semua user.
+_USER_LOCKS: Dict[int, list] = {}
+
+def user_busy(user_id):
+    return user_id in _USER_LOCKS
+
+@contextlib.asynccontextmanager
+async def user_transaction(user_id):
+    """Hold the user's own lock for an in-memory read-check-write; on any exception restore the record and re-raise.
+
+    Only state changes belong in the block. Discord requests go after it, so a slow edit never
+    holds the lock and a failed one does not undo a change that was already committed.
+    """
+    entry = _USER_LOCKS.get(user_id)
+    if entry is None:
+        entry = _USER_LOCKS[user_id] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            user_stats = get_user_stats(user_id)
+            snapshot = user_stats.snapshot()
+            try:
+                yield user_stats
+            except BaseException:
+                user_stats.restore(snapshot)
+                raise
+            else:
+                mark_dirty(user_id)
+            finally:
+                update_leaderboards(user_stats)
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _USER_LOCKS[user_id]
+
+
+# --- LEADERBOARD ---
+LEADERBOARD_PAGE_SIZE = 10
+LEADERBOARD_CACHE_TTL = 15 # detik
+
+class SortedChunks:
+    """Sorted list kept as chunks of ``load``..2*``load`` items (the sortedcontainers layout).
+
+    A Fenwick tree over chunk lengths turns "items before chunk c" and "chunk holding position p"
+    into O(log chunks) lookups, so add, remove, index and slicing cost O(log n) plus a memmove
+    inside one chunk. Splits and merges rebuild the tree in O(chunks), once per ~load changes.
+    """
+
+    def __init__(self, items=(), load=1000):
+        self.load = load
+        items = sorted(items)
+        self.chunks = [items[i:i + load] for i in range(0, len(items), load)]
+        self.maxes = [chunk[-1] for chunk in self.chunks]
+        self.size = len(items)
+        self._rebuild_index()
+
+    def __len__(self):
+        return self.size
+
+    def _rebuild_index(self):
+        tree = [0] * (len(self.chunks) + 1)
+        for i, chunk in enumerate(self.chunks, 1):
+            tree[i] += len(chunk)
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self.tree = tree
+
+    def _resize(self, chunk_index, delta):
+        i = chunk_index + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def _offset(self, chunk_index):
+        total, i = 0, chunk_index
+        while i:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, position):
+        """(chunk index, index inside it) of absolute ``position``, by descending the Fenwick tree."""
+        chunk_index, remaining = 0, position
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            nxt = chunk_index + step
+            if nxt < len(self.tree) and self.tree[nxt] <= remaining:
+                chunk_index = nxt
+                remaining -= self.tree[nxt]
+            step >>= 1
+        return chunk_index, remaining
+
+    def add(self, value):
+        self.size += 1
+        if not self.chunks:
+            self.chunks, self.maxes = [[value]], [value]
+            return self._rebuild_index()
+        c = bisect.bisect_left(self.maxes, value)
+        if c == len(self.chunks):
+            c -= 1
+            self.chunks[c].append(value)
+            self.maxes[c] = value
+        else:
+            bisect.insort(self.chunks[c], value)
+        if len(self.chunks[c]) > 2 * self.load:
+            self._rechunk(c, c + 1)
+        else:
+            self._resize(c, 1)
+
+    def remove(self, value):
+        c = bisect.bisect_left(self.maxes, value)
+        chunk = self.chunks[c]
+        del chunk[bisect.bisect_left(chunk, value)]
+        self.size -= 1
+        if len(chunk) < self.load // 2 and len(self.chunks) > 1:
+            # Gabung dengan tetangga supaya jumlah chunk tetap ~n/load
+            self._rechunk(c - 1 if c else c, c + 1 if c else c + 2)
+        elif not chunk:
+            del self.chunks[c], self.maxes[c]
+            self._rebuild_index()
+        else:
+            self.maxes[c] = chunk[-1]
+            self._resize(c, -1)
+
+    def _rechunk(self, start, stop):
+        merged = [value for chunk in self.chunks[start:stop] for value in chunk]
+        parts = round(len(merged) / (1.5 * self.load))
+        # Lebih dari 2*load harus benar-benar dipecah, kalau tidak chunk yang sama di-rechunk tiap add
+        parts = max(2 if len(merged) > 2 * self.load else 1, parts)
+        size = -(-len(merged) // parts)
+        rechunked = [merged[i:i + size] for i in range(0, len(merged), size)]
+        self.chunks[start:stop] = rechunked
+        self.maxes[start:stop] = [chunk[-1] for chunk in rechunked]
+        self._rebuild_index()
+
+    def index(self, value):
+        """Number of items smaller than ``value``."""
+        c = bisect.bisect_left(self.maxes, value)
+        if c == len(self.chunks):
+            return self.size
+        return self._offset(c) + bisect.bisect_left(self.chunks[c], value)
+
+    def slice(self, start, stop):
+        stop = min(stop, self.size)
+        if start >= stop:
+            return []
+        c, i = self._locate(start)
+        items = []
+        while len(items) < stop - start:
+            items.extend(self.chunks[c][i:i + stop - start - len(items)])
+            c, i = c + 1, 0
+        return items
+
+class Leaderboard:
+    """All users ordered by score (highest first) in SortedChunks; update and rank lookup are O(log n)."""
+
+    def __init__(self, title, format_score):
+        self.title = title
+        self.format_score = format_score
+        self.entries = SortedChunks()  # (-score, user_id), terurut naik
+        self.scores: Dict[int, float] = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def update(self, user_id, score):
+        old_score = self.scores.get(user_id)
+        if old_score == score:
+            return
+        if old_score is not None:
+            self.entries.remove((-old_score, user_id))
+        self.scores[user_id] = score
+        self.entries.add((-score, user_id))
+
+    def update_many(self, pairs):
+        """Apply (user_id, score) pairs; a batch at least as large as the board is rebuilt with one sort."""
+        if len(pairs) < len(self.scores):
+            for user_id, score in pairs:
+                self.update(user_id, score)
+            return
+        self.scores.update(pairs)
+        self.entries = SortedChunks((-score, user_id) for user_id, score in self.scores.items())
+
+    def rank(self, user_id):
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        return self.entries.index((-score, user_id)) + 1
+
+    def top(self, count, start=0):
+        return [(user_id, -neg_score) for neg_score, user_id in self.entries.slice(start, start + count)]
+
+LEADERBOARDS = {
+    "koin": Leaderboard("💰 Richest", lambda score: f"{CURRENCY_SYMBOL}{score:,.2f}"),
+    "catches": Leaderboard("🎣 Most Catches", lambda score: f"{score:,} fish"),
+    "rarest": Leaderboard("🌟 Rarest Catch", lambda score: RARITY_TIERS[score]),
+}
+# (board, page) -> (expires_at, rendered text)
+_LEADERBOARD_PAGE_CACHE: Dict[Tuple[str, int], Tuple[float, str]] = {}
+
+def update_leaderboards(user_stats):
+    user_id = user_stats.user_id
+    LEADERBOARDS["koin"].update(user_id, round(user_stats.koin, 2))
+    LEADERBOARDS["catches"].update(user_id, user_stats.total_catches)
+    if user_stats.rarest_tier >= 0:
+        LEADERBOARDS["rarest"].update(user_id, user_stats.rarest_tier)
+
+def load_leaderboards():
+    # Skor semua user (termasuk yang tidak resident) dibaca dari kolom skor, tanpa parse JSON
+    apply_scores(user_store().load_scores())
+
+@bus_handler("scores")
+def apply_scores(rows):
+    LEADERBOARDS["koin"].update_many([(row[0], round(row[1], 2)) for row in rows])
+    LEADERBOARDS["catches"].update_many([(row[0], row[2]) for row in rows])
+    LEADERBOARDS["rarest"].update_many([(row[0], row[3]) for row in rows if row[3] >= 0])
+
+def render_leaderboard_page(board_name, page=0):
+    key = (board_name, page)
+    cached = _LEADERBOARD_PAGE_CACHE.get(key)
+    if cached and cached[0] > time.time():
+        return cached[1]
+
+    board = LEADERBOARDS[board_name]
+    start = page * LEADERBOARD_PAGE_SIZE
+    lines = [
+        f"**#{start + i + 1}** <@{user_id}> — {board.format_score(score)}"
+        for i, (user_id, score) in enumerate(board.top(LEADERBOARD_PAGE_SIZE, start))
+    ]
+    text = "\n".join(lines) or "No players yet."
+    _LEADERBOARD_PAGE_CACHE[key] = (time.time() + LEADERBOARD_CACHE_TTL, text)
+    return text
+
+
+# --- UTILITY FUNCTIONS ---
+
+@timed(GET_USER_STATS_SECONDS)
+def get_user_stats(user_id):
+    # Hanya baca; perubahan lewat user_transaction, yang menandai user dirty saat commit
+    if user_id in USER_DATA:
+        USER_CACHE_STATS["hits"] += 1
+        USER_DATA.move_to_end(user_id)
+    else:
+        USER_CACHE_STATS["misses"] += 1
+        stored = load_user(user_id)
+        if stored is not None:
+            USER_DATA[user_id] = stored
+            evict_idle_users()
+
+    if user_id not in USER_DATA:
+        USER_DATA[user_id] = UserStats(user_id)
+        mark_dirty(user_id)
+        update_leaderboards(USER_DATA[user_id])
+        evict_idle_users()
+    
+    user_stats = USER_DATA[user_id]
+    # Biasanya sudah di-roll oleh daily_reset_scheduler; ini hanya fallback
+    if user_stats.daily_epoch != CURRENT_DAILY_EPOCH:
+        roll_daily_quests(user_stats)
+        mark_dirty(user_id)
+
+    return user_stats
+
+DAILY_QUEST_POOL = [q_id for q_id in QUEST_DATA if q_id.startswith("daily_")]
+
+def generate_daily_quests():
+    return {
+        f"daily_{i}": DailyQuest(random.choice(DAILY_QUEST_POOL))
+        for i in range(3)
+    }
+
+def roll_daily_quests(user_stats):
+    user_stats["daily_quests"] = generate_daily_quests()
+    user_stats.daily_epoch = CURRENT_DAILY_EPOCH
+    user_stats.recount_claimable_quests()
+
+def current_daily_epoch():
+    return int(time.time() // DAILY_RESET_SECONDS)
+
+CURRENT_DAILY_EPOCH = current_daily_epoch()
+
+async def daily_reset_scheduler():
+    """Background task: at each epoch boundary, pre-roll daily quests for resident users."""
+    global CURRENT_DAILY_EPOCH
+    while True:
+        next_reset = (CURRENT_DAILY_EPOCH + 1) * DAILY_RESET_SECONDS
+        await asyncio.sleep(max(0.0, next_reset - time.time()))
+        CURRENT_DAILY_EPOCH = current_daily_epoch()
+        
+        # Dicicil supaya event loop tidak terblokir kalau user aktif banyak
+        for i, user_id in enumerate(list(USER_DATA)):
+            user_stats = USER_DATA.get(user_id)
+            # User yang sedang bertransaksi tetap di-roll: kalau transaksinya rollback, epoch lama ikut
+            # kembali dan get_user_stats me-roll ulang saat akses berikutnya
+            if user_stats is None or user_stats.daily_epoch == CURRENT_DAILY_EPOCH:
+                continue
+            roll_daily_quests(user_stats)
+            mark_dirty(user_id)
+            if i % 500 == 499:
+                await asyncio.sleep(0)
+
+# --- EVENT BOOSTS ---
+class BoostEvent:
+    """A scheduled boost. islands=None means every island; ends_at=None means until cancelled."""
+    __slots__ = ("event_id", "name", "luck_multiplier", "rarity_multipliers", "islands", "starts_at", "ends_at")
+
+    def __init__(self, event_id, name, luck_multiplier=1.0, rarity_multipliers=None, islands=None,
+                 starts_at=0.0, ends_at=None):
+        self.event_id = event_id
+        self.name = name
+        self.luck_multiplier = luck_multiplier
+        # {"Legendary": 2.0}: bobot tangkap ikan tier itu dikali 2 (luck saja tidak menggeser rarity)
+        self.rarity_multipliers = dict(rarity_multipliers or {})
+        self.islands = frozenset(islands) if islands is not None else None
+        self.starts_at = starts_at
+        self.ends_at = ends_at
+
+    def to_dict(self):
+        return {
+            "event_id": self.event_id, "name": self.name, "luck_multiplier": self.luck_multiplier,
+            "rarity_multipliers": self.rarity_multipliers,
+            "islands": sorted(self.islands) if self.islands is not None else None,
+            "starts_at": self.starts_at, "ends_at": self.ends_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+NO_RARITY_BOOST = (1.0,) * len(RARITY_TIERS)
+
+class EventEngine:
+    """Active boosts folded into per-island multiplier tables; readers do one dict lookup.
+
+    ``version`` increases only when the effective multipliers change (event added, started,
+    ended or cancelled), so caches keyed on it are rebuilt once per change.
+    """
+
+    def __init__(self):
+        self.events: Dict[str, BoostEvent] = {}
+        self.version = 0
+        self._luck: Dict[str, float] = {}
+        self._rarity: Dict[str, Tuple[float, ...]] = {}
+        self._names: Dict[str, Tuple[str, ...]] = {}
+        self._next_transition = math.inf
+
+    def schedule(self, event):
+        self.events[event.event_id] = event
+        self.rebuild()
+
+    def cancel(self, event_id):
+        if self.events.pop(event_id, None) is not None:
+            self.rebuild()
+
+    def replace_all(self, events):
+        self.events = {event.event_id: event for event in events}
+        self.rebuild()
+
+    def refresh(self):
+        # Satu perbandingan per read; tabel hanya dibangun ulang saat ada event mulai/selesai
+        if time.time() >= self._next_transition:
+            self.rebuild()
+
+    def rebuild(self):
+        now = time.time()
+        self.events = {eid: e for eid, e in self.events.items() if e.ends_at is None or e.ends_at > now}
+        active = sorted((e for e in self.events.values() if e.starts_at <= now), key=lambda e: e.starts_at)
+
+        luck, rarity, names = {}, {}, {}
+        for island in ISLAND_LIST:
+            island_events = [e for e in active if e.islands is None or island in e.islands]
+            if not island_events:
+                continue
+            multipliers = list(NO_RARITY_BOOST)
+            for event in island_events:
+                for tier_name, multiplier in event.rarity_multipliers.items():
+                    multipliers[RARITY_TIER_IDS[tier_name]] *= multiplier
+            luck[island] = math.prod(e.luck_multiplier for e in island_events)
+            rarity[island] = tuple(multipliers)
+            names[island] = tuple(e.name for e in island_events)
+
+        transitions = [e.starts_at for e in self.events.values() if e.starts_at > now]
+        transitions += [e.ends_at for e in active if e.ends_at is not None]
+        self._next_transition = min(transitions, default=math.inf)
+        if (luck, rarity, names) != (self._luck, self._rarity, self._names):
+            self._luck, self._rarity, self._names = luck, rarity, names
+            self.version += 1
+
+    def current_version(self):
+        self.refresh()
+        return self.version
+
+    def luck_multiplier(self, island):
+        self.refresh()
+        return self._luck.get(island, 1.0)
+
+    def rarity_multipliers(self, island):
+        self.refresh()
+        return self._rarity.get(island, NO_RARITY_BOOST)
+
+    def active_names(self, island):
+        self.refresh()
+        return self._names.get(island, ())
+
+EVENTS = EventEngine()
+
+def schedule_event(event):
+    EVENTS.schedule(event)
+    broadcast_events()
+
+def cancel_event(event_id):
+    EVENTS.cancel(event_id)
+    broadcast_events()
+
+def broadcast_events():
+    if BUS is not None:
+        # Retain supaya proses shard yang start belakangan juga memakai event yang sama
+        BUS.publish("events", [event.to_dict() for event in EVENTS.events.values()], retain=True)
+
+@bus_handler("events")
+def apply_events(payload):
+    EVENTS.replace_all([BoostEvent.from_dict(data) for data in payload])
+
+def set_event_boost(luck_multiplier, is_active=True):
+    """Boost luck global tanpa jadwal (sampai dimatikan)."""
+    if is_active:
+        schedule_event(BoostEvent("global_boost", "Event", luck_multiplier=luck_multiplier))
+    else:
+        cancel_event("global_boost")
+
+def luck_status_text(user_stats, total_luck):
+    text = f"Total Luck: {total_luck}%"
+    names = EVENTS.active_names(user_stats["location"])
+    if names:
+        multiplier = EVENTS.luck_multiplier(user_stats["location"])
+        text += f" ({', '.join(names)}" + (f" x{multiplier:g})" if multiplier != 1 else ")")
+    return text
+
+def calculate_total_luck(user_stats):
+    rod = ROD_DATA.get(user_stats["current_rod"], ROD_DATA["Starter Rod"])
+    bait = BAIT_DATA.get(user_stats["current_bait"], BAIT_DATA["Starter Bait"])
+    
+    ench_level = user_stats["rod_enchantment"].get(user_stats["current_rod"], 0)
+    ench_luck = ench_level * 10 
+    
+    total_luck = rod["luck_bonus"] + bait["luck_bonus"] + ench_luck
+    
+    total_luck *= EVENTS.luck_multiplier(user_stats["location"])
+    
+    return int(total_luck)
+
+def update_quest_progress(user_stats, trigger_type, value=None, item_name=None, rarity=None):
+    key = (trigger_type, rarity if trigger_type == "catch" else None)
+    amount = value or 1
+    
+    # Quest Rod (Permanent): hanya quest yang subscribe ke trigger ini
+    permanent_quests = PERMANENT_QUESTS_BY_TRIGGER.get(key)
+    if permanent_quests:
+        quest_progress = user_stats["quest_progress"]
+        for q_id in permanent_quests:
+            q_data = QUEST_DATA[q_id]
+            progress = quest_progress.get(q_id, 0)
+            if progress >= q_data["goal"]:
+                continue
+            if "requires_rod" in q_data and q_data["requires_rod"] not in user_stats["owned_rods"]:
+                continue
+            quest_progress[q_id] = min(progress + amount, q_data["goal"])
+            if quest_progress[q_id] >= q_data["goal"]:
+                user_stats.claimable_quests += 1
+
+    # Daily Quests
+    daily_quest_ids = DAILY_QUESTS_BY_TRIGGER.get(key)
+    if daily_quest_ids:
+        for q_data in user_stats["daily_quests"].values():
+            if q_data.quest_id in daily_quest_ids and not q_data["claimed"] and q_data["progress"] < q_data["goal"]:
+                q_data["progress"] = min(q_data["progress"] + amount, q_data["goal"])
+                if q_data["progress"] >= q_data["goal"]:
+                    user_stats.claimable_quests += 1
+                
+def check_quest_completion(user_stats):
+    # Dihitung incremental oleh update_quest_progress, jadi render tidak perlu scan quest
+    return user_stats.claimable_quests
+
+# --- RNG STREAMS ---
+# Counter-based: angka ke-n dari stream user = splitmix64(seed + (n + 1) * gamma). Tidak ada state RNG global,
+# jadi tangkapan ke-i bisa diulang persis dari (rng_seed, i), di proses mana pun atau vektor di NumPy (simulate.py).
+MASK64 = (1 << 64) - 1
+SPLITMIX_GAMMA = 0x9E3779B97F4A7C15
+# Uniform per tangkapan: kolom alias, koin alias, berat
+DRAWS_PER_CATCH = 3
+
+def splitmix64(x):
+    z = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+def stream_uniform(seed, counter):
+    """The ``counter``-th double in [0, 1) of stream ``seed`` (top 53 bits of splitmix64)."""
+    return (splitmix64((seed + (counter + 1) * SPLITMIX_GAMMA) & MASK64) >> 11) * (1.0 / (1 << 53))
+
+def roll_catch(sampler, seed, catch_index):
+    """(fish_id, weight_kg) of catch number ``catch_index`` for this sampler; same inputs, same catch."""
+    counter = catch_index * DRAWS_PER_CATCH
+    fish_id = sampler.draw(stream_uniform(seed, counter), stream_uniform(seed, counter + 1))
+    weight_min = FISH_CATALOG.weight_min[fish_id]
+    # Rumus yang sama dengan random.uniform(min, max)
+    weight_kg = weight_min + (FISH_CATALOG.weight_max[fish_id] - weight_min) * stream_uniform(seed, counter + 2)
+    return fish_id, weight_kg
+
+def replay_catch(seed, catch_index, location, total_luck, rarity_boost=None):
+    """Audit: recompute a past catch from its stream position and the loadout/events it was rolled with."""
+    if rarity_boost is None:
+        rarity_boost = EVENTS.rarity_multipliers(location)
+    sampler = catch_sampler(location, total_luck, rarity_boost)
+    return roll_catch(sampler, seed, catch_index) if sampler is not None else None
+
+def audit_catch_log(user_stats):
+    """Replay every raw CatchLog row of this user from its stream index and logged inputs.
+
+    Returns the rows that do not reproduce (fish, float32 weight or lost flag) as
+    ``(row, replayed fish_id, replayed weight_kg)``; rows from before the index was logged are skipped.
+    """
+    mismatches = []
+    for row in user_stats.catch_log.rolls():
+        catch_index, fish_id, weight_kg, island_id, total_luck, rod_id, rarity_boost, lost = row
+        if catch_index == CATCH_INDEX_UNKNOWN:
+            continue
+        replayed = replay_catch(user_stats.rng_seed, catch_index, ISLAND_LIST[island_id], total_luck, rarity_boost)
+        if replayed is None:
+            mismatches.append((row, None, None))
+            continue
+        replayed_fish, replayed_weight = replayed
+        replayed_lost = replayed_weight > ROD_DATA[ROD_LIST[rod_id]]["max_weight_kg"]
+        # Berat disimpan sebagai float32 di log
+        if (replayed_fish, array("f", [replayed_weight])[0], replayed_lost) != (fish_id, weight_kg, lost):
+            mismatches.append((row, replayed_fish, replayed_weight))
+    return mismatches
+
+# --- FISH SAMPLER (Alias Method) ---
+# Satu alias table per (island, total_luck), dibangun sekali lalu di-cache (LRU).
+# Cache dikosongkan sekali setiap EVENTS.version berubah (multiplier rarity per pulau ikut berubah).
+SAMPLER_CACHE_SIZE = 256
+_SAMPLER_CACHE: "OrderedDict[Tuple[str, int], FishSampler]" = OrderedDict()
+_SAMPLER_CACHE_VERSION = 0
+
+def fish_catch_weight(base_chance, total_luck):
+    # Formula untuk Adjusted Weight: Luck mempengaruhi peluang mendapatkan ikan langka.
+    # Semakin kecil base_chance (semakin langka), semakin besar bobotnya jika luck tinggi.
+    return (1 / base_chance) * (1 + (total_luck / 100))
+
+def island_catch_weights(location, total_luck, rarity_boost=None):
+    """Bobot tangkap ikan di pulau ini, termasuk multiplier rarity dari event yang aktif."""
+    if rarity_boost is None:
+        rarity_boost = EVENTS.rarity_multipliers(location)
+    chance, rarity = FISH_CATALOG.chance, FISH_CATALOG.rarity
+    return [fish_catch_weight(chance[f], total_luck) * rarity_boost[rarity[f]]
+            for f in FISH_CATALOG.island_fish_ids(location)]
+
+class FishSampler:
+    """Walker/Vose alias table over one island's fish IDs: O(1) draws, no per-draw lists."""
+    __slots__ = ("fish_ids", "prob", "alias", "size")
+
+    def __init__(self, fish_ids, weights):
+        n = len(fish_ids)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Sisa di kedua stack bernilai ~1.0 (error floating point), biarkan prob = 1.0
+
+        self.fish_ids = list(fish_ids)
+        self.prob = prob
+        self.alias = alias
+        self.size = n
+
+    def draw(self, u_column, u_coin):
+        """Fish ID for two uniforms in [0, 1): one picks the column, one flips its alias coin."""
+        i = int(u_column * self.size)
+        if u_coin >= self.prob[i]:
+            i = self.alias[i]
+        return self.fish_ids[i]
+
+def get_fish_sampler(location, total_luck):
+    global _SAMPLER_CACHE_VERSION
+    if _SAMPLER_CACHE_VERSION != EVENTS.current_version():
+        _SAMPLER_CACHE.clear()
+        _SAMPLER_CACHE_VERSION = EVENTS.version
+
+    key = (location, total_luck)
+    sampler = _SAMPLER_CACHE.get(key)
+    if sampler is not None:
+        _SAMPLER_CACHE.move_to_end(key)
+        return sampler
+
+    fish_ids = FISH_CATALOG.island_fish_ids(location)
+    if not fish_ids:
+        return None
+
+    sampler = FishSampler(fish_ids, island_catch_weights(location, total_luck))
+    _SAMPLER_CACHE[key] = sampler
+    if len(_SAMPLER_CACHE) > SAMPLER_CACHE_SIZE:
+        _SAMPLER_CACHE.popitem(last=False)
+    return sampler
+
+@timed(FISHING_SECONDS, "single")
+def perform_fishing(user_stats):
+    total_luck = calculate_total_luck(user_stats)
+    current_location = user_stats["location"]
+    
+    sampler = get_fish_sampler(current_location, total_luck)
+    
+    if sampler is None: 
+        return "Failed", f"No fish data found for **{current_location}**.", "0.00", "Failed", 0.00
+    
+    # Pilih ikan (alias table, O(1)) dan beratnya dari stream RNG user
+    catch_index = user_stats.catch_index
+    fish_id, weight_kg = roll_catch(sampler, user_stats.rng_seed, catch_index)
+    user_stats.catch_index += 1
+    catalog = FISH_CATALOG
+    fish_name = catalog.names[fish_id]
+    rarity = catalog.rarity_name(fish_id)
+    weight_min = catalog.weight_min[fish_id]
+    
+    rod_data = ROD_DATA.get(user_stats["current_rod"])
+    max_rod_weight = rod_data["max_weight_kg"]
+    lost = weight_kg > max_rod_weight
+    # Semua lemparan dicatat (juga yang lepas) dengan input replay-nya, lihat audit_catch_log
+    user_stats.catch_log.append(fish_id, weight_kg, time.time(), user_stats.island_id, catch_index, total_luck,
+                                user_stats.rod_id, EVENTS.rarity_multipliers(current_location), lost)
+    
+    # Weight Check (Gagal Tarik)
+    if lost:
+        update_quest_progress(user_stats, "catch", value=1, rarity=rarity) 
+        return "Failed", f"LOST IT! The **{fish_name}**'s weight ({weight_kg:,.2f} kg) exceeded your **{user_stats['current_rod']}** capacity ({max_rod_weight:,} kg). You need a stronger Rod to catch this {rarity} fish!", f"{weight_kg:,.2f}", rarity, 0.00
+
+    # Success
+    weight_ratio = max(1.0, float(weight_kg) / float(weight_min))
+    coins_earned = catalog.base_price[fish_id] * weight_ratio
+    
+    user_stats["koin"] += coins_earned
+    user_stats.add_fish(fish_id)
+    
+    update_quest_progress(user_stats, "catch", value=1, rarity=rarity)
+
+    return "Success", fish_id, f"{weight_kg:,.2f}", rarity, coins_earned
+
+
+def catch_sampler(location, total_luck, rarity_boost):
+    """get_fish_sampler for an explicit event state.
+
+    Pool workers hold a stale copy of EVENTS, so when the caller's rarity boost differs from the
+    local one the table is built uncached from ``rarity_boost`` instead.
+    """
+    if rarity_boost == EVENTS.rarity_multipliers(location):
+        return get_fish_sampler(location, total_luck)
+    fish_ids = FISH_CATALOG.island_fish_ids(location)
+    return FishSampler(fish_ids, island_catch_weights(location, total_luck, rarity_boost)) if fish_ids else None
+
+def resolve_catches(location, total_luck, rod_id, rarity_boost, seed, first_index, count):
+    """Pure part of a batch: roll ``count`` catches from the stream without touching any user.
+
+    Only takes plain values and returns plain containers, so it can run in an offload pool worker.
+    """
+    sampler = catch_sampler(location, total_luck, rarity_boost)
+    if sampler is None:
+        return None
+    max_rod_weight = ROD_DATA[ROD_LIST[rod_id]]["max_weight_kg"]
+
+    catalog = FISH_CATALOG
+    caught: Dict[int, int] = {}
+    tier_counts = [0] * len(RARITY_TIERS)
+    coins_total = 0.0
+    lost = 0
+    best_catch = None  # (fish_id, weight_kg, coins)
+    # Baris untuk CatchLog, satu per lemparan (juga yang lepas), urut sesuai catch index
+    log_fish, log_weight, log_lost = array("H"), array("d"), array("B")
+    for catch_index in range(first_index, first_index + count):
+        fish_id, weight_kg = roll_catch(sampler, seed, catch_index)
+        weight_min = catalog.weight_min[fish_id]
+        # Ikan yang lepas tetap dihitung untuk quest, sama seperti perform_fishing
+        tier_counts[catalog.rarity[fish_id]] += 1
+        log_fish.append(fish_id)
+        log_weight.append(weight_kg)
+        log_lost.append(weight_kg > max_rod_weight)
+        if weight_kg > max_rod_weight:
+            lost += 1
+            continue
+        coins = catalog.base_price[fish_id] * max(1.0, weight_kg / weight_min)
+        coins_total += coins
+        caught[fish_id] = caught.get(fish_id, 0) + 1
+        if best_catch is None or coins > best_catch[2]:
+            best_catch = (fish_id, weight_kg, coins)
+
+    return {
+        "count": count,
+        "location": location,
+        "caught": caught,
+        "lost": lost,
+        "coins": coins_total,
+        "tier_counts": tier_counts,
+        "best_catch": best_catch,
+        "log": (log_fish, log_weight, log_lost),
+        # Input replay, dicatat di CatchLog bersama tiap baris
+        "inputs": (first_index, total_luck, rod_id, rarity_boost),
+    }
+
+def reserve_catches(user_stats, count):
+    """Arguments for resolve_catches (loadout, event state, stream position as plain values),
+    advancing the user's stream past them.
+
+    The reserved positions belong to this batch from now on, so it can be rolled outside the
+    user's lock without a concurrent click rolling the same catches again.
+    """
+    location = user_stats["location"]
+    args = (location, calculate_total_luck(user_stats), user_stats.rod_id,
+            EVENTS.rarity_multipliers(location), user_stats.rng_seed, user_stats.catch_index, count)
+    user_stats.catch_index += count
+    return args
+
+def apply_catches(user_stats, result, now=None):
+    """Apply a resolve_catches result to koin, inventory, catch log and quests in bulk.
+
+    The batch covers the last ``count`` cooldown windows up to ``now`` (the click), so each log
+    row is stamped with the end of its own window rather than all with the same time.
+    """
+    if result is None:
+        return None
+    user_stats["koin"] += result["coins"]
+    for fish_id, n in result["caught"].items():
+        user_stats.add_fish(fish_id, n)
+    log_catch = user_stats.catch_log.append
+    now = time.time() if now is None else now
+    first_index, total_luck, rod_id, rarity_boost = result["inputs"]
+    last_offset, island_id = result["count"] - 1, ISLAND_IDS[result["location"]]
+    for offset, (fish_id, weight_kg, lost) in enumerate(zip(*result["log"])):
+        log_catch(fish_id, weight_kg, now - (last_offset - offset) * COOLDOWN_TIME, island_id,
+                  first_index + offset, total_luck, rod_id, rarity_boost, lost)
+    for tier, n in enumerate(result["tier_counts"]):
+        if n:
+            update_quest_progress(user_stats, "catch", value=n, rarity=RARITY_TIERS[tier])
+    return result
+
+@timed(FISHING_SECONDS, "batch")
+def perform_fishing_batch(user_stats, count):
+    """Resolve ``count`` catches in one pass and apply them to koin, inventory and quests in bulk."""
+    return apply_catches(user_stats, resolve_catches(*reserve_catches(user_stats, count)))
+
+
+# --- SELL ENGINE ---
+# Inventory tidak menyimpan berat, jadi harga jual per ekor = base_price dari katalog (tabel array("d") per fish ID).
+def sell_inventory(user_stats, tier=None, keep_favorites=False):
+    """Sell everything (or one rarity tier, or all but favorites) in one pass over inventory_counts.
+
+    Koin and the "sell" quest trigger are applied once for the whole batch. Returns ``(units, koin)``.
+    """
+    counts = user_stats.inventory_counts
+    prices = FISH_CATALOG.base_price
+    favorite_mask = user_stats.favorite_mask if keep_favorites else 0
+
+    if tier is None and not favorite_mask:
+        # Jual semua: dua reduksi di C, lalu inventory dikosongkan
+        units = sum(counts)
+        coins = math.fsum(map(operator.mul, counts, prices))
+        user_stats.inventory_counts = array("I")
+    else:
+        units, coins = 0, 0.0
+        size = len(counts)
+        for fish_id in (FISH_CATALOG.ids_by_tier[tier] if tier is not None else range(size)):
+            if fish_id >= size:
+                break
+            n = counts[fish_id]
+            if n and not (favorite_mask >> fish_id) & 1:
+                units += n
+                coins += n * prices[fish_id]
+                counts[fish_id] = 0
+
+    if units:
+        user_stats["koin"] += coins
+        update_quest_progress(user_stats, "sell", value=units)
+    return units, coins
+
+def inventory_summary(user_stats):
+    """Per rarity tier: (units, sell value) of the whole inventory, in one pass."""
+    units = [0] * len(RARITY_TIERS)
+    value = [0.0] * len(RARITY_TIERS)
+    rarity, prices = FISH_CATALOG.rarity, FISH_CATALOG.base_price
+    for fish_id, n in enumerate(user_stats.inventory_counts):
+        if n:
+            units[rarity[fish_id]] += n
+            value[rarity[fish_id]] += n * prices[fish_id]
+    return tuple(zip(units, value))
+
+
+# --- EXPECTED VALUE TABLES ---
+# Hasil per ikan hanya bergantung pada (island, kapasitas rod) -> dihitung sekali saat startup.
+# Gabungan dengan peluang tangkap (bergantung luck) di-cache per (island, rod, total_luck).
+
+def fish_outcome(fish_id, max_weight_kg):
+    """Exact (loss probability, expected coins per attempt) for one fish on a rod with this cap."""
+    weight_min = FISH_CATALOG.weight_min[fish_id]
+    weight_max = FISH_CATALOG.weight_max[fish_id]
+    base_price = FISH_CATALOG.base_price[fish_id]
+
+    # Berat ~ Uniform(min, max); koin = base_price * berat / min (berat selalu >= min)
+    if weight_max <= max_weight_kg:
+        return 0.0, base_price * (weight_min + weight_max) / (2 * weight_min)
+    if max_weight_kg < weight_min:
+        return 1.0, 0.0
+    span = weight_max - weight_min
+    loss_prob = (weight_max - max_weight_kg) / span
+    expected_coins = base_price * (max_weight_kg ** 2 - weight_min ** 2) / (2 * weight_min * span)
+    return loss_prob, expected_coins
+
+def build_fish_outcome_tables():
+    tables = {}
+    rod_caps = {rod["max_weight_kg"] for rod in ROD_DATA.values()}
+    for island in ISLAND_LIST:
+        fish_ids = FISH_CATALOG.island_fish_ids(island)
+        for cap in rod_caps:
+            outcomes = [fish_outcome(f, cap) for f in fish_ids]
+            tables[(island, cap)] = ([o[0] for o in outcomes], [o[1] for o in outcomes])
+    return tables
+
+FISH_OUTCOME_TABLES = build_fish_outcome_tables()
+_LOADOUT_EXPECTATION_CACHE: Dict[Tuple[str, str, int], Dict[str, Any]] = {}
+_LOADOUT_EXPECTATION_VERSION = 0
+
+def get_loadout_expectation(location, rod_name, total_luck):
+    """Per-catch outcome distribution for a loadout: expected coins, loss chance, rarity shares."""
+    global _LOADOUT_EXPECTATION_VERSION
+    if _LOADOUT_EXPECTATION_VERSION != EVENTS.current_version():
+        # Tabel hasil per ikan tidak bergantung pada event, jadi hanya gabungannya yang dibuang
+        _LOADOUT_EXPECTATION_CACHE.clear()
+        _LOADOUT_EXPECTATION_VERSION = EVENTS.version
+
+    key = (location, rod_name, total_luck)
+    expectation = _LOADOUT_EXPECTATION_CACHE.get(key)
+    if expectation is not None:
+        return expectation
+
+    fish_ids = FISH_CATALOG.island_fish_ids(location)
+    loss_probs, expected_coins = FISH_OUTCOME_TABLES.get((location, ROD_DATA[rod_name]["max_weight_kg"]), ([], []))
+    weights = island_catch_weights(location, total_luck)
+    total_weight = sum(weights)
+
+    rarity_shares = dict.fromkeys(RARITY_TIERS, 0.0)
+    expectation = {"expected_coins": 0.0, "loss_prob": 0.0, "rarity": rarity_shares}
+    for fish_id, weight, loss_prob, coins in zip(fish_ids, weights, loss_probs, expected_coins):
+        p = weight / total_weight
+        expectation["expected_coins"] += p * coins
+        expectation["loss_prob"] += p * loss_prob
+        rarity_shares[FISH_CATALOG.rarity_name(fish_id)] += p
+
+    _LOADOUT_EXPECTATION_CACHE[key] = expectation
+    return expectation
+
+def expected_coins_per_catch(user_stats):
+    total_luck = calculate_total_luck(user_stats)
+    return get_loadout_expectation(user_stats["location"], user_stats["current_rod"], total_luck)["expected_coins"]
+
+
+# --- EMBED & VIEW RENDER CACHE ---
+# Metadata pulau dihitung sekali; max rarity memakai urutan tier, bukan urutan alfabet
+ISLAND_META = {}
+for _island in ISLAND_LIST:
+    _fish_ids = FISH_CATALOG.island_fish_ids(_island)
+    ISLAND_META[_island] = {
+        "fish_count": len(_fish_ids),
+        "max_rarity": RARITY_TIERS[max(FISH_CATALOG.rarity[f] for f in _fish_ids)] if _fish_ids else "N/A",
+    }
+
+# Teks daftar pulau di Travel menu hanya bergantung pada pulau yang sudah dibuka
+_ISLAND_LIST_TEXT_CACHE: Dict[int, str] = {}
+
+def render_island_list(user_stats):
+    unlocked_mask = user_stats.unlocked_mask
+    text = _ISLAND_LIST_TEXT_CACHE.get(unlocked_mask)
+    if text is None:
+        island_list = []
+        for name, data in ISLAND_DATA.items():
+            status = "✅ UNLOCKED" if (unlocked_mask >> ISLAND_IDS[name]) & 1 else f"🔒 LOCKED ({CURRENCY_SYMBOL}{data['price']:,.2f})"
+            meta = ISLAND_META[name]
+            island_list.append(f"**{name}** (Max Rarity: {meta['max_rarity']}, {meta['fish_count']} fish) | {status}")
+        text = _ISLAND_LIST_TEXT_CACHE[unlocked_mask] = "\n".join(island_list)
+    return text
+
+EMBED_CACHE_SIZE = 5000
+# (kind, user_id) -> (state_key, embed/view); dipakai ulang selama state_key sama
+_RENDER_CACHE: "OrderedDict[Tuple[str, int], Tuple[Tuple, Any]]" = OrderedDict()
+
+def cached_render(kind, user_id, state_key, build):
+    key = (kind, user_id)
+    cached = _RENDER_CACHE.get(key)
+    if cached is not None and cached[0] == state_key:
+        _RENDER_CACHE.move_to_end(key)
+        return cached[1]
+    rendered = build()
+    _RENDER_CACHE[key] = (state_key, rendered)
+    _RENDER_CACHE.move_to_end(key)
+    if len(_RENDER_CACHE) > EMBED_CACHE_SIZE:
+        _RENDER_CACHE.popitem(last=False)
+    return rendered
+
+
+# --- DISCORD BOT VIEWS (Interactions) ---
+# View tidak menyimpan state: custom_id tiap komponen berbentuk "fish:<action>:<user_id>" dan semua klik
+# diarahkan oleh route_component ke COMPONENT_HANDLERS. Tidak ada timeout per view, jadi tombol tetap
+# hidup selama pesannya ada, termasuk setelah bot restart.
+COMPONENT_PREFIX = "fish"
+COMPONENT_HANDLERS: Dict[str, Any] = {}
+
+def component_handler(action):
+    """Mendaftarkan handler `async def handler(interaction, user_id)` untuk satu action."""
+    def decorator(fn):
+        COMPONENT_HANDLERS[action] = fn
+        return fn
+    return decorator
+
+def component_id(action, user_id):
+    return f"{COMPONENT_PREFIX}:{action}:{user_id}"
+
+def parse_component_id(custom_id):
+    """Kebalikan component_id: (action, user_id), atau None kalau bukan komponen bot ini."""
+    prefix, _, rest = custom_id.partition(":")
+    action, _, user_id = rest.rpartition(":")
+    if prefix != COMPONENT_PREFIX or not action or not user_id.isdigit():
+        return None
+    return action, int(user_id)
+
+def build_view(*items):
+    # store=False: py-cord tidak melacak view ini (dan tidak menjalankan timer timeout);
+    # klik ditangani route_component, jadi satu objek view aman dipakai untuk banyak pesan
+    return View(*items, timeout=None, store=False)
+
+async def edit_response(interaction: discord.Interaction, **kwargs):
+    """Edit the component's message, also after run_cpu_job already deferred the interaction.
+
+    Every handler that replaces its menu goes through here. Once the edit succeeded, a pending
+    re-enable of the fish button on this message is stale and is cancelled. Only the timer that
+    was pending when the edit started is cancelled, so a handler can schedule a new one afterwards.
+    """
+    message_id = interaction.message.id if interaction.message else None
+    pending_due = COOLDOWN_TIMERS.due(interaction.user.id, message_id)
+    if interaction.response.is_done():
+        edited = await interaction.edit_original_response(**kwargs)
+    else:
+        edited = await interaction.response.edit_message(**kwargs)
+    if pending_due is not None:
+        COOLDOWN_TIMERS.cancel(interaction.user.id, message_id, pending_due)
+    return edited
+
+def back_button(user_id):
+    return Button(label="↩️ Main Menu", custom_id=component_id("main_menu", user_id),
+                  style=discord.ButtonStyle.secondary, row=4)
+
+def back_view(user_id):
+    return cached_render("back_view", user_id, (), lambda: build_view(back_button(user_id)))
+
+
+# --- Main Menu ---
+MAIN_MENU_BUTTONS = [
+    ("main_fish", "🎣 Auto Fishing", discord.ButtonStyle.green),
+    ("main_travel", "🌍 Travel", discord.ButtonStyle.blurple),
+    ("main_shop", "🏪 Shop & Sell", discord.ButtonStyle.blurple),
+    ("main_equip", "⚙️ Equip & Upgrade", discord.ButtonStyle.blurple),
+    ("main_quests", "⭐ Quests", discord.ButtonStyle.red),
+    ("main_top", "🏆 Leaderboard", discord.ButtonStyle.red),
+    ("main_profile", "👤 Profile", discord.ButtonStyle.grey),
+]
+
+def main_menu_view(user_id):
+    return cached_render("main_view", user_id, (), lambda: build_view(*[
+        Button(label=label, custom_id=component_id(action, user_id), style=style)
+        for action, label, style in MAIN_MENU_BUTTONS
+    ]))
+
+def create_main_embed(user_id):
+    user_stats = get_user_stats(user_id)
+    total_luck = calculate_total_luck(user_stats)
+    state_key = (user_stats.koin, user_stats.island_id, user_stats.claimable_quests, total_luck,
+                 EVENTS.current_version())
+    return cached_render("main", user_id, state_key, lambda: build_main_embed(user_stats, total_luck))
+
+@timed(EMBED_BUILD_SECONDS, "main")
+def build_main_embed(user_stats, total_luck):
+    embed = discord.Embed(
+        title="🐠 Welcome to the Auto Fishing Bot!",
+        description="Use the buttons below to manage your automated fishing journey.",
+        color=0x4169E1
+    )
+    
+    embed.add_field(name=f"💰 Money ({CURRENCY_SYMBOL})", value=f"**{CURRENCY_SYMBOL}{user_stats['koin']:,.2f}**", inline=True)
+    embed.add_field(name="📍 Location", value=user_stats['location'], inline=True)
+    
+    completed = check_quest_completion(user_stats)
+    luck_text = luck_status_text(user_stats, total_luck)
+
+    if completed > 0:
+        embed.set_footer(text=f"⭐ {completed} Quests Ready to Claim! Press 'Quests' button. | {luck_text}")
+    else:
+        embed.set_footer(text=f"{luck_text} | Happy Fishing!")
+        
+    return embed
+
+@component_handler("main_menu")
+async def open_main_menu(interaction: discord.Interaction, user_id):
+    await edit_response(interaction, embed=create_main_embed(user_id), view=main_menu_view(user_id))
+
+@component_handler("main_fish")
+async def open_auto_fishing(interaction: discord.Interaction, user_id):
+    user_stats = get_user_stats(user_id)
+    await edit_response(interaction, embed=create_fishing_embed(user_stats), view=fishing_view(user_stats))
+    ready_at = user_stats["last_fished"] + COOLDOWN_TIME
+    if ready_at > time.time():
+        COOLDOWN_TIMERS.schedule(user_id, interaction, ready_at)
+
+@component_handler("main_travel")
+async def open_travel(interaction: discord.Interaction, user_id):
+    user_stats = get_user_stats(user_id)
+    await edit_response(interaction, embed=create_travel_embed(user_stats), view=travel_view(user_stats))
+
+@component_handler("main_top")
+async def open_leaderboard(interaction: discord.Interaction, user_id):
+    await edit_response(interaction, embed=create_leaderboard_embed(user_id), view=back_view(user_id))
+
+# TODO: Implement remaining menu options (Equip, Quests, etc.)
+async def feature_not_implemented(action, interaction: discord.Interaction, user_id):
+    await interaction.response.send_message(f"Feature '{action.replace('main_', '').title()}' not implemented yet.", ephemeral=True)
+
+for _action in ("main_equip", "main_quests"):
+    COMPONENT_HANDLERS[_action] = functools.partial(feature_not_implemented, _action)
+
+
+@timed(EMBED_BUILD_SECONDS, "leaderboard")
+def create_leaderboard_embed(user_id):
+    embed = discord.Embed(
+        title="🏆 Leaderboard",
+        description=f"Top {LEADERBOARD_PAGE_SIZE} anglers across all islands.",
+        color=0xFFC300
+    )
+    your_ranks = []
+    for board_name, board in LEADERBOARDS.items():
+        embed.add_field(name=board.title, value=render_leaderboard_page(board_name), inline=False)
+        rank = board.rank(user_id)
+        your_ranks.append(f"{board.title}: #{rank:,}" if rank else f"{board.title}: -")
+    embed.set_footer(text="Your rank | " + " | ".join(your_ranks))
+    return embed
+
+
+# --- Travel ---
+def next_island_to_unlock(user_stats):
+    for island_name in ISLAND_LIST:
+        if island_name not in user_stats["unlocked_islands"]:
+            return island_name
+    return None
+
+def travel_view(user_stats):
+    state_key = (user_stats.unlocked_mask, user_stats.island_id)
+    return cached_render("travel_view", user_stats.user_id, state_key, lambda: build_travel_view(user_stats))
+
+def build_travel_view(user_stats):
+    user_id = user_stats.user_id
+    items = []
+    next_island = next_island_to_unlock(user_stats)
+    if next_island:
+        data = ISLAND_DATA[next_island]
+        items.append(Button(
+            label=f"Unlock {next_island} ({CURRENCY_SYMBOL}{data['price']:,})",
+            custom_id=component_id("travel_buy_next", user_id),
+            style=discord.ButtonStyle.primary,
+            row=0
+        ))
+    
+    unlocked_options = [
+        discord.SelectOption(label=name, value=name, default=(name == user_stats['location']))
+        for name in user_stats["unlocked_islands"]
+    ]
+    if unlocked_options:
+        items.append(Select(placeholder="Set current location to fish...", options=unlocked_options,
+                            custom_id=component_id("set_fishing_location", user_id), row=1))
+    
+    items.append(back_button(user_id))
+    return build_view(*items)
+
+def create_travel_embed(user_stats):
+    state_key = (user_stats.koin, user_stats.island_id, user_stats.unlocked_mask)
+    return cached_render("travel", user_stats.user_id, state_key, lambda: build_travel_embed(user_stats))
+
+@timed(EMBED_BUILD_SECONDS, "travel")
+def build_travel_embed(user_stats):
+    embed = discord.Embed(
+        title="🌍 Travel to New Fishing Grounds",
+        description=f"Unlock new islands to access their unique fish pools and shop items. You are currently at **{user_stats['location']}**.",
+        color=0x3CB371
+    )
+    embed.add_field(name="Your Money", value=f"**{CURRENCY_SYMBOL}{user_stats['koin']:,.2f}**", inline=False)
+    
+    embed.add_field(name="Available Islands", value=render_island_list(user_stats), inline=False)
+    return embed
+
+@component_handler("set_fishing_location")
+async def set_fishing_location(interaction: discord.Interaction, user_id):
+    new_location = interaction.data["values"][0]
+    async with user_transaction(user_id) as user_stats:
+        unlocked = new_location in user_stats["unlocked_islands"]
+        if unlocked:
+            user_stats["location"] = new_location
+    if not unlocked:
+        return await interaction.response.send_message(f"❌ **{new_location}** is still locked!", ephemeral=True)
+
+    await edit_response(interaction, embed=create_travel_embed(user_stats), view=travel_view(user_stats))
+    OUTBOUND.respond(interaction, content=f"📍 Lokasi memancing diatur ke **{new_location}**! Siap untuk tantangan ikan lokal.", ephemeral=True)
+
+@component_handler("travel_buy_next")
+async def travel_buy_next(interaction: discord.Interaction, user_id):
+    # Cek saldo dan pembelian dalam satu transaksi supaya tidak double-spend
+    async with user_transaction(user_id) as user_stats:
+        next_island = next_island_to_unlock(user_stats)
+        price = ISLAND_DATA[next_island]["price"] if next_island else 0
+        bought = next_island is not None and user_stats["koin"] >= price
+        if bought:
+            user_stats["koin"] -= price
+            user_stats["unlocked_islands"].append(next_island)
+            user_stats["location"] = next_island
+    if not next_island:
+        return await interaction.response.send_message("❌ You have unlocked all islands!", ephemeral=True)
+    if not bought:
+        return await interaction.response.send_message(f"❌ Not enough coins! You need **{CURRENCY_SYMBOL}{price:,.2f}** to unlock **{next_island}**.", ephemeral=True)
+
+    await edit_response(interaction, embed=create_travel_embed(user_stats), view=travel_view(user_stats))
+    OUTBOUND.respond(interaction, content=f"🎉 Unlocked and traveled to **{next_island}** for **{CURRENCY_SYMBOL}{price:,.2f}**! New challenges await!", ephemeral=True)
+
+
+# --- Shop & Sell ---
+# Select Discord maksimal 25 opsi
+FAVORITE_OPTION_LIMIT = 25
+
+def favorite_candidates(user_stats):
+    """Fish IDs offered in the favorites select: current favorites first, then the most valuable stacks."""
+    counts, prices = user_stats.inventory_counts, FISH_CATALOG.base_price
+    mask = user_stats.favorite_mask
+    favorites = [f for f, n in enumerate(counts) if n and (mask >> f) & 1][:FAVORITE_OPTION_LIMIT]
+    others = heapq.nlargest(
+        FAVORITE_OPTION_LIMIT - len(favorites),
+        (f for f, n in enumerate(counts) if n and not (mask >> f) & 1),
+        key=lambda f: counts[f] * prices[f],
+    )
+    return favorites + others
+
+def shop_view(user_stats, summary):
+    state_key = (user_stats.favorite_mask, summary)
+    return cached_render("shop_view", user_stats.user_id, state_key, lambda: build_shop_view(user_stats, summary))
+
+def build_shop_view(user_stats, summary):
+    user_id = user_stats.user_id
+    has_fish = any(units for units, _ in summary)
+    items = [
+        Button(label="💰 Sell All", custom_id=component_id("shop_sell_all", user_id),
+               style=discord.ButtonStyle.green, row=0, disabled=not has_fish),
+        Button(label="⭐ Sell All Except Favorites", custom_id=component_id("shop_sell_keep_favorites", user_id),
+               style=discord.ButtonStyle.blurple, row=0, disabled=not has_fish),
+    ]
+
+    rarity_options = [
+        discord.SelectOption(label=f"{RARITY_TIERS[tier]} ({units:,} fish)", value=RARITY_TIERS[tier],
+                             description=f"{CURRENCY_SYMBOL}{value:,.2f}")
+        for tier, (units, value) in enumerate(summary) if units
+    ]
+    if rarity_options:
+        items.append(Select(placeholder="Sell all fish of one rarity...", options=rarity_options,
+                            custom_id=component_id("shop_sell_rarity", user_id), row=1))
+
+    catalog, counts = FISH_CATALOG, user_stats.inventory_counts
+    favorite_options = [
+        discord.SelectOption(label=f"{catalog.keys[f]} x{counts[f]:,}"[:100], value=catalog.keys[f],
+                             default=bool((user_stats.favorite_mask >> f) & 1))
+        for f in favorite_candidates(user_stats)
+    ]
+    if favorite_options:
+        items.append(Select(placeholder="Mark favorites (kept when selling)...", options=favorite_options,
+                            min_values=0, max_values=len(favorite_options),
+                            custom_id=component_id("shop_favorites", user_id), row=2))
+
+    items.append(back_button(user_id))
+    return build_view(*items)
+
+def create_shop_embed(user_stats, summary):
+    state_key = (user_stats.koin, user_stats.favorite_mask, summary)
+    return cached_render("shop", user_stats.user_id, state_key, lambda: build_shop_embed(user_stats, summary))
+
+@timed(EMBED_BUILD_SECONDS, "shop")
+def build_shop_embed(user_stats, summary):
+    embed = discord.Embed(
+        title="🏪 Shop & Sell",
+        description="Sell your catch in bulk. Favorite fish are kept by **Sell All Except Favorites**.",
+        color=0xDAA520
+    )
+    embed.add_field(name="Your Money", value=f"**{CURRENCY_SYMBOL}{user_stats['koin']:,.2f}**", inline=False)
+
+    lines = [f"**{RARITY_TIERS[tier]}**: {units:,} fish | {CURRENCY_SYMBOL}{value:,.2f}"
+             for tier, (units, value) in enumerate(summary) if units]
+    total_units = sum(units for units, _ in summary)
+    total_value = sum(value for _, value in summary)
+    lines.append(f"**Total**: {total_units:,} fish | {CURRENCY_SYMBOL}{total_value:,.2f}")
+    embed.add_field(name="Inventory", value="\n".join(lines), inline=False)
+    embed.set_footer(text=f"⭐ Favorites: {len(user_stats['favorites'])} species")
+    return embed
+
+async def refresh_shop(interaction: discord.Interaction, user_stats):
+    summary = inventory_summary(user_stats)
+    await edit_response(interaction, embed=create_shop_embed(user_stats, summary),
+                                            view=shop_view(user_stats, summary))
+
+async def sell_and_refresh(interaction: discord.Interaction, user_id, tier=None, keep_favorites=False):
+    async with user_transaction(user_id) as user_stats:
+        units, coins = sell_inventory(user_stats, tier, keep_favorites)
+    if not units:
+        return await interaction.response.send_message("❌ Nothing to sell!", ephemeral=True)
+    await refresh_shop(interaction, user_stats)
+    OUTBOUND.respond(interaction, content=f"💰 Sold **{units:,}** fish for **{CURRENCY_SYMBOL}{coins:,.2f}**!", ephemeral=True)
+
+@component_handler("main_shop")
+async def open_shop(interaction: discord.Interaction, user_id):
+    await refresh_shop(interaction, get_user_stats(user_id))
+
+@component_handler("shop_sell_all")
+async def shop_sell_all(interaction: discord.Interaction, user_id):
+    await sell_and_refresh(interaction, user_id)
+
+@component_handler("shop_sell_keep_favorites")
+async def shop_sell_keep_favorites(interaction: discord.Interaction, user_id):
+    await sell_and_refresh(interaction, user_id, keep_favorites=True)
+
+@component_handler("shop_sell_rarity")
+async def shop_sell_rarity(interaction: discord.Interaction, user_id):
+    await sell_and_refresh(interaction, user_id, tier=RARITY_TIER_IDS[interaction.data["values"][0]])
+
+@component_handler("shop_favorites")
+async def shop_set_favorites(interaction: discord.Interaction, user_id):
+    selected = set(interaction.data["values"])
+    async with user_transaction(user_id) as user_stats:
+        # Hanya opsi yang tampil di select yang diubah; favorit lain tetap
+        for fish_id in favorite_candidates(user_stats):
+            bit = 1 << fish_id
+            if FISH_CATALOG.keys[fish_id] in selected:
+                user_stats.favorite_mask |= bit
+            else:
+                user_stats.favorite_mask &= ~bit
+    await refresh_shop(interaction, user_stats)
+
+
+# --- Profile ---
+PROFILE_RECORDS_SHOWN = 5
+PROFILE_RECENT_SHOWN = 5
+
+def catch_value(fish_id, weight_kg):
+    return FISH_CATALOG.base_price[fish_id] * max(1.0, weight_kg / FISH_CATALOG.weight_min[fish_id])
+
+def create_profile_embed(user_stats):
+    state_key = (user_stats.koin, user_stats.total_catches, user_stats.rod_id, user_stats.bait_id,
+                 user_stats.island_id, tuple(user_stats.enchant_levels), EVENTS.current_version())
+    return cached_render("profile", user_stats.user_id, state_key, lambda: build_profile_embed(user_stats))
+
+@timed(EMBED_BUILD_SECONDS, "profile")
+def build_profile_embed(user_stats):
+    catalog, log = FISH_CATALOG, user_stats.catch_log
+    embed = discord.Embed(
+        title="👤 Angler Profile",
+        description=f"Fishing at **{user_stats['location']}** with **{user_stats['current_rod']}** "
+                    f"(+{user_stats['rod_enchantment'].get(user_stats['current_rod'], 0)}) and **{user_stats['current_bait']}**.",
+        color=0x808080
+    )
+    embed.add_field(name="Money", value=f"💰 {CURRENCY_SYMBOL}{user_stats['koin']:,.2f}", inline=True)
+    rarest = RARITY_TIERS[user_stats.rarest_tier] if user_stats.rarest_tier >= 0 else "-"
+    embed.add_field(name="Catches", value=f"🐟 {user_stats.total_catches:,} (rarest: {rarest})", inline=True)
+    expected = expected_coins_per_catch(user_stats)
+    embed.add_field(name="Expected Value",
+                    value=f"📈 {CURRENCY_SYMBOL}{expected:,.2f}/catch | {CURRENCY_SYMBOL}{expected * 3600 / COOLDOWN_TIME:,.2f}/hour",
+                    inline=True)
+
+    # Rekor pribadi: tangkapan terberat per ikan, diurutkan berdasarkan nilainya
+    count, _, weight_max, weight_max_time = log.aggregates()
+    caught = [f for f, n in enumerate(count) if n]
+    if caught:
+        heaviest = max(caught, key=lambda f: weight_max[f])
+        embed.add_field(
+            name="🏋️ Heaviest Catch",
+            value=f"**{catalog.names[heaviest]}** {weight_max[heaviest]:,.2f} kg <t:{weight_max_time[heaviest]}:R>",
+            inline=False
+        )
+        records = heapq.nlargest(PROFILE_RECORDS_SHOWN, caught, key=lambda f: catch_value(f, weight_max[f]))
+        embed.add_field(name="🏅 Personal Records", value="\n".join(
+            f"**{catalog.names[f]}** ({catalog.rarity_name(f)}) {weight_max[f]:,.2f} kg | "
+            f"{CURRENCY_SYMBOL}{catch_value(f, weight_max[f]):,.2f} | caught {count[f]:,}x"
+            for f in records
+        ), inline=False)
+
+    recent = log.recent(PROFILE_RECENT_SHOWN)
+    if recent:
+        embed.add_field(name="🕒 Recent Catches", value="\n".join(
+            f"**{catalog.names[f]}** {weight_kg:,.2f} kg at {ISLAND_LIST[island_id]} <t:{timestamp}:R>"
+            for f, weight_kg, timestamp, island_id in recent
+        ), inline=False)
+    return embed
+
+@component_handler("main_profile")
+async def open_profile(interaction: discord.Interaction, user_id):
+    user_stats = get_user_stats(user_id)
+    await edit_response(interaction, embed=create_profile_embed(user_stats), view=back_view(user_id))
+
+
+# --- Fish Implementation (Auto Fishing) ---
+def fishing_view(user_stats):
+    # Tentukan status tombol berdasarkan cooldown
+    is_cooldown = time.time() - user_stats["last_fished"] < COOLDOWN_TIME
+    return cached_render("fish_view", user_stats.user_id, (is_cooldown,), lambda: build_view(
+        Button(
+            label="🎣 Reel In (Auto Fish)!",
+            custom_id=component_id("auto_fish_button", user_stats.user_id),
+            style=discord.ButtonStyle.green,
+            row=0,
+            disabled=is_cooldown
+        ),
+        back_button(user_stats.user_id),
+    ))
+
+@timed(EMBED_BUILD_SECONDS, "fishing")
+def create_fishing_embed(user_stats):
+    embed = discord.Embed(
+        title="🎣 Auto Fishing Management",
+        description=f"You are currently fishing at **{user_stats['location']}** with **{user_stats['current_rod']}** and **{user_stats['current_bait']}**.",
+        color=0x4169E1
+    )
+    remaining = max(0, COOLDOWN_TIME - (time.time() - user_stats["last_fished"]))
+    
+    embed.add_field(name="Cooldown Status", value=f"⏱️ Next Catch: **{remaining:.1f} seconds**", inline=False)
+    embed.add_field(name="Current Luck", value=f"✨ {calculate_total_luck(user_stats)}%", inline=True)
+    embed.add_field(name="Current Money", value=f"💰 {CURRENCY_SYMBOL}{user_stats['koin']:,.2f}", inline=True)
+    embed.add_field(name="Expected Value", value=f"📈 {CURRENCY_SYMBOL}{expected_coins_per_catch(user_stats):,.2f}/catch", inline=True)
+    
+    return embed
+
+def create_result_footer(user_stats):
+    completed_quests = check_quest_completion(user_stats)
+    luck_text = luck_status_text(user_stats, calculate_total_luck(user_stats))
+    
+    footer_text = f"{luck_text} | Next catch in {COOLDOWN_TIME}s."
+    if completed_quests > 0:
+         footer_text = f"⭐ {completed_quests} Quests Ready! | " + footer_text
+    return footer_text
+
+@timed(EMBED_BUILD_SECONDS, "batch")
+def create_batch_embed(user_stats, summary):
+    rarest_tier = max((tier for tier, n in enumerate(summary["tier_counts"]) if n), default=0)
+    embed = discord.Embed(
+        title=f"🎣 Auto Fishing at {user_stats['location']} While You Were Away",
+        description=f"Your line was out for **{summary['count']}** catches.",
+        color=RARITY_COLORS[RARITY_TIERS[rarest_tier]]
+    )
+
+    top_catches = sorted(summary["caught"].items(), key=lambda item: item[1], reverse=True)
+    caught_lines = [f"{FISH_CATALOG.names[fish_id]} x{n}" for fish_id, n in top_catches[:10]]
+    if len(top_catches) > 10:
+        caught_lines.append(f"...and {len(top_catches) - 10} more species")
+    embed.add_field(name="Caught", value="\n".join(caught_lines) or "Nothing this time.", inline=False)
+
+    rarity_text = " | ".join(f"{RARITY_TIERS[tier]}: {n}" for tier, n in enumerate(summary["tier_counts"]) if n)
+    embed.add_field(name="Rarity", value=rarity_text, inline=False)
+    if summary["best_catch"]:
+        fish_id, weight_kg, coins = summary["best_catch"]
+        embed.add_field(name="Best Catch",
+                        value=f"**{FISH_CATALOG.names[fish_id]}** ({weight_kg:,.2f} kg, {CURRENCY_SYMBOL}{coins:,.2f})",
+                        inline=False)
+    if summary["lost"]:
+        embed.add_field(name="Lost", value=f"**{summary['lost']}** fish broke your **{user_stats['current_rod']}**.", inline=True)
+    embed.add_field(name="Reward", value=f"**{CURRENCY_SYMBOL}{summary['coins']:,.2f}**", inline=True)
+
+    embed.set_footer(text=create_result_footer(user_stats))
+    return embed
+
+@timed(EMBED_BUILD_SECONDS, "catch")
+def create_catch_embed(user_stats, catch):
+    """Embed for one perform_fishing result; the catch itself is rolled by the handler."""
+    status, result_data, weight, rarity, coins_earned = catch
+
+    embed = discord.Embed(title=f"🎣 Auto Fishing Catch at {user_stats['location']}!", 
+                          color=RARITY_COLORS.get(rarity, 0x000000))
+
+    if status == "Success":
+        fish_name = FISH_CATALOG.names[result_data]
+
+        embed.description = f"🎉 **{rarity.upper()}!** You auto-reeled in a **{fish_name}**!"
+        embed.add_field(name="Result", 
+                        value=(f"**Rarity:** {rarity}\n"
+                               f"**Weight:** {weight} kg\n"
+                               f"**Reward:** **{CURRENCY_SYMBOL}{coins_earned:,.2f}**"), 
+                        inline=False)
+    else: # Failed
+        embed.description = result_data
+        embed.add_field(name="Weight Lost", value=f"**{weight} kg**", inline=False)
+        embed.color = RARITY_COLORS["Failed"]
+
+    embed.set_footer(text=create_result_footer(user_stats))
+    return embed
+
+@component_handler("auto_fish_button")
+async def auto_fish_callback(interaction: discord.Interaction, user_id):
+    # Cek cooldown dan tangkapan harus atomik: double click tidak boleh dapat dua tangkapan
+    job = embed = None
+    async with user_transaction(user_id) as user_stats:
+        now = time.time()
+        remaining = COOLDOWN_TIME - (now - user_stats["last_fished"])
+        if remaining <= 0:
+            # Semua jendela cooldown yang lewat selama user pergi dihitung sekaligus
+            missed_windows = int((now - user_stats["last_fished"]) // COOLDOWN_TIME) if user_stats["last_fished"] else 1
+            catches = min(missed_windows, MAX_OFFLINE_CATCHES)
+            previous_fished = user_stats["last_fished"]
+            user_stats["last_fished"] = now
+            if catches > 1:
+                job = reserve_catches(user_stats, catches)
+            else:
+                embed = create_catch_embed(user_stats, perform_fishing(user_stats))
+    if remaining > 0:
+        return await interaction.response.send_message(f"Your line is still out! Wait **{remaining:.1f}** seconds for the next catch.", ephemeral=True)
+
+    if job is not None:
+        # Batch besar bisa di-defer dan dikerjakan di pool (run_cpu_job), di luar lock user
+        try:
+            result = await run_cpu_job("catches", catches, resolve_catches, *job, interaction=interaction)
+        except Exception as e:
+            # Posisi stream dan last_fished sudah di-commit: tanpa apply, tangkapan batch ini hilang.
+            # Batch di-roll inline; kalau itu pun gagal, reservasinya dikembalikan
+            print(f"Catch batch for user {user_id} failed ({e!r}), resolving inline")
+            try:
+                result = resolve_catches(*job)
+            except Exception:
+                async with user_transaction(user_id) as user_stats:
+                    # Hanya kalau tidak ada klik lain yang memajukan stream sesudah reservasi ini
+                    first_index, count = job[5], job[6]
+                    if user_stats.catch_index == first_index + count and user_stats["last_fished"] == now:
+                        user_stats.catch_index = first_index
+                        user_stats["last_fished"] = previous_fished
+                raise
+        async with user_transaction(user_id) as user_stats:
+            if result is not None:
+                embed = create_batch_embed(user_stats, apply_catches(user_stats, result, now))
+            else:
+                embed = create_catch_embed(user_stats, perform_fishing(user_stats))
+
+    # Update embed dan view (tombol disabled selama cooldown); tangkapan sudah di-commit
+    await edit_response(interaction, embed=create_fishing_embed(user_stats), view=fishing_view(user_stats))
+
+    # Tombol diaktifkan lagi oleh COOLDOWN_TIMERS saat cooldown habis
+    COOLDOWN_TIMERS.schedule(user_id, interaction, now + COOLDOWN_TIME)
+
+    # Hasil pancingan dikirim sebagai pesan publik, digabung dengan tangkapan lain di channel yang sama
+    OUTBOUND.announce(interaction, embed)
+
+
+# --- COOLDOWN TIMERS ---
+# Batas edit pesan per detik dari scheduler, supaya re-enable massal tidak memicu rate limit Discord
+COOLDOWN_EDITS_PER_SECOND = int(os.environ.get('FISHING_COOLDOWN_EDITS_PER_SECOND', '40'))
+
+class CooldownScheduler:
+    """One heap of cooldown deadlines for all users, drained by a single task that re-enables the fish button."""
+
+    def __init__(self, edits_per_second):
+        self.edits_per_second = edits_per_second
+        self._heap: List[Tuple[float, int]] = []
+        # user_id -> (due, interaction, message_id); satu timer per user, jadwal baru menimpa yang lama
+        self._pending: Dict[int, Tuple[float, discord.Interaction, Optional[int]]] = {}
+        self._wakeup = asyncio.Event()
+        self.stats = {"edits": 0, "retries": 0, "dropped": 0}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def schedule(self, user_id, interaction, due):
+        message_id = interaction.message.id if interaction.message else None
+        self._pending[user_id] = (due, interaction, message_id)
+        heapq.heappush(self._heap, (due, user_id))
+        if self._heap[0] == (due, user_id):
+            self._wakeup.set()
+
+    def due(self, user_id, message_id=None):
+        """Deadline of the user's pending timer (for ``message_id`` if given), or None."""
+        entry = self._pending.get(user_id)
+        if entry is not None and (message_id is None or entry[2] == message_id):
+            return entry[0]
+        return None
+
+    def cancel(self, user_id, message_id=None, due=None):
+        # Entri di heap dibiarkan; saat di-pop, entri tanpa pasangan di _pending dilewati.
+        # Dengan due, hanya timer itu yang dibatalkan, bukan jadwal baru yang dibuat sesudahnya
+        entry = self._pending.get(user_id)
+        if entry is not None and (message_id is None or entry[2] == message_id) and (due is None or entry[0] == due):
+            del self._pending[user_id]
+
+    def pop_due(self, now, limit):
+        batch = []
+        while self._heap and self._heap[0][0] <= now and len(batch) < limit:
+            due, user_id = heapq.heappop(self._heap)
+            entry = self._pending.get(user_id)
+            if entry is None or entry[0] != due:
+                continue
+            del self._pending[user_id]
+            batch.append((user_id, entry[1]))
+        return batch
+
+    async def refresh(self, user_id, interaction):
+        user_stats = get_user_stats(user_id)
+        try:
+            await interaction.edit_original_response(embed=create_fishing_embed(user_stats), view=fishing_view(user_stats))
+            self.stats["edits"] += 1
+        except discord.NotFound:
+            # Pesan ephemeral sudah ditutup atau token interaction kadaluarsa
+            self.stats["dropped"] += 1
+        except discord.HTTPException as e:
+            if e.status != 429:
+                self.stats["dropped"] += 1
+                return
+            self.stats["retries"] += 1
+            retry_after = getattr(e, "retry_after", None) or 1.0
+            if user_id not in self._pending:
+                self.schedule(user_id, interaction, time.time() + retry_after)
+        except Exception as e:
+            # Satu edit yang gagal tidak boleh menghentikan task scheduler
+            print(f"Failed to re-enable fish button for {user_id}: {e}")
+            self.stats["dropped"] += 1
+
+    async def run(self):
+        while True:
+            batch = self.pop_due(time.time(), self.edits_per_second)
+            if batch:
+                await asyncio.gather(*(self.refresh(user_id, interaction) for user_id, interaction in batch))
+                # Jeda sebanding dengan jumlah edit: rata-rata tidak lebih dari edits_per_second
+                await asyncio.sleep(len(batch) / self.edits_per_second)
+                continue
+            self._wakeup.clear()
+            timeout = max(0.0, self._heap[0][0] - time.time()) if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+COOLDOWN_TIMERS = CooldownScheduler(COOLDOWN_EDITS_PER_SECOND)
+
+
+# --- OUTBOUND SEND QUEUE ---
+# Hasil tangkapan publik di channel yang sama digabung jadi satu pesan per jendela ini (detik)
+OUTBOUND_BATCH_SECONDS = float(os.environ.get('FISHING_OUTBOUND_BATCH_SECONDS', '3'))
+OUTBOUND_SENDS_PER_SECOND = float(os.environ.get('FISHING_OUTBOUND_SENDS_PER_SECOND', '20'))
+# Batas Discord per pesan
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+PRIORITY_RESPONSE = 0
+PRIORITY_ANNOUNCEMENT = 1
+
+async def followup_sender(interaction, **kwargs):
+    await interaction.followup.send(**kwargs)
+
+class OutboundQueue:
+    """Follow-up message queue: ephemeral responses go first, public catch embeds are merged per channel."""
+
+    def __init__(self, sender, batch_seconds, sends_per_second):
+        self.sender = sender
+        self.batch_seconds = batch_seconds
+        self.send_interval = 1.0 / sends_per_second
+        # Item: (enqueued_at, interaction, payload); payload = kwargs untuk response, Embed untuk announcement
+        self._responses = deque()
+        self._announcements: Dict[Optional[int], deque] = {}
+        # channel_id -> waktu channel boleh dikirimi lagi setelah 429
+        self._blocked_until: Dict[Optional[int], float] = {}
+        # Response yang channel-nya kena 429: heap (ready_at, seq, item), dijadwalkan ulang per channel
+        self._retries: List[Tuple[float, int, Tuple]] = []
+        self._retry_seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self.depth = 0
+        self.stats = {"messages": 0, "embeds": 0, "responses": 0, "rate_limited": 0, "dropped": 0,
+                      "latency_total": 0.0, "latency_max": 0.0}
+
+    def respond(self, interaction, **kwargs):
+        self._responses.append((time.time(), interaction, kwargs))
+        self.depth += 1
+        self._wakeup.set()
+
+    def announce(self, interaction, embed):
+        self._announcements.setdefault(interaction.channel_id, deque()).append((time.time(), interaction, embed))
+        self.depth += 1
+        self._wakeup.set()
+
+    def retry_response(self, ready_at, item):
+        heapq.heappush(self._retries, (ready_at, next(self._retry_seq), item))
+
+    def unblock(self, channel_id, now):
+        if self._blocked_until.get(channel_id, now) < now:
+            del self._blocked_until[channel_id]
+        return channel_id
+
+    def next_job(self, now):
+        """(priority, channel_id, items) yang siap dikirim, atau (None, detik sampai ada yang siap)."""
+        if self._retries and self._retries[0][0] <= now:
+            item = heapq.heappop(self._retries)[2]
+            return (PRIORITY_RESPONSE, self.unblock(item[1].channel_id, now), [item]), 0.0
+        while self._responses:
+            item = self._responses.popleft()
+            channel_id = item[1].channel_id
+            blocked_until = self._blocked_until.get(channel_id, 0.0)
+            if blocked_until <= now:
+                return (PRIORITY_RESPONSE, self.unblock(channel_id, now), [item]), 0.0
+            # Channel ini masih menunggu retry_after; response lain tetap jalan
+            self.retry_response(blocked_until, item)
+        wait = self._retries[0][0] - now if self._retries else None
+        for channel_id, items in self._announcements.items():
+            ready_at = self._blocked_until.get(channel_id, 0.0)
+            if len(items) < MAX_EMBEDS_PER_MESSAGE:
+                ready_at = max(ready_at, items[0][0] + self.batch_seconds)
+            if ready_at <= now:
+                return (PRIORITY_ANNOUNCEMENT, channel_id, self.take_batch(channel_id)), 0.0
+            wait = ready_at - now if wait is None else min(wait, ready_at - now)
+        return None, wait
+
+    def take_batch(self, channel_id):
+        items = self._announcements[channel_id]
+        batch, chars = [], 0
+        while items and len(batch) < MAX_EMBEDS_PER_MESSAGE and (not batch or chars + len(items[0][2]) <= MAX_EMBED_CHARS_PER_MESSAGE):
+            chars += len(items[0][2])
+            batch.append(items.popleft())
+        if not items:
+            del self._announcements[channel_id]
+        self._blocked_until.pop(channel_id, None)
+        return batch
+
+    async def send(self, priority, channel_id, items):
+        # Token interaction terbaru paling lama masa berlakunya (15 menit)
+        interaction = items[-1][1]
+        if priority == PRIORITY_RESPONSE:
+            kwargs = items[0][2]
+        else:
+            kwargs = {"embeds": [embed for _, _, embed in items]}
+        try:
+            await self.sender(interaction, **kwargs)
+        except discord.HTTPException as e:
+            if e.status != 429:
+                return self.drop(items, e)
+            # Kembalikan ke depan antrian; channel lain tetap jalan selama channel ini menunggu
+            self.stats["rate_limited"] += 1
+            retry_after = getattr(e, "retry_after", None) or 1.0
+            self._blocked_until[channel_id] = time.time() + retry_after
+            if priority == PRIORITY_RESPONSE:
+                self.retry_response(self._blocked_until[channel_id], items[0])
+            else:
+                self._announcements.setdefault(channel_id, deque()).extendleft(reversed(items))
+            return
+        except Exception as e:
+            return self.drop(items, e)
+
+        now = time.time()
+        self.depth -= len(items)
+        self.stats["messages"] += 1
+        self.stats["responses" if priority == PRIORITY_RESPONSE else "embeds"] += len(items)
+        priority_name = "response" if priority == PRIORITY_RESPONSE else "announcement"
+        for enqueued_at, _, _ in items:
+            OUTBOUND_LATENCY_SECONDS.observe(now - enqueued_at, priority_name)
+            self.stats["latency_total"] += now - enqueued_at
+            self.stats["latency_max"] = max(self.stats["latency_max"], now - enqueued_at)
+
+    def drop(self, items, error):
+        print(f"Failed to send {len(items)} outbound item(s): {error}")
+        self.stats["dropped"] += len(items)
+        self.depth -= len(items)
+
+    async def run(self):
+        while True:
+            job, wait = self.next_job(time.time())
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.send(*job)
+            await asyncio.sleep(self.send_interval)
+
+    def get_stats(self):
+        delivered = self.stats["embeds"] + self.stats["responses"]
+        waiting_since = [items[0][0] for items in self._announcements.values()]
+        if self._responses:
+            waiting_since.append(self._responses[0][0])
+        waiting_since.extend(item[0] for _, _, item in self._retries)
+        oldest = min(waiting_since, default=None)
+        return {
+            **self.stats,
+            "depth": self.depth,
+            "oldest_wait": time.time() - oldest if oldest is not None else 0.0,
+            "latency_avg": self.stats["latency_total"] / delivered if delivered else 0.0,
+        }
+
+OUTBOUND = OutboundQueue(followup_sender, OUTBOUND_BATCH_SECONDS, OUTBOUND_SENDS_PER_SECOND)
+
+# Nilai yang sudah dihitung di tempat lain dibaca saat scrape
+Gauge("fishing_resident_users", "Users held in memory.", lambda: len(USER_DATA))
+Gauge("fishing_user_cache_total", "User cache lookups by result.", lambda: dict(USER_CACHE_STATS), label="result", kind="counter")
+Gauge("fishing_pending_writes", "Dirty users waiting for the write-behind flush.", lambda: len(_DIRTY_USERS) + len(_PENDING_WRITES))
+Gauge("fishing_outbound_queue_depth", "Follow-ups waiting in the outbound queue.", lambda: OUTBOUND.depth)
+Gauge("fishing_outbound_oldest_wait_seconds", "Age of the oldest queued follow-up.", lambda: OUTBOUND.get_stats()["oldest_wait"])
+Gauge("fishing_outbound_total", "Outbound queue results.", lambda: {k: OUTBOUND.stats[k] for k in ("messages", "rate_limited", "dropped")},
+      label="result", kind="counter")
+Gauge("fishing_cooldown_timers_pending", "Fish buttons waiting to be re-enabled.", lambda: len(COOLDOWN_TIMERS))
+Gauge("fishing_event_version", "EventEngine version (changes when active boosts change).", lambda: EVENTS.version)
+Gauge("fishing_sampler_cache_size", "Cached fish samplers.", lambda: len(_SAMPLER_CACHE))
+
+
+# --- BOT EVENTS & COMMANDS ---
+
+_BACKGROUND_TASKS: Dict[str, asyncio.Task] = {}
+
+def start_background_task(name, coro_fn):
+    # on_ready bisa terpanggil lagi setelah reconnect, jadi tiap task hanya dibuat sekali
+    if name not in _BACKGROUND_TASKS:
+        _BACKGROUND_TASKS[name] = asyncio.create_task(coro_fn(), name=name)
+
+@bot.event
+async def on_ready():
+    """Dipanggil saat bot berhasil login."""
+    print(f'Bot is ready. Logged in as {bot.user}')
+    start_background_task("write_behind_flusher", write_behind_flusher)
+    start_background_task("daily_reset_scheduler", daily_reset_scheduler)
+    start_background_task("cooldown_scheduler", COOLDOWN_TIMERS.run)
+    start_background_task("outbound_queue", OUTBOUND.run)
+    if BUS is not None:
+        start_background_task("bus_listener", bus_listener)
+    if METRICS_ENABLED:
+        start_background_task("metrics_server", serve_metrics)
+        start_background_task("loop_lag_monitor", monitor_loop_lag)
+    await bot.change_presence(activity=discord.Game(name=f"R$ Fishing | /menu"))
+    
+    # Slash command di-sync otomatis oleh py-cord saat connect
+
+def legacy_menu_owner(interaction):
+    """Owner of a menu without a user id in its custom_id: the user who ran the /menu it answers."""
+    metadata = getattr(interaction.message, "interaction_metadata", None)
+    user = getattr(metadata, "user", None)
+    return user.id if user is not None else None
+
+@bot.listen("on_interaction")
+async def route_component(interaction: discord.Interaction):
+    """Satu router untuk semua tombol/select: custom_id -> COMPONENT_HANDLERS."""
+    if interaction.type != discord.InteractionType.component:
+        return
+    custom_id = interaction.data.get("custom_id", "")
+    parsed = parse_component_id(custom_id)
+    if parsed is None:
+        # Menu yang dikirim sebelum format custom_id baru: pemiliknya diambil dari /menu yang dijawab pesan itu
+        if custom_id not in COMPONENT_HANDLERS:
+            return
+        owner_id = legacy_menu_owner(interaction)
+        if owner_id is None:
+            return await interaction.response.send_message("This menu has expired. Use /menu to open a new one.",
+                                                           ephemeral=True)
+        parsed = (custom_id, owner_id)
+    action, user_id = parsed
+    handler = COMPONENT_HANDLERS.get(action)
+    if handler is None:
+        return
+    if interaction.user.id != user_id:
+        return await interaction.response.send_message("This is not your menu!", ephemeral=True)
+    started = time.perf_counter()
+    track_response(interaction)
+    try:
+        if not owns_user(user_id):
+            action = "forward"
+            return await forward_interaction(interaction, user_id)
+        # Timer re-enable tombol fishing di pesan ini dibatalkan oleh edit_response, hanya kalau
+        # handler benar-benar meng-edit pesannya (bukan balasan ephemeral seperti "line is still out")
+        await handler(interaction, user_id)
+    except Exception:
+        INTERACTION_ERRORS.inc(action)
+        raise
+    finally:
+        observe_interaction(action, interaction, started)
+
+@bot.slash_command(name="menu", description="Membuka Menu Utama Bot Memancing Interaktif.")
+async def menu_command(ctx: discord.ApplicationContext):
+    user_id = ctx.author.id
+    started = time.perf_counter()
+    track_response(ctx.interaction)
+    if not owns_user(user_id):
+        await forward_interaction(ctx.interaction, user_id)
+        return observe_interaction("forward", ctx.interaction, started)
+    await ctx.respond(
+        embed=create_main_embed(user_id), 
+        view=main_menu_view(user_id),
+        ephemeral=True # Hanya bisa dilihat oleh pengguna (disarankan untuk menu)
+    )
+    observe_interaction("menu", ctx.interaction, started)
+
+# --- RUN BOT ---
+
+def run_shard_processes(processes):
+    env = {**os.environ, "FISHING_SHARD_PROCESSES": str(processes)}
+    children = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__)], env={**env, "FISHING_PROCESS_INDEX": str(index)})
+        for index in range(processes)
+    ]
+    try:
+        return max(child.wait() for child in children)
+    except KeyboardInterrupt:
+        for child in children:
+            child.terminate()
+        return max(child.wait() for child in children)
+
+# Untuk Replit: Anda harus mengimpor dan memanggil keep_alive di sini
+# from keep_alive import keep_alive
+# keep_alive()
+
+if __name__ == "__main__":
+    # `python main.py compile-catalog` dipakai saat build/deploy, bot tidak dijalankan
+    if len(sys.argv) > 1 and sys.argv[1] == "compile-catalog":
+        compile_fish_catalog()
+        print(f"Compiled {len(FISH_CATALOG)} fish into {FISH_CATALOG_PATH}")
+        sys.exit(0)
+
+    # `python main.py run-shards N`: jalankan N proses bot, masing-masing dengan sebagian shard
+    if len(sys.argv) > 2 and sys.argv[1] == "run-shards":
+        sys.exit(run_shard_processes(int(sys.argv[2])))
+
+    if TOKEN:
+        load_leaderboards()
+        start_offload_pool()
+        try:
+            bot.run(TOKEN)
+        finally:
+            stop_offload_pool()
+            # Simpan sisa perubahan yang belum sempat di-flush
+            flush_dirty_users()
+            close_user_store()
+            if BUS is not None:
+                BUS.close()
+    else:
+        print("FATAL ERROR: Bot tidak dapat dijalankan karena Token Discord tidak ditemukan.")
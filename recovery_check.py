@@ -0,0 +1,185 @@
+"""Crash-recovery check for the write-behind storage in main.py (SQLiteUserStore + flush).
+
+A child process keeps rewriting every user's koin to a new generation number and flushes after
+each generation, printing the generation once the flush returned. The parent SIGKILLs it at a
+random moment, reopens the database and checks:
+
+- the file passes PRAGMA integrity_check and every row loads as a UserStats;
+- each flush is atomic: all rows of one partition hold the same generation;
+- nothing acknowledged was lost: the stored generation is at least the last one printed;
+- the score columns match the JSON data.
+
+A clean run stops the child normally instead, which must persist the unflushed generation too.
+Finally the shutdown path is checked in-process: the write-behind flusher is cancelled at every
+point of one flush (between serialization chunks and during the write), then flush_dirty_users
+runs as main does on exit, and every user must be stored with the latest generation.
+
+    python recovery_check.py                        # 20 kill, 2000 user
+    python recovery_check.py --kills 100 --users 10000 --partitions 4 --resident 500
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+# Jangan sentuh database pemain saat mengimpor main (child memakai path dari parent)
+os.environ.setdefault("FISHING_DB_PATH", ":memory:")
+
+import main
+
+
+def run_child(users, generations, clean_exit):
+    """Rewrite and flush every user ``generations`` times; with ``clean_exit`` skip the last flush
+    and leave it to the same shutdown path the bot uses."""
+    user_ids = range(1, users + 1)
+    for generation in range(1, generations + 1):
+        for user_id in user_ids:
+            main.get_user_stats(user_id)["koin"] = float(generation)
+            main.mark_dirty(user_id)
+        if clean_exit and generation == generations:
+            break
+        main.flush_dirty_users()
+        print(generation, flush=True)
+    if clean_exit:
+        main.flush_dirty_users()
+        main.close_user_store()
+
+
+def child_env(db_path, args):
+    return {**os.environ, "FISHING_DB_PATH": db_path, "FISHING_DB_PARTITIONS": str(args.partitions),
+            "FISHING_MAX_RESIDENT_USERS": str(args.resident)}
+
+
+def child_command(args, generations, clean_exit=False):
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--users", str(args.users),
+               "--generations", str(generations)]
+    return command + ["--clean-exit"] if clean_exit else command
+
+
+def stored_generations(db_path, args):
+    """{partition path: set of generations} after checking integrity and row consistency."""
+    found = {}
+    paths = main.partition_paths(db_path, args.partitions) if args.partitions > 1 else [db_path]
+    for path in paths:
+        conn = sqlite3.connect(path)
+        try:
+            assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok", path
+            generations = set()
+            # Child bisa mati sebelum tabelnya dibuat
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'users'").fetchone() is None:
+                found[path] = generations
+                continue
+            for user_id, data, koin, total_catches, rarest_tier in conn.execute(
+                    "SELECT user_id, data, koin, total_catches, rarest_tier FROM users"):
+                stats = main.UserStats.from_dict(json.loads(data), user_id)
+                assert (stats.koin, stats.total_catches, stats.rarest_tier) == (koin, total_catches, rarest_tier), user_id
+                generations.add(koin)
+            found[path] = generations
+        finally:
+            conn.close()
+    return found
+
+
+def kill_run(db_path, args, rng):
+    child = subprocess.Popen(child_command(args, 10**9), env=child_env(db_path, args),
+                             stdout=subprocess.PIPE, text=True)
+    time.sleep(rng.uniform(args.min_delay, args.max_delay))
+    child.send_signal(signal.SIGKILL)
+    output, _ = child.communicate()
+    acknowledged = int(output.split()[-1]) if output.split() else 0
+
+    for path, generations in stored_generations(db_path, args).items():
+        assert len(generations) <= 1, f"{path}: flush not atomic, generations {sorted(generations)}"
+        stored = max(generations, default=0)
+        assert stored >= acknowledged, f"{path}: generation {acknowledged} acknowledged but {stored} stored"
+    return acknowledged
+
+
+def clean_run(db_path, args):
+    generations = 3
+    subprocess.run(child_command(args, generations, clean_exit=True), env=child_env(db_path, args),
+                   stdout=subprocess.DEVNULL, check=True)
+    for path, stored in stored_generations(db_path, args).items():
+        assert stored == {float(generations)}, f"{path}: shutdown flush lost data, generations {sorted(stored)}"
+
+
+async def cancel_flusher(steps):
+    """Start write_behind_flusher, give it ``steps`` loop turns, cancel it. True if one flush had
+    already finished, i.e. later steps would not cancel anything new."""
+    task = asyncio.create_task(main.write_behind_flusher())
+    for _ in range(steps):
+        await asyncio.sleep(0)
+    finished = not main._DIRTY_USERS and not main._IN_FLIGHT_WRITES and not main._PENDING_WRITES
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    return finished
+
+
+def cancel_runs(tmp, args):
+    main.FLUSH_INTERVAL_MS = 0
+    main.FLUSH_CHUNK_USERS = args.chunk
+    main.DB_PARTITIONS = args.partitions
+    user_ids = range(1, args.cancel_users + 1)
+    for steps in range(1, 1000):
+        db_path = os.path.join(tmp, f"cancel{steps}.db")
+        main.DB_PATH = db_path
+        for user_id in user_ids:
+            main.get_user_stats(user_id)["koin"] = float(steps)
+            main.mark_dirty(user_id)
+        finished = asyncio.run(cancel_flusher(steps))
+        # Sama seperti blok __main__ di main.py setelah bot.run selesai
+        main.flush_dirty_users()
+        main.close_user_store()
+        stored = stored_generations(db_path, args)
+        rows = sum(sqlite3.connect(path).execute("SELECT COUNT(*) FROM users").fetchone()[0] for path in stored)
+        assert rows == args.cancel_users, f"cancelled after {steps} steps: {rows}/{args.cancel_users} users stored"
+        for path, generations in stored.items():
+            assert generations == {float(steps)}, f"{path}: cancelled after {steps} steps, generations {sorted(generations)}"
+        if finished:
+            return steps
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kills", type=int, default=20)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--partitions", type=int, default=1)
+    parser.add_argument("--resident", type=int, default=main.MAX_RESIDENT_USERS,
+                        help="FISHING_MAX_RESIDENT_USERS for the child; below --users exercises eviction")
+    parser.add_argument("--min-delay", type=float, default=0.5, help="seconds before the kill (includes import)")
+    parser.add_argument("--max-delay", type=float, default=3.0)
+    parser.add_argument("--cancel-users", type=int, default=200, help="dirty users for the cancelled-flusher runs")
+    parser.add_argument("--chunk", type=int, default=50, help="FLUSH_CHUNK_USERS for the cancelled-flusher runs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--generations", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--clean-exit", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    if args.child:
+        run_child(args.users, args.generations, args.clean_exit)
+        sys.exit(0)
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        for run in range(args.kills):
+            db_path = os.path.join(tmp, f"kill{run}.db")
+            acknowledged = kill_run(db_path, args, rng)
+            print(f"kill {run + 1:>3}/{args.kills}: recovered, last acknowledged generation {acknowledged}")
+        clean_run(os.path.join(tmp, "clean.db"), args)
+        print("clean shutdown: unflushed generation persisted")
+        steps = cancel_runs(tmp, args)
+        print(f"flusher cancelled at each of {steps} steps: nothing lost by the shutdown flush")
+    print("OK")
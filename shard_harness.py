@@ -0,0 +1,320 @@
+"""Local harness for the multi-process shard mode in main.py.
+
+Starts N bot processes (FISHING_SHARD_PROCESSES=N), each logged in against its own fake
+Discord HTTP API process so the fake API is not the bottleneck. A fake gateway routes INTERACTION_CREATE payloads to the process running the
+guild's shard, exactly like Discord does, so clicks for one user arrive on several processes
+and must be forwarded to the owner. Afterwards it checks consistency and reports throughput:
+
+    python shard_harness.py --processes 1 2 4 --users 500 --guilds 32 --clicks 5000
+
+Consistency: every click gets exactly one interaction callback, every user's total_catches in
+the (partitioned) database equals the number of clicks sent for that user, and an event boost
+set on process 0 reaches every other process.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Proses harness sendiri hanya memakai helper main.py; jangan sentuh database pemain
+os.environ.setdefault("FISHING_DB_PATH", ":memory:")
+
+API_VERSION = 10
+DISCORD_EPOCH_MS = 1420070400000
+APPLICATION_ID = "1000"
+BATCH_SIZE = 100
+EVENT_BOOST_MULTIPLIER = 3.0
+
+
+def snowflake(rng):
+    timestamp_ms = int(time.time() * 1000) - DISCORD_EPOCH_MS - rng.randrange(10**11)
+    return (timestamp_ms << 22) | rng.randrange(1 << 22)
+
+
+def message_payload(body, message_id="1", channel_id="1"):
+    return {
+        "id": message_id, "channel_id": channel_id, "type": 0, "content": body.get("content") or "",
+        "author": {"id": APPLICATION_ID, "username": "fishing-bot", "discriminator": "0", "avatar": None},
+        "attachments": [], "embeds": body.get("embeds") or [], "components": [], "mentions": [],
+        "mention_roles": [], "pinned": False, "mention_everyone": False, "tts": False,
+        "timestamp": "2024-01-01T00:00:00+00:00", "edited_timestamp": None, "flags": 0,
+    }
+
+
+# --- FAKE DISCORD HTTP API ---
+def run_fake_api(port, ready):
+    from aiohttp import web
+
+    stats = {"callbacks": 0, "duplicate_callbacks": 0, "followups": 0, "followup_embeds": 0, "edits": 0}
+    answered = set()
+
+    def json_response(data, status=200):
+        # py-cord hanya mem-parse body kalau content-type persis "application/json"
+        return web.Response(body=json.dumps(data), status=status, headers={"Content-Type": "application/json"})
+
+    async def users_me(request):
+        return json_response({"id": APPLICATION_ID, "username": "fishing-bot", "discriminator": "0",
+                              "avatar": None, "bot": True})
+
+    async def interaction_callback(request):
+        interaction_id = request.match_info["interaction_id"]
+        if interaction_id in answered:
+            stats["duplicate_callbacks"] += 1
+        answered.add(interaction_id)
+        stats["callbacks"] += 1
+        # py-cord meminta with_response=true dan membaca body JSON-nya
+        return json_response({"interaction": {"id": interaction_id, "type": 3}})
+
+    async def webhook_send(request):
+        body = json.loads((await request.post()).get("payload_json") or "{}") if request.content_type.startswith(
+            "multipart") else await request.json()
+        stats["followups"] += 1
+        stats["followup_embeds"] += len(body.get("embeds") or [])
+        return json_response(message_payload(body))
+
+    async def webhook_edit(request):
+        stats["edits"] += 1
+        return json_response(message_payload(await request.json()))
+
+    async def webhook_get(request):
+        return json_response(message_payload({}))
+
+    async def get_stats(request):
+        return json_response(stats)
+
+    async def reset_stats(request):
+        answered.clear()
+        for key in stats:
+            stats[key] = 0
+        return json_response(stats)
+
+    app = web.Application()
+    base = f"/api/v{API_VERSION}"
+    app.router.add_get(f"{base}/users/@me", users_me)
+    app.router.add_post(f"{base}/interactions/{{interaction_id}}/{{token}}/callback", interaction_callback)
+    app.router.add_post(f"{base}/webhooks/{{application_id}}/{{token}}", webhook_send)
+    app.router.add_patch(f"{base}/webhooks/{{application_id}}/{{token}}/messages/{{message_id}}", webhook_edit)
+    app.router.add_get(f"{base}/webhooks/{{application_id}}/{{token}}/messages/{{message_id}}", webhook_get)
+    app.router.add_get("/_stats", get_stats)
+    app.router.add_post("/_reset", reset_stats)
+
+    async def serve():
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+# --- SHARD WORKER ---
+def run_worker(env, inbox, results, set_boost):
+    os.environ.update(env)
+    import main
+
+    # Tiap klik = tepat satu tangkapan, supaya total_catches bisa dicocokkan dengan jumlah klik
+    main.COOLDOWN_TIME = 1e-6
+    main.MAX_OFFLINE_CATCHES = 1
+
+    async def serve():
+        # Login HTTP saja (tanpa websocket gateway); payload datang dari fake gateway lewat inbox
+        await main.bot.login("harness-token")
+        main.start_background_task("write_behind_flusher", main.write_behind_flusher)
+        main.start_background_task("cooldown_scheduler", main.COOLDOWN_TIMERS.run)
+        main.start_background_task("outbound_queue", main.OUTBOUND.run)
+        if main.BUS is not None:
+            main.start_background_task("bus_listener", main.bus_listener)
+        if set_boost:
+            main.set_event_boost(EVENT_BOOST_MULTIPLIER, True)
+        results.put(("ready", main.PROCESS_INDEX))
+
+        loop = asyncio.get_running_loop()
+        handled = 0
+        while True:
+            batch = await loop.run_in_executor(None, inbox.get)
+            if batch is None:
+                break
+            for payload in batch:
+                main.bot._connection.parse_interaction_create(payload)
+            handled += len(batch)
+            await asyncio.sleep(0)
+
+        # Beri waktu task interaction, bus dan antrian outbound yang tersisa, lalu tulis semua ke database
+        await asyncio.sleep(0.5)
+        deadline = time.time() + 10
+        while main.OUTBOUND.depth and time.time() < deadline:
+            await asyncio.sleep(0.05)
+        main.flush_dirty_users()
+        results.put(("done", main.PROCESS_INDEX, {
+            "received": handled,
+            "resident_users": len(main.USER_DATA),
+            "foreign_users": sum(1 for user_id in main.USER_DATA if not main.owns_user(user_id)),
+            "event_luck": main.EVENTS.luck_multiplier(main.ISLAND_LIST[0]),
+            "outbound": main.OUTBOUND.get_stats(),
+        }))
+        await main.bot.http.close()
+
+    asyncio.run(serve())
+
+
+# --- FAKE GATEWAY ---
+def click_payload(index, user_id, guild_id, channel_id):
+    return {
+        "id": str(10**17 + index), "type": 3, "token": f"harness-token-{index}", "version": 1,
+        "application_id": APPLICATION_ID, "guild_id": str(guild_id), "channel_id": str(channel_id),
+        "member": {"user": {"id": str(user_id), "username": f"angler{user_id % 10000}", "discriminator": "0",
+                            "avatar": None},
+                   "roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False},
+        "data": {"custom_id": f"fish:auto_fish_button:{user_id}", "component_type": 2},
+        # Pesan menu (ephemeral) tempat tombol diklik; satu menu per user
+        "message": message_payload({}, message_id=str(user_id), channel_id=str(channel_id)),
+    }
+
+
+def http_json(port, method, path):
+    import urllib.request
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", method=method)
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def count_catches(db_path, partitions):
+    import main
+    totals = {}
+    paths = main.partition_paths(db_path, partitions) if partitions > 1 else [db_path]
+    for path in paths:
+        with sqlite3.connect(path) as conn:
+            totals.update(conn.execute("SELECT user_id, total_catches FROM users").fetchall())
+    return totals
+
+
+def api_stats(ports):
+    totals = {}
+    for port in ports:
+        for key, value in http_json(port, "GET", "/_stats").items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def run_trial(processes, args):
+    ports = [args.port + index for index in range(processes)]
+    rng = random.Random(args.seed)
+    users = [snowflake(rng) for _ in range(args.users)]
+    guilds = [(snowflake(rng), snowflake(rng)) for _ in range(args.guilds)]
+    shard_count = processes * args.shards_per_process
+    workdir = tempfile.mkdtemp(prefix="fishing_shards_")
+    db_path = os.path.join(workdir, "users.db")
+
+    env = {
+        "FISHING_SHARD_PROCESSES": str(processes),
+        "FISHING_SHARD_COUNT": str(shard_count),
+        "FISHING_DB_PATH": db_path,
+        "FISHING_DB_PARTITIONS": str(args.partitions),
+        "FISHING_BUS_PATH": os.path.join(workdir, "bus.db"),
+        "FISHING_CATALOG_PATH": os.path.join(workdir, "fish_catalog.json"),
+        "FISHING_OUTBOUND_BATCH_SECONDS": "0.2",
+        "FISHING_OUTBOUND_SENDS_PER_SECOND": "1000",
+        "FISHING_COOLDOWN_EDITS_PER_SECOND": "1000",
+    }
+    for port in ports:
+        http_json(port, "POST", "/_reset")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    inboxes = [ctx.Queue() for _ in range(processes)]
+    workers = [
+        ctx.Process(target=run_worker, args=({**env, "FISHING_PROCESS_INDEX": str(index),
+                                              "DISCORD_API_BASE_URL": f"http://127.0.0.1:{ports[index]}/api/v{{API_VERSION}}"},
+                                             inboxes[index], results, index == 0 and processes > 1))
+        for index in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for _ in workers:
+        results.get(timeout=120)
+
+    # Gateway Discord mengirim interaction ke shard (guild_id >> 22) % shard_count
+    sent_per_user = dict.fromkeys(users, 0)
+    batches = [[] for _ in range(processes)]
+    started = time.perf_counter()
+    for index in range(args.clicks):
+        user_id = users[rng.randrange(len(users))]
+        guild_id, channel_id = guilds[rng.randrange(len(guilds))]
+        sent_per_user[user_id] += 1
+        target = ((guild_id >> 22) % shard_count) % processes
+        batches[target].append(click_payload(index, user_id, guild_id, channel_id))
+        if len(batches[target]) >= BATCH_SIZE:
+            inboxes[target].put(batches[target])
+            batches[target] = []
+    for target, batch in enumerate(batches):
+        if batch:
+            inboxes[target].put(batch)
+
+    deadline = time.time() + args.timeout
+    while api_stats(ports)["callbacks"] < args.clicks and time.time() < deadline:
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+
+    for inbox in inboxes:
+        inbox.put(None)
+    reports = {}
+    for _ in workers:
+        _, index, report = results.get(timeout=60)
+        reports[index] = report
+    for worker in workers:
+        worker.join()
+    # Dibaca setelah worker selesai mengosongkan antrian outbound
+    stats = api_stats(ports)
+
+    totals = count_catches(db_path, args.partitions)
+    mismatched = [user_id for user_id, sent in sent_per_user.items() if sent and totals.get(user_id, 0) != sent]
+    boost_missing = [index for index, report in reports.items()
+                     if processes > 1 and report["event_luck"] != EVENT_BOOST_MULTIPLIER]
+    foreign = sum(report["foreign_users"] for report in reports.values())
+    ok = (stats["callbacks"] == args.clicks and not stats["duplicate_callbacks"]
+          and not mismatched and not boost_missing and not foreign)
+
+    print(f"{processes:>3} proc {shard_count:>3} shards | {args.clicks / elapsed:>9,.0f} clicks/s "
+          f"({elapsed:.2f}s) | callbacks {stats['callbacks']:,}/{args.clicks:,} "
+          f"dup {stats['duplicate_callbacks']} | catch posts {stats['followups']:,} "
+          f"({stats['followup_embeds']:,} embeds) | users wrong {len(mismatched)} | "
+          f"foreign-resident {foreign} | boost missing {boost_missing or '-'} | {'ok' if ok else 'FAILED'}")
+    return ok
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--shards-per-process", type=int, default=2)
+    parser.add_argument("--partitions", type=int, default=4, help="FISHING_DB_PARTITIONS")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--guilds", type=int, default=32)
+    parser.add_argument("--clicks", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=18765, help="first fake API port; worker i uses port + i")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for all callbacks")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    ctx = multiprocessing.get_context("spawn")
+    apis = []
+    for index in range(max(args.processes)):
+        api_ready = ctx.Event()
+        apis.append(ctx.Process(target=run_fake_api, args=(args.port + index, api_ready), daemon=True))
+        apis[-1].start()
+        api_ready.wait(30)
+    try:
+        all_ok = all([run_trial(processes, args) for processes in args.processes])
+    finally:
+        for api in apis:
+            api.terminate()
+    sys.exit(0 if all_ok else 1)
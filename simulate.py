@@ -0,0 +1,162 @@
+"""Offline Monte-Carlo simulator for the fishing economy in main.py.
+
+Draws millions of catches per (island, rod, bait, enchant) loadout with NumPy, using the
+same FISH_CATALOG, alias samplers, calculate_total_luck and counter-based RNG streams as the
+bot, and reports expected income per hour, rarity distribution and rod weight-cap loss rate.
+For the same seed the catches are identical to perform_fishing, catch for catch.
+
+    python simulate.py                       # semua pulau x semua rod, Starter Bait, enchant 0
+    python simulate.py --islands Ocean --rods "Lucky Rod" --baits "Luck Bait" "Royal Bait"
+    python simulate.py --check               # replay perform_fishing (scalar) dan bandingkan per tangkapan
+
+NumPy hanya dibutuhkan untuk simulator ini, bukan untuk bot: pip install -r requirements-dev.txt
+"""
+import argparse
+import os
+import sys
+import time
+
+# Jangan sentuh database pemain saat mengimpor main
+os.environ.setdefault("FISHING_DB_PATH", ":memory:")
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("simulate.py requires numpy: pip install -r requirements-dev.txt")
+
+import main
+
+CATCHES_PER_HOUR = 3600 / main.COOLDOWN_TIME
+RARITY_SHORT = {"Common": "C", "Uncommon": "U", "Rare": "R", "Epic": "E", "Legendary": "L", "Mythic": "M", "Secret": "S"}
+
+
+def loadout_stats(island, rod, bait, enchant):
+    stats = main.UserStats()
+    stats["location"] = island
+    stats["current_rod"] = rod
+    stats["current_bait"] = bait
+    stats["rod_enchantment"][rod] = enchant
+    return stats
+
+
+def island_arrays(island):
+    catalog = main.FISH_CATALOG
+    fish_ids = np.asarray(catalog.island_fish_ids(island), dtype=np.int64)
+    rarity = np.asarray(catalog.rarity, dtype=np.int64)[fish_ids]
+    return {
+        "fish_ids": fish_ids,
+        "chance": np.asarray(catalog.chance, dtype=np.float64)[fish_ids],
+        "weight_min": np.asarray(catalog.weight_min, dtype=np.float64)[fish_ids],
+        "weight_max": np.asarray(catalog.weight_max, dtype=np.float64)[fish_ids],
+        "base_price": np.asarray(catalog.base_price, dtype=np.float64)[fish_ids],
+        "rarity": rarity,
+    }
+
+
+def stream_uniforms(seed, counters):
+    """NumPy version of main.stream_uniform over an array of counters (uint64 arithmetic wraps mod 2**64)."""
+    z = np.uint64(seed) + (counters + np.uint64(1)) * np.uint64(main.SPLITMIX_GAMMA)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def simulate_loadout(seed, island, arrays, total_luck, max_weight_kg, catches, first_index=0):
+    """Vectorized perform_fishing on stream ``seed``: returns per-catch coins, rarity tier and lost flag."""
+    # Alias table yang sama dengan bot (sudah termasuk multiplier rarity event), kolom = posisi di pool pulau
+    sampler = main.get_fish_sampler(island, total_luck)
+    prob, alias = np.asarray(sampler.prob), np.asarray(sampler.alias)
+    counters = np.arange(first_index, first_index + catches, dtype=np.uint64) * np.uint64(main.DRAWS_PER_CATCH)
+    u_column, u_coin, u_weight = (stream_uniforms(seed, counters + np.uint64(k)) for k in range(main.DRAWS_PER_CATCH))
+
+    picks = (u_column * sampler.size).astype(np.int64)
+    picks = np.where(u_coin >= prob[picks], alias[picks], picks)
+
+    weight_min = arrays["weight_min"][picks]
+    weight_kg = weight_min + (arrays["weight_max"][picks] - weight_min) * u_weight
+    lost = weight_kg > max_weight_kg
+    coins = np.where(lost, 0.0, arrays["base_price"][picks] * np.maximum(1.0, weight_kg / weight_min))
+    return coins, arrays["rarity"][picks], lost
+
+
+def summarize(coins, rarity, lost):
+    counts = np.bincount(rarity, minlength=len(main.RARITY_TIERS))
+    return {
+        "coins_per_catch": float(coins.mean()),
+        "income_per_hour": float(coins.mean()) * CATCHES_PER_HOUR,
+        "loss_rate": float(lost.mean()),
+        "rarity": {name: counts[i] / len(rarity) for i, name in enumerate(main.RARITY_TIERS)},
+    }
+
+
+def run_sweep(islands, rods, baits, enchants, catches, seed):
+    # Semua loadout memakai stream yang sama (common random numbers), jadi selisih antar baris bukan noise sampling
+    print(f"{'Island':<17} {'Rod':<14} {'Bait':<16} {'Ench':>4} {'Luck':>5} "
+          f"{'R$/catch':>12} {'R$/hour':>14} {'Lost':>7}  Rarity")
+    for island in islands:
+        arrays = island_arrays(island)
+        if not len(arrays["fish_ids"]):
+            continue
+        for rod in rods:
+            max_weight_kg = main.ROD_DATA[rod]["max_weight_kg"]
+            for bait in baits:
+                for enchant in enchants:
+                    if enchant > main.ROD_DATA[rod]["max_ench_level"]:
+                        continue
+                    total_luck = main.calculate_total_luck(loadout_stats(island, rod, bait, enchant))
+                    report = summarize(*simulate_loadout(seed, island, arrays, total_luck, max_weight_kg, catches))
+                    rarity_text = " ".join(
+                        f"{RARITY_SHORT[name]}{share * 100:.1f}" for name, share in report["rarity"].items() if share
+                    )
+                    print(f"{island:<17} {rod:<14} {bait:<16} {enchant:>4} {total_luck:>5} "
+                          f"{report['coins_per_catch']:>12,.2f} {report['income_per_hour']:>14,.2f} "
+                          f"{report['loss_rate'] * 100:>6.2f}%  {rarity_text}")
+
+
+def check_against_scalar(island, rod, bait, enchant, catches, seed):
+    """Replay the same stream through the real perform_fishing and compare catch by catch. True if identical."""
+    stats = loadout_stats(island, rod, bait, enchant)
+    stats.rng_seed, stats.catch_index = seed, 0
+    scalar_tier = np.empty(catches, dtype=np.int64)
+    scalar_coins = np.empty(catches, dtype=np.float64)
+    for i in range(catches):
+        status, _, _, rarity, coins = main.perform_fishing(stats)
+        scalar_tier[i] = main.RARITY_TIER_IDS[rarity]
+        scalar_coins[i] = coins
+
+    total_luck = main.calculate_total_luck(stats)
+    max_weight_kg = main.ROD_DATA[rod]["max_weight_kg"]
+    coins, rarity, lost = simulate_loadout(seed, island, island_arrays(island), total_luck, max_weight_kg, catches)
+
+    same_fish = int(np.count_nonzero(scalar_tier == rarity))
+    same_coins = int(np.count_nonzero(scalar_coins == coins))
+    vector = summarize(coins, rarity, lost)
+    for name in main.RARITY_TIERS:
+        scalar_share = np.count_nonzero(scalar_tier == main.RARITY_TIER_IDS[name]) / catches
+        print(f"{name:<10} scalar {scalar_share * 100:7.3f}%  vector {vector['rarity'][name] * 100:7.3f}%")
+    print(f"{catches:,} catches: rarity identical {same_fish:,}, coins identical {same_coins:,}")
+    return same_fish == catches and same_coins == catches
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--islands", nargs="+", default=main.ISLAND_LIST, choices=main.ISLAND_LIST)
+    parser.add_argument("--rods", nargs="+", default=list(main.ROD_DATA), choices=list(main.ROD_DATA))
+    parser.add_argument("--baits", nargs="+", default=["Starter Bait"], choices=list(main.BAIT_DATA))
+    parser.add_argument("--enchant", nargs="+", type=int, default=[0])
+    parser.add_argument("--catches", type=int, default=100_000, help="catches per loadout")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="verify against scalar perform_fishing and exit")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    started = time.perf_counter()
+    if args.check:
+        ok = check_against_scalar(args.islands[0], args.rods[0], args.baits[0], args.enchant[0],
+                                  min(args.catches, 50_000), args.seed)
+        sys.exit(0 if ok else 1)
+    run_sweep(args.islands, args.rods, args.baits, args.enchant, args.catches, args.seed)
+    print(f"Done in {time.perf_counter() - started:.1f}s")
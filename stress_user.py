@@ -0,0 +1,211 @@
+"""Concurrency stress test for user_transaction: thousands of concurrent clicks on one user.
+
+Fires fishing, island-buy, travel and sell clicks at the same user through main.route_component,
+with a slow (and sometimes failing) fake Discord edit so many handlers are in flight at once.
+Afterwards it asserts the invariants the per-user lock must keep:
+
+- no double spend: koin == start + coins caught + coins sold - price of islands bought, and
+  koin never went negative while the clicks ran;
+- no two catches inside one cooldown: accepted fishing clicks are COOLDOWN_TIME apart, and
+  catch_index equals the number of catches rolled (bursts leave gaps, so batches run too);
+- inventory, catches and sales add up, location is an unlocked island, no lock entry leaks;
+- a transaction that raises restores the record exactly.
+
+    python stress_user.py                              # 5000 klik, edit 0-200 ms
+    python stress_user.py --clicks 20000 --edit-ms 50 --fail-rate 0.2
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# Jangan sentuh database pemain saat mengimpor main
+os.environ.setdefault("FISHING_DB_PATH", ":memory:")
+
+import main
+from loadgen import FakeInteraction, FakeResponse, percentile
+
+USER_ID = 4242
+MIX = {"auto_fish_button": 5, "travel_buy_next": 2, "set_fishing_location": 1, "shop_sell_all": 1, "main_fish": 1}
+
+
+class SlowResponse(FakeResponse):
+    """Discord response that takes up to ``edit_s`` and fails with probability ``fail_rate``."""
+
+    def __init__(self, rng, edit_s, fail_rate):
+        super().__init__()
+        self.rng, self.edit_s, self.fail_rate = rng, edit_s, fail_rate
+
+    async def _request(self):
+        await asyncio.sleep(self.rng.uniform(0, self.edit_s))
+        if self.rng.random() < self.fail_rate:
+            raise RuntimeError("fake Discord error")
+        self._done = True
+
+    async def edit_message(self, **kwargs):
+        await self._request()
+
+    async def send_message(self, *args, **kwargs):
+        await self._request()
+
+    async def defer(self, **kwargs):
+        await self._request()
+
+
+class Ledger:
+    """Every committed change to koin, inventory and the catch stream, recorded by wrapping main's functions."""
+
+    def __init__(self):
+        self.caught_coins = self.sold_coins = 0.0
+        self.caught_units = self.sold_units = self.rolled = 0
+        self.accepted_at = []
+
+    def install(self):
+        perform_fishing, apply_catches = main.perform_fishing, main.apply_catches
+        sell_inventory, reserve_catches = main.sell_inventory, main.reserve_catches
+
+        def counted_perform_fishing(user_stats):
+            self.accepted_at.append(user_stats.last_fished)
+            result = perform_fishing(user_stats)
+            self.rolled += 1
+            if result[0] == "Success":
+                self.caught_units += 1
+                self.caught_coins += result[4]
+            return result
+
+        def counted_reserve_catches(user_stats, count):
+            self.accepted_at.append(user_stats.last_fished)
+            self.rolled += count
+            return reserve_catches(user_stats, count)
+
+        def counted_apply_catches(user_stats, result, *args):
+            applied = apply_catches(user_stats, result, *args)
+            if applied is not None:
+                self.caught_units += sum(applied["caught"].values())
+                self.caught_coins += applied["coins"]
+            return applied
+
+        def counted_sell_inventory(user_stats, *args, **kwargs):
+            units, coins = sell_inventory(user_stats, *args, **kwargs)
+            self.sold_units += units
+            self.sold_coins += coins
+            return units, coins
+
+        main.perform_fishing = counted_perform_fishing
+        main.reserve_catches = counted_reserve_catches
+        main.apply_catches = counted_apply_catches
+        main.sell_inventory = counted_sell_inventory
+
+
+def click(rng, args):
+    action = rng.choices(list(MIX), list(MIX.values()))[0]
+    values = None
+    if action == "set_fishing_location":
+        values = [rng.choice(list(main.get_user_stats(USER_ID)["unlocked_islands"]))]
+    interaction = FakeInteraction(USER_ID, main.component_id(action, USER_ID), values)
+    interaction.response = SlowResponse(rng, args.edit_ms / 1000, args.fail_rate)
+
+    async def edit_original_response(**kwargs):
+        await interaction.response._request()
+    interaction.edit_original_response = edit_original_response
+    return interaction
+
+
+async def watch_koin(stop, low):
+    while not stop.is_set():
+        low[0] = min(low[0], main.get_user_stats(USER_ID).koin)
+        await asyncio.sleep(0)
+
+
+async def run_clicks(args, rng):
+    latencies, failures = [], [0]
+
+    async def one(delay):
+        await asyncio.sleep(delay)
+        started = time.perf_counter()
+        try:
+            await main.route_component(click(rng, args))
+        except RuntimeError:
+            failures[0] += 1
+        latencies.append(time.perf_counter() - started)
+
+    stop, low = asyncio.Event(), [float("inf")]
+    watcher = asyncio.create_task(watch_koin(stop, low))
+    started = time.time()
+    # Klik datang berkelompok; jeda antar kelompok melewati beberapa cooldown, jadi ada batch juga
+    burst_gap = args.spread / args.bursts
+    await asyncio.gather(*(one(rng.randrange(args.bursts) * burst_gap + rng.uniform(0, 0.01))
+                           for _ in range(args.clicks)))
+    elapsed = time.time() - started
+    stop.set()
+    await watcher
+    return sorted(latencies), failures[0], low[0], elapsed
+
+
+async def check_rollback(rng):
+    """A transaction that raises after changing everything must leave the record as it was."""
+    before = main.user_row(USER_ID, main.get_user_stats(USER_ID))
+    try:
+        async with main.user_transaction(USER_ID) as user_stats:
+            main.perform_fishing_batch(user_stats, 50)
+            main.sell_inventory(user_stats)
+            user_stats["last_fished"] = time.time()
+            user_stats["location"] = rng.choice(list(user_stats["unlocked_islands"]))
+            raise RuntimeError("rollback")
+    except RuntimeError:
+        pass
+    assert main.user_row(USER_ID, main.get_user_stats(USER_ID)) == before, "rollback did not restore the record"
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clicks", type=int, default=5000)
+    parser.add_argument("--spread", type=float, default=2.0, help="clicks start within this many seconds")
+    parser.add_argument("--bursts", type=int, default=8, help="clicks arrive in this many bursts spread evenly")
+    parser.add_argument("--edit-ms", type=float, default=200, help="fake Discord request time, uniform 0..edit-ms")
+    parser.add_argument("--fail-rate", type=float, default=0.05, help="fraction of fake Discord requests that fail")
+    parser.add_argument("--cooldown", type=float, default=0.05)
+    parser.add_argument("--koin", type=float, default=2_000_000, help="starting koin (enough for several islands)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    rng = random.Random(args.seed)
+    main.COOLDOWN_TIME = args.cooldown
+
+    user_stats = main.get_user_stats(USER_ID)
+    user_stats["koin"] = args.koin
+    start_koin, start_islands = user_stats.koin, set(user_stats["unlocked_islands"])
+    ledger = Ledger()
+    ledger.install()
+
+    latencies, failures, lowest_koin, elapsed = asyncio.run(run_clicks(args, rng))
+    user_stats = main.get_user_stats(USER_ID)
+    bought = set(user_stats["unlocked_islands"]) - start_islands
+    spent = sum(main.ISLAND_DATA[island]["price"] for island in bought)
+    expected_koin = start_koin + ledger.caught_coins + ledger.sold_coins - spent
+    accepted = sorted(ledger.accepted_at)
+    gaps = [b - a for a, b in zip(accepted, accepted[1:])]
+
+    print(f"{args.clicks:,} clicks in {elapsed:.2f}s, {failures:,} failed Discord requests")
+    print(f"latency p50 {percentile(latencies, 0.5) * 1000:.1f} ms  p99 {percentile(latencies, 0.99) * 1000:.1f} ms"
+          f"  max {latencies[-1] * 1000:.1f} ms")
+    print(f"fishing accepted {len(accepted):,} ({ledger.rolled:,} catches), islands bought {len(bought)}, "
+          f"sold {ledger.sold_units:,} fish, koin {user_stats.koin:,.2f}")
+
+    assert lowest_koin >= 0, f"koin went negative: {lowest_koin}"
+    assert abs(user_stats.koin - expected_koin) <= 1e-6 * max(1.0, abs(expected_koin)), \
+        f"koin {user_stats.koin} != expected {expected_koin} (double spend or lost update)"
+    assert not gaps or min(gaps) >= args.cooldown, f"two catches {min(gaps):.4f}s apart inside one cooldown"
+    assert user_stats.catch_index == ledger.rolled, f"catch_index {user_stats.catch_index} != {ledger.rolled} rolled"
+    assert sum(user_stats.inventory_counts) + ledger.sold_units == ledger.caught_units, "inventory does not add up"
+    assert user_stats.total_catches == ledger.caught_units
+    assert user_stats["location"] in user_stats["unlocked_islands"]
+    assert not main._USER_LOCKS, f"{len(main._USER_LOCKS)} lock entries leaked"
+
+    asyncio.run(check_rollback(rng))
+    print("OK")